@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+import os
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+from leaderboard import LeaderboardManager
+
+def archive_games(before=None, exhibition_only=False, period="month", vacuum=False):
+    """
+    Move old or exhibition games out of the leaderboard database into per-period archive databases.
+
+    Args:
+        before: Archive completed games that ended before this time
+        exhibition_only: Only archive exhibition games
+        period: 'month' or 'year', the span of games kept in one archive file
+        vacuum: Shrink the database file afterwards
+    """
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leaderboard.db')
+    if not os.path.exists(db_path):
+        print(f"Database file not found at {db_path}")
+        return
+
+    manager = LeaderboardManager(db_path)
+    try:
+        moved = manager.archive_games(before=before, exhibition_only=exhibition_only, period=period)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if not moved:
+        print("No games to archive.")
+    for path, count in moved.items():
+        print(f"Moved {count} games to {path}")
+
+    if vacuum and moved:
+        # Deleted pages are otherwise reused but the file keeps its size
+        with manager._get_connection() as conn:
+            conn.execute("VACUUM")
+        print("Database vacuumed.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old or exhibition games of the poker leaderboard.")
+    parser.add_argument('--older-than', type=int, metavar='DAYS', help='Archive games that ended more than DAYS days ago')
+    parser.add_argument('--before', help="Archive games that ended before this date (YYYY-MM-DD)")
+    parser.add_argument('--exhibition', action='store_true', help='Only archive exhibition games')
+    parser.add_argument('--period', choices=['month', 'year'], default='month', help='Span of games per archive file')
+    parser.add_argument('--vacuum', action='store_true', help='Shrink the database file afterwards')
+    args = parser.parse_args()
+
+    before = args.before
+    if args.older_than is not None:
+        # end_time is stored in UTC by SQLite's CURRENT_TIMESTAMP
+        before = (datetime.now(timezone.utc) - timedelta(days=args.older_than)).strftime("%Y-%m-%d %H:%M:%S")
+
+    archive_games(before=before, exhibition_only=args.exhibition, period=args.period, vacuum=args.vacuum)
@@ -0,0 +1,203 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Optional faster encoders; fall back to the standard library when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+# Full game events (the original protocol) or the seq-numbered delta stream
+EVENTS_CHANNEL = "events"
+DELTA_CHANNEL = "delta"
+
+DEFAULT_MAX_QUEUE = 256
+DEFAULT_SEND_TIMEOUT = 10.0
+DEFAULT_MAX_OVERFLOWS = 5
+
+
+def encode_json(message: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(message).decode("utf-8")
+    return json.dumps(message, separators=(",", ":"))
+
+
+def choose_subprotocol(requested: List[str]) -> Optional[str]:
+    """Pick the WebSocket subprotocol to accept from the client's offer."""
+    if msgpack is not None and MSGPACK_SUBPROTOCOL in requested:
+        return MSGPACK_SUBPROTOCOL
+    return None
+
+
+class EncodedMessage:
+    """
+    A message encoded at most once per wire format.
+
+    The same instance is queued for every subscriber, so an event costs one
+    encode no matter how many spectators are watching.
+    """
+
+    __slots__ = ("message", "_text", "_binary")
+
+    def __init__(self, message: Dict[str, Any]):
+        self.message = message
+        self._text: Optional[str] = None
+        self._binary: Optional[bytes] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = encode_json(self.message)
+        return self._text
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = msgpack.packb(self.message)
+        return self._binary
+
+
+class ClientConnection:
+    """A subscribed WebSocket with its own bounded queue and writer task."""
+
+    def __init__(self, websocket, max_queue: int, subprotocol: Optional[str] = None,
+                 channel: str = EVENTS_CHANNEL):
+        self.websocket = websocket
+        self.subprotocol = subprotocol
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.task: Optional[asyncio.Task] = None
+        self.overflows = 0
+        self.dropped = 0
+        self.closed = False
+
+
+class GameBroadcaster:
+    """
+    Fans game events out to every spectator of one game.
+
+    publish() never awaits a socket: each client has a bounded queue drained
+    by its own writer task. When a client falls behind and its queue fills,
+    the backlog is replaced by a single fresh game_state snapshot (a keyframe
+    on the delta channel) so the client can resync. Clients that keep
+    overflowing, time out or error are dropped.
+    """
+
+    def __init__(self, snapshot_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+                 keyframe_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 send_timeout: float = DEFAULT_SEND_TIMEOUT,
+                 max_overflows: int = DEFAULT_MAX_OVERFLOWS):
+        self.snapshot_fn = snapshot_fn
+        self.keyframe_fn = keyframe_fn
+        # Room for at least a resync snapshot plus the newest event
+        self.max_queue = max(2, max_queue)
+        self.send_timeout = send_timeout
+        self.max_overflows = max_overflows
+        self.clients: Dict[int, ClientConnection] = {}
+
+    def subscribe(self, websocket, subprotocol: Optional[str] = None,
+                  channel: str = EVENTS_CHANNEL) -> ClientConnection:
+        client = ClientConnection(websocket, self.max_queue, subprotocol, channel)
+        client.task = asyncio.create_task(self._writer(client))
+        self.clients[id(websocket)] = client
+        return client
+
+    def unsubscribe(self, websocket) -> None:
+        client = self.clients.pop(id(websocket), None)
+        if client is None:
+            return
+        client.closed = True
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    def send(self, client: ClientConnection, message: Union[Dict[str, Any], EncodedMessage]) -> None:
+        """Queue a message for one client without waiting."""
+        if client.closed:
+            return
+        if not isinstance(message, EncodedMessage):
+            message = EncodedMessage(message)
+        try:
+            client.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._handle_overflow(client, message)
+
+    def publish(self, message: Union[Dict[str, Any], EncodedMessage], channel: str = EVENTS_CHANNEL) -> None:
+        """Queue a message for every client on the channel without waiting."""
+        if not isinstance(message, EncodedMessage):
+            message = EncodedMessage(message)
+        for client in list(self.clients.values()):
+            if client.channel == channel:
+                self.send(client, message)
+
+    def _handle_overflow(self, client: ClientConnection, message: EncodedMessage) -> None:
+        client.overflows += 1
+        if client.overflows > self.max_overflows:
+            print(f"Dropping slow spectator after {client.overflows} queue overflows")
+            self.unsubscribe(client.websocket)
+            asyncio.create_task(self._close_socket(client.websocket))
+            return
+
+        # Coalesce the backlog into one snapshot, followed by the newest event
+        client.dropped += client.queue.qsize()
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        try:
+            resync = self._resync_message(client.channel)
+            if resync is not None:
+                client.queue.put_nowait(EncodedMessage(resync))
+        except Exception as e:
+            print(f"Could not build resync snapshot: {e}")
+        client.queue.put_nowait(message)
+
+    def _resync_message(self, channel: str) -> Optional[Dict[str, Any]]:
+        if channel == DELTA_CHANNEL:
+            return self.keyframe_fn() if self.keyframe_fn is not None else None
+        if self.snapshot_fn is not None:
+            return {"event": "game_state", "data": self.snapshot_fn()}
+        return None
+
+    async def _writer(self, client: ClientConnection) -> None:
+        try:
+            while True:
+                message = await client.queue.get()
+                if client.subprotocol == MSGPACK_SUBPROTOCOL:
+                    send = client.websocket.send_bytes(message.binary)
+                else:
+                    send = client.websocket.send_text(message.text)
+                await asyncio.wait_for(send, timeout=self.send_timeout)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Dead or stalled socket: prune it so it never affects the game again
+            print(f"Removing spectator after send failure: {e!r}")
+            self.unsubscribe(client.websocket)
+
+    async def _close_socket(self, websocket) -> None:
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    def close(self, close_sockets: bool = False) -> None:
+        """Stop every writer task, optionally closing the spectators' sockets too."""
+        for client in list(self.clients.values()):
+            self.unsubscribe(client.websocket)
+            if close_sockets:
+                asyncio.create_task(self._close_socket(client.websocket))
+
+    def get_stats(self) -> Dict[str, Any]:
+        clients: List[ClientConnection] = list(self.clients.values())
+        return {
+            "clients": len(clients),
+            "queued": sum(c.queue.qsize() for c in clients),
+            "dropped": sum(c.dropped for c in clients),
+        }
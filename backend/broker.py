@@ -0,0 +1,320 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+# Optional Redis client, only needed for a redis:// BROKER_URL
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Events a game may have waiting for the broker before the oldest are dropped
+DEFAULT_PUBLISH_QUEUE = 256
+
+# Seconds a game's owner record outlives the owner's last heartbeat, so games of
+# a node that went away are forgotten by the rest of the cluster
+DEFAULT_OWNER_TTL = 30.0
+
+# Seconds a finished game's record is kept for other nodes to serve its final state
+DEFAULT_FINISHED_TTL = 300.0
+
+
+class Subscription:
+    """A broker channel subscription whose messages are handled by a reader task"""
+
+    def __init__(self, task: asyncio.Task, on_close: Optional[Callable[[], Awaitable[None]]] = None):
+        self.task = task
+        self.on_close = on_close
+
+    async def close(self) -> None:
+        self.task.cancel()
+        if self.on_close is not None:
+            await self.on_close()
+
+
+async def _handle(handler: Handler, channel: str, message: Dict[str, Any]) -> None:
+    try:
+        await handler(message)
+    except Exception as e:
+        print(f"Error handling broker message on {channel}: {e}")
+
+
+class GamePublisher:
+    """
+    Publishes one game's events to the broker from its own task, in order.
+
+    put() never waits, so a slow or failing broker cannot hold up the game.
+    Every event carries the game's full state, so when the queue fills the
+    oldest events are dropped and followers catch up from the newer ones.
+    Broker errors are logged and counted, never raised to the game.
+    """
+
+    def __init__(self, cluster: "GameCluster", game_id: str, max_queue: int = DEFAULT_PUBLISH_QUEUE):
+        self.cluster = cluster
+        self.game_id = game_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(2, max_queue))
+        self.published = 0
+        self.dropped = 0
+        self.errors = 0
+        self.task = asyncio.create_task(self._run())
+
+    def put(self, item) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.queue.put_nowait(item)
+
+    async def _run(self) -> None:
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            kind, seq, payload = item
+            try:
+                if kind == "event":
+                    await self.cluster.store_game(self.game_id, seq, payload["state"], self.cluster.owner_ttl)
+                    await self.cluster.broker.publish(f"events:{self.game_id}", payload)
+                else:
+                    await self.cluster.store_game(self.game_id, seq, payload, self.cluster.finished_ttl)
+                self.published += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Error publishing game {self.game_id} to the broker: {e}")
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+
+class InProcessBroker:
+    """
+    Broker for nodes that share one process (tests, single-node setups).
+
+    Published messages are delivered to every subscriber's queue in order;
+    keys live in a plain dict, and expired keys are dropped when read.
+    """
+
+    def __init__(self):
+        self.channels: Dict[str, List[asyncio.Queue]] = {}
+        self.values: Dict[str, Dict[str, Any]] = {}
+        self.expiry: Dict[str, float] = {}
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        for queue in self.channels.get(channel, []):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str, handler: Handler) -> Subscription:
+        queue: asyncio.Queue = asyncio.Queue()
+        self.channels.setdefault(channel, []).append(queue)
+
+        async def reader():
+            while True:
+                await _handle(handler, channel, await queue.get())
+
+        async def unsubscribe():
+            queues = self.channels.get(channel, [])
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                self.channels.pop(channel, None)
+
+        return Subscription(asyncio.create_task(reader()), unsubscribe)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        self.values[key] = value
+        if ttl is None:
+            self.expiry.pop(key, None)
+        else:
+            self.expiry[key] = time.monotonic() + ttl
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if key in self.expiry and self.expiry[key] <= time.monotonic():
+            self.values.pop(key, None)
+            self.expiry.pop(key)
+        return self.values.get(key)
+
+    async def expire(self, key: str, ttl: float) -> bool:
+        """Reset a key's time to live; False if it no longer exists"""
+        if await self.get(key) is None:
+            return False
+        self.expiry[key] = time.monotonic() + ttl
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBroker:
+    """Broker backed by Redis (or any server speaking its protocol) for nodes in separate processes or hosts"""
+
+    def __init__(self, url: str):
+        if redis_asyncio is None:
+            raise RuntimeError("A redis:// BROKER_URL requires the 'redis' package (pip install redis)")
+        self.redis = redis_asyncio.from_url(url)
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await self.redis.publish(channel, json.dumps(message))
+
+    async def subscribe(self, channel: str, handler: Handler) -> Subscription:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(channel)
+
+        async def reader():
+            async for item in pubsub.listen():
+                if item["type"] == "message":
+                    await _handle(handler, channel, json.loads(item["data"]))
+
+        async def unsubscribe():
+            await pubsub.unsubscribe(channel)
+            await pubsub.close()
+
+        return Subscription(asyncio.create_task(reader()), unsubscribe)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        await self.redis.set(key, json.dumps(value), px=int(ttl * 1000) if ttl is not None else None)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = await self.redis.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def expire(self, key: str, ttl: float) -> bool:
+        """Reset a key's time to live; False if it no longer exists"""
+        return bool(await self.redis.pexpire(key, int(ttl * 1000)))
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+
+# Shared by every GameCluster in this process that uses BROKER_URL=memory
+in_process_broker = InProcessBroker()
+
+
+def create_broker(url: Optional[str]):
+    """Broker for a BROKER_URL setting: None (no clustering), 'memory', or a redis:// URL"""
+    if not url:
+        return None
+    if url == "memory":
+        return in_process_broker
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported BROKER_URL: {url}")
+
+
+class GameCluster:
+    """
+    Shares games between API nodes through a broker.
+
+    The node that creates a game owns it: it plays the game, stores the
+    latest state under game:{game_id} and publishes every event on
+    events:{game_id}. Any other node can read that state, follow the events
+    to serve spectators, and send commands (such as start) to the owner's
+    node:{node_id} channel. Events are handed to a GamePublisher per game,
+    so the owner's games never wait on the broker.
+
+    Owner records expire owner_ttl seconds after they were last written or
+    refreshed by the owner's heartbeat, so the games of a node that stopped
+    disappear from the cluster. Finished games are kept for finished_ttl.
+    """
+
+    def __init__(self, broker, node_id: Optional[str] = None, max_queue: int = DEFAULT_PUBLISH_QUEUE,
+                 owner_ttl: float = DEFAULT_OWNER_TTL, finished_ttl: float = DEFAULT_FINISHED_TTL):
+        self.broker = broker
+        self.node_id = node_id or uuid.uuid4().hex[:12]
+        self.command_subscription: Optional[Subscription] = None
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        self.max_queue = max_queue
+        self.owner_ttl = owner_ttl
+        self.finished_ttl = finished_ttl
+        # Unfinished games owned by this node, whose records the heartbeat keeps alive
+        self.games: Set[str] = set()
+        self.publishers: Dict[str, GamePublisher] = {}
+        self.published = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def start(self, on_command: Handler) -> None:
+        """Listen for commands addressed to this node and keep its games' records alive"""
+        if self.command_subscription is None:
+            self.command_subscription = await self.broker.subscribe(f"node:{self.node_id}", on_command)
+        if self.heartbeat_task is None:
+            self.heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.owner_ttl / 3)
+            for game_id in list(self.games):
+                try:
+                    await self.broker.expire(f"game:{game_id}", self.owner_ttl)
+                except Exception as e:
+                    print(f"Error refreshing game {game_id} on the broker: {e}")
+
+    async def register_game(self, game_id: str, seq: int, state: Dict[str, Any]) -> None:
+        """Announce this node's ownership of a game"""
+        self.games.add(game_id)
+        await self.store_game(game_id, seq, state, self.owner_ttl)
+
+    async def store_game(self, game_id: str, seq: int, state: Dict[str, Any], ttl: float) -> None:
+        await self.broker.set(f"game:{game_id}", {"owner": self.node_id, "seq": seq, "state": state}, ttl)
+
+    async def get_game(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """Owner, last sequence number and latest state of a game on any node"""
+        return await self.broker.get(f"game:{game_id}")
+
+    def publisher(self, game_id: str) -> GamePublisher:
+        publisher = self.publishers.get(game_id)
+        if publisher is None:
+            publisher = self.publishers[game_id] = GamePublisher(self, game_id, self.max_queue)
+        return publisher
+
+    def publish_event(self, game_id: str, message: Dict[str, Any], state: Dict[str, Any]) -> None:
+        """Queue an event for the game's publisher; its state is stored before the event is published"""
+        self.games.add(game_id)
+        self.publisher(game_id).put(("event", message["seq"], {"message": message, "state": state}))
+
+    def finish_game(self, game_id: str, seq: int, state: Dict[str, Any]) -> None:
+        """Store a finished game's final state after its queued events, then stop its publisher"""
+        self.games.discard(game_id)
+        publisher = self.publisher(game_id)
+        publisher.put(("state", seq, state))
+        publisher.put(None)
+        publisher.task.add_done_callback(lambda task: self._retire(publisher))
+
+    def _retire(self, publisher: GamePublisher) -> None:
+        if self.publishers.get(publisher.game_id) is publisher:
+            del self.publishers[publisher.game_id]
+        self.published += publisher.published
+        self.dropped += publisher.dropped
+        self.errors += publisher.errors
+
+    def get_stats(self) -> Dict[str, Any]:
+        publishers = list(self.publishers.values())
+        return {
+            "publishing_games": len(publishers),
+            "queued": sum(p.queue.qsize() for p in publishers),
+            "published": self.published + sum(p.published for p in publishers),
+            "dropped": self.dropped + sum(p.dropped for p in publishers),
+            "errors": self.errors + sum(p.errors for p in publishers)
+        }
+
+    async def follow(self, game_id: str, handler: Handler) -> Subscription:
+        return await self.broker.subscribe(f"events:{game_id}", handler)
+
+    async def send_command(self, node_id: str, command: Dict[str, Any]) -> None:
+        await self.broker.publish(f"node:{node_id}", command)
+
+    async def close(self) -> None:
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+        for publisher in self.publishers.values():
+            publisher.cancel()
+        self.publishers.clear()
+        if self.command_subscription is not None:
+            await self.command_subscription.close()
+            self.command_subscription = None
+        await self.broker.close()
@@ -40,14 +40,22 @@ class Card:
     def to_treys_str(self):
         rank_str = 'T' if self.rank == '10' else self.rank
         suit_str = self.suit[0].lower()
-        return rank_str + suit_str 
-    
+        return rank_str + suit_str
+
+    @classmethod
+    def from_treys_str(cls, card_str):
+        rank = '10' if card_str[0] == 'T' else card_str[0]
+        suit = next(s for s in SUITS if s[0] == card_str[1].lower())
+        return cls(suit, rank)
+
     
 
 class Deck:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.cards = []
         self.dealt_cards = []
+        # Seeded decks deal reproducibly; unseeded ones share the global random state
+        self.rng = random.Random(seed) if seed is not None else random
 
         for suit in SUITS:
             for rank in RANKS:
@@ -61,7 +69,7 @@ class Deck:
         self.cards.extend(self.dealt_cards) # bring cards back to og amount
         self.dealt_cards = []
 
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
     
     def deal(self, count):
         if count > len(self.cards):
@@ -86,7 +94,9 @@ class Deck:
             self.dealt_cards.append(self.cards.pop())
     
     def reset(self) -> None:
+        rng = self.rng
         self.__init__()
+        self.rng = rng
 
 def format_cards(cards):
     return " ".join(str(card) for card in cards)
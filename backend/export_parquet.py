@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+import os
+import glob
+import json
+import hashlib
+import argparse
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+from leaderboard import LeaderboardManager
+
+# Completed games read from the database per batch
+EXPORT_BATCH_GAMES = 500
+
+# Remembers where the previous export of an output directory stopped
+STATE_FILE = "_export_state.json"
+
+def load_pyarrow():
+    """Import pyarrow only when an export runs; it is an optional dependency"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+def export_schemas(pa) -> Dict[str, Any]:
+    """Fixed column types, so every file of a table has the same schema"""
+    return {
+        "games": pa.schema([
+            ("game_id", pa.string()),
+            ("start_time", pa.timestamp("s")),
+            ("end_time", pa.timestamp("s")),
+            ("starting_chips", pa.int64()),
+            ("small_blind", pa.int64()),
+            ("big_blind", pa.int64()),
+            ("num_hands", pa.int64()),
+            ("is_official", pa.bool_()),
+        ]),
+        "game_participants": pa.schema([
+            ("game_id", pa.string()),
+            ("model_name", pa.string()),
+            ("final_chips", pa.int64()),
+            ("is_official", pa.bool_()),
+            ("end_time", pa.timestamp("s")),
+        ]),
+        "hand_results": pa.schema([
+            ("id", pa.int64()),
+            ("game_id", pa.string()),
+            ("hand_number", pa.int64()),
+            ("model_name", pa.string()),
+            ("profit_loss", pa.int64()),
+            ("won_hand", pa.bool_()),
+            ("starting_chips", pa.int64()),
+            ("ending_chips", pa.int64()),
+            ("big_blind", pa.int64()),
+            ("is_official", pa.bool_()),
+            ("end_time", pa.timestamp("s")),
+        ]),
+    }
+
+def load_state(out_dir: str) -> Dict[str, Any]:
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {"end_time": None, "ids_at_end_time": []}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(out_dir: str, state: Dict[str, Any]) -> None:
+    # Written to a temporary file first so an interrupted export never leaves a torn state file
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+def part_name(state: Dict[str, Any]) -> str:
+    """File name of the batch that starts at this state, the same on every run that starts there"""
+    return "part-" + hashlib.sha1(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def write_partitions(pa, pq, out_dir: str, table: str, schema, rows: List[Dict[str, Any]], part: str) -> None:
+    """
+    Write rows to out_dir/<table>/date=<YYYY-MM-DD>/<part>.parquet, by the day their game ended.
+
+    Each file is written under a hidden name and moved into place, and any
+    file of the same part left in other dates by an interrupted run is removed,
+    so rerunning a batch replaces its files instead of duplicating its rows.
+    """
+    by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_date.setdefault(row["end_time"].strftime("%Y-%m-%d"), []).append(row)
+    written = set()
+    for date, date_rows in by_date.items():
+        directory = os.path.join(out_dir, table, f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{part}.parquet")
+        # Dataset readers skip files starting with '.'
+        tmp_path = os.path.join(directory, f".{part}.parquet.tmp")
+        pq.write_table(pa.Table.from_pylist(date_rows, schema=schema), tmp_path)
+        os.replace(tmp_path, path)
+        written.add(path)
+    for path in glob.glob(os.path.join(out_dir, table, "date=*", f"{part}.parquet")):
+        if path not in written:
+            os.remove(path)
+
+def export_history(manager: LeaderboardManager, out_dir: str, batch_size: int = EXPORT_BATCH_GAMES) -> Dict[str, int]:
+    """
+    Append the games completed since the last export of out_dir to its Parquet tables.
+
+    games, game_participants and hand_results are written as Hive-style
+    date= partitions that pyarrow.dataset, pandas, DuckDB or Spark read
+    directly. Games are exported once each, in the order they finished; the
+    state file records the last end_time and the games exported at it, and
+    is saved after every batch. A batch's files are named after the state it
+    starts from, so a run interrupted before saving the state rewrites the
+    same files on the next run rather than adding duplicates.
+    """
+    pa, pq = load_pyarrow()
+    schemas = export_schemas(pa)
+    os.makedirs(out_dir, exist_ok=True)
+    state = load_state(out_dir)
+    counts = {"games": 0, "game_participants": 0, "hand_results": 0}
+
+    while True:
+        games = manager.get_completed_games(state["end_time"], state["ids_at_end_time"], batch_size)
+        if not games:
+            break
+
+        # Where this batch ends, in the database's own end_time format
+        last_end_time = games[-1]["end_time"]
+        at_last = [game["game_id"] for game in games if game["end_time"] == last_end_time]
+        
+        details = manager.get_games_details([game["game_id"] for game in games])
+        by_id = {game["game_id"]: game for game in games}
+        for game in games:
+            game["start_time"] = datetime.fromisoformat(game["start_time"])
+            game["end_time"] = datetime.fromisoformat(game["end_time"])
+        # Participants and hands carry their game's official flag and end time for filtering without a join
+        for table in ("game_participants", "hand_results"):
+            for row in details[table]:
+                game = by_id[row["game_id"]]
+                row["is_official"] = game["is_official"]
+                row["end_time"] = game["end_time"]
+
+        part = part_name(state)
+        write_partitions(pa, pq, out_dir, "games", schemas["games"], games, part)
+        for table in ("game_participants", "hand_results"):
+            write_partitions(pa, pq, out_dir, table, schemas[table], details[table], part)
+
+        counts["games"] += len(games)
+        counts["game_participants"] += len(details["game_participants"])
+        counts["hand_results"] += len(details["hand_results"])
+
+        # Advance past this batch; games that ended in the same second as its last one are remembered
+        if last_end_time == state["end_time"]:
+            at_last = state["ids_at_end_time"] + at_last
+        state = {"end_time": last_end_time, "ids_at_end_time": at_last}
+        save_state(out_dir, state)
+
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append newly completed games to partitioned Parquet files for analytics.")
+    parser.add_argument('out_dir', help='Directory holding the exported tables')
+    parser.add_argument('--db', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leaderboard.db'),
+                        help='Leaderboard database to export from')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database file not found at {args.db}")
+        sys.exit(1)
+
+    try:
+        counts = export_history(LeaderboardManager(args.db), args.out_dir)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    print(f"Exported {counts['games']} games, {counts['game_participants']} participants "
+          f"and {counts['hand_results']} hand results to {args.out_dir}")
@@ -0,0 +1,156 @@
+"""
+Deterministic fake LLMs for offline tests and load testing.
+
+A fake model is selected through the model name, with behaviour tuned by
+query-style parameters:
+
+    fake/<strategy>?latency=0.5&latency_dist=exponential&error_rate=0.05&malformed_rate=0.1&seed=7
+
+Strategies: random (default), caller, folder, raiser.
+Latency distributions: fixed (default), uniform, exponential.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl
+
+from prompts import estimate_tokens
+
+FAKE_MODEL_PREFIX = "fake/"
+MOCK_MODEL_PREFIX = "mock/"
+
+STRATEGIES = ("random", "caller", "folder", "raiser")
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential")
+
+MALFORMED_OUTPUTS = [
+    "Let me think about this hand carefully...",
+    '{"action": "raise", "raise_amount": ',
+    '{"action": "shove", "raise_amount": null}',
+    '{"move": "call"}',
+    "",
+]
+
+
+class FakeModelError(Exception):
+    """Simulated provider failure (rate limit, timeout, server error)."""
+
+
+def is_fake_model(model_name: str) -> bool:
+    return model_name.startswith(FAKE_MODEL_PREFIX)
+
+
+def is_mock_model(model_name: str) -> bool:
+    return model_name.startswith(MOCK_MODEL_PREFIX)
+
+
+def _state_value(text: str, label: str) -> int:
+    match = re.search(rf"{re.escape(label)}:\s*(\d+)", text)
+    return int(match.group(1)) if match else 0
+
+
+class FakeModel:
+    """A seeded stand-in for a chat model that answers poker prompts."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        strategy, _, query = spec.partition("?")
+        params = dict(parse_qsl(query))
+
+        self.strategy = strategy or "random"
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown fake model strategy '{self.strategy}'. Available: {', '.join(STRATEGIES)}")
+
+        self.latency = float(params.get("latency", 0.0))
+        self.latency_dist = params.get("latency_dist", "fixed")
+        if self.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{self.latency_dist}'. Available: {', '.join(LATENCY_DISTRIBUTIONS)}")
+
+        self.error_rate = float(params.get("error_rate", 0.0))
+        self.malformed_rate = float(params.get("malformed_rate", 0.0))
+        seed = int(params["seed"]) if "seed" in params else zlib.crc32(spec.encode("utf-8"))
+        self.rng = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        if self.latency_dist == "uniform":
+            return self.rng.uniform(0, 2 * self.latency)
+        if self.latency_dist == "exponential":
+            return self.rng.expovariate(1.0 / self.latency)
+        return self.latency
+
+    def _decide(self, prompt: str) -> Dict[str, Any]:
+        call_amount = _state_value(prompt, "Amount to call")
+        min_raise = max(1, _state_value(prompt, "Minimum raise over current bet"))
+
+        strategy = self.strategy
+        if strategy == "random":
+            strategy = self.rng.choice(["caller", "caller", "folder", "raiser"])
+
+        if strategy == "folder" and call_amount > 0:
+            return {"action": "fold", "raise_amount": None}
+        if strategy == "raiser":
+            return {"action": "raise", "raise_amount": min_raise * self.rng.randint(1, 3)}
+        return {"action": "call", "raise_amount": None}
+
+    def respond(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Produce an OpenAI-style chat completion dict, or raise FakeModelError."""
+        if self.rng.random() < self.error_rate:
+            raise FakeModelError(f"Simulated provider error from {FAKE_MODEL_PREFIX}{self.spec}")
+
+        prompt = "\n".join(
+            m["content"] if isinstance(m["content"], str) else " ".join(part.get("text", "") for part in m["content"])
+            for m in messages
+        )
+        if self.rng.random() < self.malformed_rate:
+            content = self.rng.choice(MALFORMED_OUTPUTS)
+        else:
+            content = json.dumps(self._decide(prompt))
+
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.spec,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    async def acomplete(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Wait for the simulated latency without blocking the event loop, then respond."""
+        delay = self.sample_latency()
+        if delay:
+            await asyncio.sleep(delay)
+        return self.respond(messages)
+
+    def complete(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        delay = self.sample_latency()
+        if delay:
+            time.sleep(delay)
+        return self.respond(messages)
+
+
+def create_fake_model(model_name: str) -> FakeModel:
+    """
+    New fake model for a 'fake/...' model name.
+
+    Each player gets its own instance, so its random stream continues across
+    its decisions without being advanced by other players or games.
+    """
+    spec = model_name[len(FAKE_MODEL_PREFIX):] if is_fake_model(model_name) else model_name
+    return FakeModel(spec)
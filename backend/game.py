@@ -26,16 +26,19 @@ class GameEvent(Enum):
     COMMUNITY_CARDS_DEALT = "community_cards_dealt"
     HAND_COMPLETE = "hand_complete"
     GAME_COMPLETE = "game_complete"
+    # Sent by the server in place of game_complete when play_game fails
+    GAME_ERROR = "game_error"
 
 class Game:
     def __init__(self, players: List[Player], sb: int, bb: int, callback=None, 
                  delay_between_actions: float = 1.0,
                  delay_between_stages: float = 2.0,
-                 delay_after_hand: float = 3.0):
+                 delay_after_hand: float = 3.0,
+                 seed: Optional[int] = None):
         self.players = players
         self.sb = sb
         self.bb = bb
-        self.deck = Deck()
+        self.deck = Deck(seed)
         self.community_cards: List[Card] = []
         self.pot = 0
         self.current_bet = 0
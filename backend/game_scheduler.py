@@ -0,0 +1,154 @@
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+# Finished batches are forgotten oldest-first once more than this many are tracked
+MAX_TRACKED_BATCHES = 100
+
+
+class GameScheduler:
+    """
+    Starts queued games with at most max_concurrent playing at once.
+
+    Higher priorities start first; games with the same priority start in
+    the order they were queued. Games can be grouped into batches whose
+    progress is reported by get_batch().
+    """
+
+    def __init__(self, start_fn: Callable[[str], Awaitable[None]], max_concurrent: int):
+        self.start_fn = start_fn
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue: List = []  # Heap of (-priority, order, game_id)
+        self.order = itertools.count()
+        self.queued: Dict[str, int] = {}  # game_id -> priority
+        self.entries: Dict[str, int] = {}  # game_id -> order of its live heap entry
+        self.running: Dict[str, float] = {}  # game_id -> start time
+        # The event loop only keeps weak references to tasks, so running games are held here
+        self.tasks: Set[asyncio.Task] = set()
+        self.closed = False
+        self.game_batches: Dict[str, str] = {}
+        self.batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.completed = 0
+        self.failed = 0
+
+    def create_batch(self, game_ids: List[str]) -> str:
+        batch_id = str(uuid.uuid4())
+        self.batches[batch_id] = {
+            "batch_id": batch_id,
+            "created_at": time.time(),
+            "games": {game_id: "created" for game_id in game_ids},
+        }
+        for game_id in game_ids:
+            self.game_batches[game_id] = batch_id
+        self._forget_finished_batches()
+        return batch_id
+
+    def enqueue(self, game_id: str, priority: int = 0) -> int:
+        """Queue a game; returns its 1-based queue position, or 0 when it started right away"""
+        order = next(self.order)
+        heapq.heappush(self.queue, (-priority, order, game_id))
+        self.queued[game_id] = priority
+        self.entries[game_id] = order
+        self._set_state(game_id, "queued")
+        position = sum(1 for p in self.queued.values() if p >= priority)
+        self._pump()
+        return 0 if game_id in self.running else position
+
+    def _pump(self) -> None:
+        while not self.closed and self.queue and len(self.running) < self.max_concurrent:
+            _, order, game_id = heapq.heappop(self.queue)
+            if self.entries.get(game_id) != order:
+                continue  # Cancelled while queued, or queued again with a newer entry
+            del self.entries[game_id]
+            del self.queued[game_id]
+            self.running[game_id] = time.time()
+            self._set_state(game_id, "running")
+            task = asyncio.create_task(self._run(game_id))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, game_id: str) -> None:
+        try:
+            await self.start_fn(game_id)
+            self.completed += 1
+            self._set_state(game_id, "completed")
+        except asyncio.CancelledError:
+            self._set_state(game_id, "cancelled")
+            raise
+        except Exception as e:
+            print(f"Scheduled game {game_id} failed: {e}")
+            self.failed += 1
+            self._set_state(game_id, "error")
+        finally:
+            self.running.pop(game_id, None)
+            self._pump()
+
+    async def close(self) -> None:
+        """Stop the running games and start no queued ones"""
+        self.closed = True
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cancel(self, game_id: str) -> bool:
+        """Remove a game that has not started yet from the queue"""
+        if self.queued.pop(game_id, None) is None:
+            return False
+        # Its heap entry stays behind and is skipped when popped
+        del self.entries[game_id]
+        self._set_state(game_id, "cancelled")
+        return True
+
+    def _set_state(self, game_id: str, state: str) -> None:
+        batch = self.batches.get(self.game_batches.get(game_id))
+        if batch is not None:
+            batch["games"][game_id] = state
+        if state in ("completed", "error", "cancelled"):
+            self.game_batches.pop(game_id, None)
+
+    def _forget_finished_batches(self) -> None:
+        for batch_id in list(self.batches):
+            if len(self.batches) <= MAX_TRACKED_BATCHES:
+                return
+            states = self.batches[batch_id]["games"].values()
+            if all(state in ("completed", "error", "cancelled") for state in states):
+                del self.batches[batch_id]
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+        counts: Dict[str, int] = {}
+        for state in batch["games"].values():
+            counts[state] = counts.get(state, 0) + 1
+        return {
+            "batch_id": batch_id,
+            "created_at": batch["created_at"],
+            "total": len(batch["games"]),
+            "counts": counts,
+            "games": dict(batch["games"]),
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        by_priority: Dict[int, int] = {}
+        for priority in self.queued.values():
+            by_priority[priority] = by_priority.get(priority, 0) + 1
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": len(self.running),
+            "queued": len(self.queued),
+            "queued_by_priority": {str(p): n for p, n in sorted(by_priority.items(), reverse=True)},
+            "completed": self.completed,
+            "failed": self.failed,
+            "running_games": [
+                {"game_id": game_id, "running_for": round(now - started, 1)}
+                for game_id, started in self.running.items()
+            ],
+            "batches": len(self.batches),
+        }
@@ -0,0 +1,278 @@
+import asyncio
+import multiprocessing
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from game import Game
+from llm_player import LLMPlayer
+from deck import format_cards
+from prompts import prompt_cache_stats
+
+# How often the API process checks that its worker processes are still alive
+WORKER_CHECK_INTERVAL = 1.0
+
+
+def game_snapshot(game: Game) -> Dict[str, Any]:
+    """The public state of a running game, as served by GET /games/{game_id}"""
+    return {
+        "current_stage": game.current_stage.value if hasattr(game, "current_stage") else None,
+        "hand_number": game.hand_number,
+        "pot": game.pot,
+        "community_cards": format_cards(game.community_cards) if getattr(game, "community_cards", None) else "",
+        "players": [
+            {
+                "name": player.name,
+                "chips": player.chips,
+                "status": player.status.value,
+                "position": player.position,
+                "is_dealer": player.is_dealer,
+                "is_sb": player.is_sb,
+                "is_bb": player.is_bb
+            }
+            for player in game.players
+        ]
+    }
+
+
+def build_game(spec: Dict[str, Any], callback=None) -> Game:
+    """
+    Build a Game from a picklable spec.
+
+    The spec holds the LLMPlayer keyword arguments for each player, the
+    blinds, the delays between actions, stages and hands, the deck seed and
+    num_hands.
+    """
+    players = [LLMPlayer(**player_spec) for player_spec in spec["players"]]
+    return Game(
+        players=players,
+        sb=spec["small_blind"],
+        bb=spec["big_blind"],
+        callback=callback,
+        delay_between_actions=spec["delay_between_actions"],
+        delay_between_stages=spec["delay_between_stages"],
+        delay_after_hand=spec["delay_after_hand"],
+        seed=spec.get("seed")
+    )
+
+
+async def _run_worker(inbox, outbox) -> None:
+    loop = asyncio.get_running_loop()
+    tasks: Dict[str, asyncio.Task] = {}
+    # Prompt cache counters are kept by the API process
+    prompt_cache_stats.on_record = lambda *counts: outbox.put(("prompt_cache", None, *counts))
+
+    async def play(game_id: str, spec: Dict[str, Any]):
+        async def callback(event_type: str, data: Dict[str, Any]):
+            outbox.put(("event", game_id, event_type, data, game_snapshot(game)))
+
+        game = build_game(spec, callback)
+        for player in game.players:
+            player.on_call_metrics = lambda call: outbox.put(("llm_call", game_id, game.hand_number, call))
+
+        try:
+            await game.play_game(spec["num_hands"])
+            outbox.put(("finished", game_id, None))
+        except Exception as e:
+            outbox.put(("finished", game_id, str(e) or repr(e)))
+        finally:
+            tasks.pop(game_id, None)
+
+    while True:
+        command = await loop.run_in_executor(None, inbox.get)
+        if command[0] == "stop":
+            break
+        if command[0] == "start":
+            game_id, spec = command[1], command[2]
+            tasks[game_id] = asyncio.create_task(play(game_id, spec))
+
+    for task in list(tasks.values()):
+        task.cancel()
+
+
+def worker_main(inbox, outbox) -> None:
+    """Entry point of a worker process: play every game it is sent until told to stop"""
+    asyncio.run(_run_worker(inbox, outbox))
+
+
+class RemoteGame:
+    """
+    API-side mirror of a game played in a worker process.
+
+    It holds the latest snapshot relayed with each event, plus the callback
+    that handles those events (broadcast, leaderboard tracking) in the API
+    process. Messages from the worker are handled in order by the game's own
+    task, so a callback that waits only holds up its own game.
+    """
+
+    def __init__(self, spec: Dict[str, Any], callback: Callable,
+                 on_llm_call: Optional[Callable[[int, Dict[str, Any]], None]] = None):
+        self.spec = spec
+        self.callback = callback
+        self.on_llm_call = on_llm_call
+        self.worker: Optional["GameWorker"] = None
+        self.done: Optional[asyncio.Future] = None
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.snapshot = {
+            "current_stage": "setup",
+            "hand_number": 0,
+            "pot": 0,
+            "community_cards": "",
+            "players": [
+                {
+                    "name": player_spec["name"],
+                    "chips": player_spec["chips"],
+                    "status": "active",
+                    "position": player_spec["position"],
+                    "is_dealer": False,
+                    "is_sb": False,
+                    "is_bb": False
+                }
+                for player_spec in spec["players"]
+            ]
+        }
+
+    @property
+    def hand_number(self) -> int:
+        return self.snapshot["hand_number"]
+
+    @property
+    def bb(self) -> int:
+        return self.spec["big_blind"]
+
+
+class GameWorker:
+    """One worker process and the games assigned to it"""
+
+    def __init__(self, context, outbox):
+        self.inbox = context.Queue()
+        self.process = context.Process(target=worker_main, args=(self.inbox, outbox), daemon=True)
+        self.process.start()
+        self.games: Dict[str, RemoteGame] = {}
+
+
+class GameWorkerPool:
+    """
+    Runs games in a pool of worker processes.
+
+    Each game goes to the worker with the fewest running games. Workers send
+    events, LLM call metrics and completion notices back over one shared
+    queue; a relay thread hands them to the event loop, where each is routed
+    to its RemoteGame and applied in order by that game's task. A worker that
+    dies fails its games and is replaced.
+    """
+
+    def __init__(self, num_workers: int):
+        self.num_workers = num_workers
+        self.context = multiprocessing.get_context("spawn")
+        self.outbox = self.context.Queue()
+        self.workers: List[GameWorker] = []
+        self.games: Dict[str, RemoteGame] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.messages: Optional[asyncio.Queue] = None
+        self.tasks: List[asyncio.Task] = []
+        self.relay_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.loop is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.messages = asyncio.Queue()
+        self.workers = [GameWorker(self.context, self.outbox) for _ in range(self.num_workers)]
+        self.relay_thread = threading.Thread(target=self._relay, daemon=True)
+        self.relay_thread.start()
+        self.tasks = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._monitor()),
+        ]
+
+    async def run_game(self, game_id: str, game: RemoteGame) -> None:
+        """Play a game in a worker process and wait for it to finish"""
+        self.start()
+        worker = min(self.workers, key=lambda w: len(w.games))
+        game.worker = worker
+        game.done = self.loop.create_future()
+        worker.games[game_id] = game
+        self.games[game_id] = game
+        handler = asyncio.create_task(self._handle_game(game_id, game))
+        worker.inbox.put(("start", game_id, game.spec))
+        try:
+            await game.done
+        finally:
+            handler.cancel()
+            worker.games.pop(game_id, None)
+            self.games.pop(game_id, None)
+
+    def _relay(self) -> None:
+        while True:
+            message = self.outbox.get()
+            if message is None:
+                return
+            self.loop.call_soon_threadsafe(self.messages.put_nowait, message)
+
+    async def _dispatch(self) -> None:
+        """Route each message to its game's queue without waiting on any game"""
+        while True:
+            message = await self.messages.get()
+            if message[0] == "prompt_cache":
+                prompt_cache_stats.record_tokens(*message[2:])
+                continue
+            game = self.games.get(message[1])
+            if game is not None:
+                game.messages.put_nowait(message)
+
+    async def _handle_game(self, game_id: str, game: RemoteGame) -> None:
+        while True:
+            message = await game.messages.get()
+            try:
+                if message[0] == "event":
+                    _, _, event_type, data, snapshot = message
+                    game.snapshot = snapshot
+                    await game.callback(event_type, data)
+                elif message[0] == "llm_call":
+                    if game.on_llm_call is not None:
+                        game.on_llm_call(message[2], message[3])
+                elif message[0] == "finished" and not game.done.done():
+                    if message[2] is None:
+                        game.done.set_result(None)
+                    else:
+                        game.done.set_exception(RuntimeError(message[2]))
+            except Exception as e:
+                print(f"Error handling {message[0]} from game {game_id}: {e}")
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(WORKER_CHECK_INTERVAL)
+            for i, worker in enumerate(self.workers):
+                if worker.process.is_alive():
+                    continue
+                print(f"Game worker {worker.process.pid} exited with code {worker.process.exitcode}")
+                for game in list(worker.games.values()):
+                    if not game.done.done():
+                        game.done.set_exception(RuntimeError("Game worker process died"))
+                self.workers[i] = GameWorker(self.context, self.outbox)
+
+    def close(self) -> None:
+        """Stop the workers and the relay thread"""
+        for task in self.tasks:
+            task.cancel()
+        for worker in self.workers:
+            if worker.process.is_alive():
+                worker.inbox.put(("stop",))
+        for worker in self.workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        if self.relay_thread is not None:
+            self.outbox.put(None)
+            self.relay_thread.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": [
+                {"pid": worker.process.pid, "alive": worker.process.is_alive(), "games": len(worker.games)}
+                for worker in self.workers
+            ],
+            "running_games": len(self.games),
+            "queued_messages": (self.messages.qsize() if self.messages is not None else 0)
+                               + sum(game.messages.qsize() for game in self.games.values())
+        }
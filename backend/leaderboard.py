@@ -1,38 +1,74 @@
 import sqlite3
 import os
-from typing import List, Dict, Any, Optional, Tuple
+import json
+import base64
+import heapq
+import queue
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from contextlib import contextmanager
 
-class LeaderboardManager:
-    """Manages the leaderboard data for LLM poker performances."""
-    
-    # Class-level connection to avoid multiple connections
-    _conn = None
-    
-    def __init__(self, db_path="leaderboard.db"):
-        self.db_path = db_path
-        self._initialize_db()
-    
-    def _initialize_db(self):
-        """Create the database tables if they don't exist."""
-        # Create a new connection only if we don't have one
-        if LeaderboardManager._conn is None:
-            LeaderboardManager._conn = sqlite3.connect(self.db_path, timeout=60.0, check_same_thread=False)
-            LeaderboardManager._conn.execute("PRAGMA busy_timeout = 60000")  # 60 seconds timeout
-        
-        cursor = LeaderboardManager._conn.cursor()
-        
+# Read-only connections kept for leaderboard queries
+READ_POOL_SIZE = int(os.getenv("LEADERBOARD_READ_POOL_SIZE", "4"))
+
+# Applied to every connection: wait on locks, 16 MB page cache, 256 MB memory-mapped I/O
+CONNECTION_PRAGMAS = [
+    "PRAGMA busy_timeout = 60000",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+]
+
+# Rows fetched at a time while streaming an export
+EXPORT_FETCH_SIZE = 500
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque pagination cursor holding the sort key of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+# Recomputes model_aggregates from hand_results (migration 3 and rebuild_aggregates())
+AGGREGATES_REBUILD_SQL = '''
+INSERT INTO model_aggregates
+    (model_id, is_official, games_played, hands_played, hands_won, net_profit, big_blinds)
+SELECT
+    hr.model_id,
+    g.is_official,
+    COUNT(DISTINCT hr.game_id),
+    COUNT(hr.id),
+    SUM(CASE WHEN hr.won_hand = 1 THEN 1 ELSE 0 END),
+    SUM(hr.profit_loss),
+    SUM(hr.big_blind)
+FROM hand_results hr
+JOIN games g ON hr.game_id = g.id
+GROUP BY hr.model_id, g.is_official
+'''
+
+# Schema migrations, applied in order. The database's PRAGMA user_version holds
+# the number of migrations already applied, so existing databases are upgraded
+# in place. Append new migrations; never edit one that has shipped.
+MIGRATIONS: List[List[str]] = [
+    # 1: initial schema
+    [
         # Create models table
-        cursor.execute('''
+        '''
         CREATE TABLE IF NOT EXISTS models (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE NOT NULL,
             description TEXT
         )
-        ''')
-        
+        ''',
         # Create games table with official flag
-        cursor.execute('''
+        '''
         CREATE TABLE IF NOT EXISTS games (
             id TEXT PRIMARY KEY,
             start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -44,10 +80,9 @@ class LeaderboardManager:
             status TEXT NOT NULL,
             is_official BOOLEAN NOT NULL DEFAULT 0
         )
-        ''')
-        
+        ''',
         # Create game_participants table to track which models played in each game
-        cursor.execute('''
+        '''
         CREATE TABLE IF NOT EXISTS game_participants (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             game_id TEXT NOT NULL,
@@ -56,10 +91,9 @@ class LeaderboardManager:
             FOREIGN KEY (game_id) REFERENCES games (id),
             FOREIGN KEY (model_id) REFERENCES models (id)
         )
-        ''')
-        
+        ''',
         # Create hand_results table to track individual hand results
-        cursor.execute('''
+        '''
         CREATE TABLE IF NOT EXISTS hand_results (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             game_id TEXT NOT NULL,
@@ -73,54 +107,269 @@ class LeaderboardManager:
             FOREIGN KEY (game_id) REFERENCES games (id),
             FOREIGN KEY (model_id) REFERENCES models (id)
         )
-        ''')
+        ''',
+        # Create llm_calls table to track latency, tokens and cost of each LLM decision
+        '''
+        CREATE TABLE IF NOT EXISTS llm_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id TEXT NOT NULL,
+            hand_number INTEGER NOT NULL,
+            model_id INTEGER NOT NULL,
+            player_name TEXT NOT NULL,
+            wall_time REAL NOT NULL,
+            provider_time REAL NOT NULL,
+            attempts INTEGER NOT NULL,
+            input_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            cached_tokens INTEGER NOT NULL,
+            cost REAL,
+            parse_failures TEXT,
+            defaulted_to_fold BOOLEAN NOT NULL,
+            FOREIGN KEY (game_id) REFERENCES games (id),
+            FOREIGN KEY (model_id) REFERENCES models (id)
+        )
+        ''',
+        # Create game_summaries table holding compact records of games evicted from memory
+        '''
+        CREATE TABLE IF NOT EXISTS game_summaries (
+            game_id TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            evicted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ],
+    # 2: indexes for the per-model, per-game and recent-game queries
+    [
+        # Covers the per-model hand aggregates without touching the table
+        "CREATE INDEX IF NOT EXISTS idx_hand_results_model_game ON hand_results (model_id, game_id, profit_loss, won_hand, big_blind)",
+        "CREATE INDEX IF NOT EXISTS idx_hand_results_game_model ON hand_results (game_id, model_id)",
+        "CREATE INDEX IF NOT EXISTS idx_game_participants_game_model ON game_participants (game_id, model_id)",
+        "CREATE INDEX IF NOT EXISTS idx_game_participants_model_game ON game_participants (model_id, game_id, final_chips)",
+        "CREATE INDEX IF NOT EXISTS idx_games_official_status_end ON games (is_official, status, end_time)",
+        "CREATE INDEX IF NOT EXISTS idx_games_start_time ON games (start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_llm_calls_game_model ON llm_calls (game_id, model_id)",
+    ],
+    # 3: per-model totals kept up to date with every hand, so the leaderboard reads a few rows
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS model_aggregates (
+            model_id INTEGER NOT NULL,
+            is_official BOOLEAN NOT NULL,
+            games_played INTEGER NOT NULL,
+            hands_played INTEGER NOT NULL,
+            hands_won INTEGER NOT NULL,
+            net_profit INTEGER NOT NULL,
+            big_blinds INTEGER NOT NULL,
+            PRIMARY KEY (model_id, is_official),
+            FOREIGN KEY (model_id) REFERENCES models (id)
+        )
+        ''',
+        AGGREGATES_REBUILD_SQL,
+    ],
+    # 4: keyset pagination of games on (start_time, id)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_games_start_time_id ON games (start_time, id)",
+        "DROP INDEX IF EXISTS idx_games_start_time",
+    ],
+    # 5: totals of the hands moved to archive databases, still counted by model_aggregates
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS archived_aggregates (
+            model_id INTEGER NOT NULL,
+            is_official BOOLEAN NOT NULL,
+            games_played INTEGER NOT NULL,
+            hands_played INTEGER NOT NULL,
+            hands_won INTEGER NOT NULL,
+            net_profit INTEGER NOT NULL,
+            big_blinds INTEGER NOT NULL,
+            PRIMARY KEY (model_id, is_official),
+            FOREIGN KEY (model_id) REFERENCES models (id)
+        )
+        ''',
+    ],
+]
+
+# Adds the archived totals to model_aggregates after it is rebuilt from the hands still in the database
+ARCHIVED_AGGREGATES_MERGE_SQL = '''
+INSERT INTO model_aggregates
+    (model_id, is_official, games_played, hands_played, hands_won, net_profit, big_blinds)
+SELECT model_id, is_official, games_played, hands_played, hands_won, net_profit, big_blinds
+FROM archived_aggregates
+WHERE 1
+ON CONFLICT (model_id, is_official) DO UPDATE SET
+    games_played = games_played + excluded.games_played,
+    hands_played = hands_played + excluded.hands_played,
+    hands_won = hands_won + excluded.hands_won,
+    net_profit = net_profit + excluded.net_profit,
+    big_blinds = big_blinds + excluded.big_blinds
+'''
+
+# Tables whose rows move to an archive database with their game, children first
+ARCHIVED_TABLES = ["llm_calls", "hand_results", "game_participants", "games"]
+
+# Archive databases attached to one connection (SQLite's default limit is 10); reads that
+# include more archives query them in groups on separate connections and merge the rows
+MAX_ATTACHED_ARCHIVES = 9
+
+class LeaderboardManager:
+    """Manages the leaderboard data for LLM poker performances."""
+    
+    # Class-level connections shared by every manager: one writer, serialized by
+    # _write_lock, and a pool of read-only connections. In WAL mode readers see
+    # the last committed data and never wait on the writer.
+    _conn = None
+    _conn_path = None
+    _write_lock = threading.RLock()
+    _readers: "queue.LifoQueue" = queue.LifoQueue()
+    _reader_count = 0
+    _generation = 0
+    _pool_lock = threading.Lock()
+    # Model name -> id for the open database, loaded at startup and filled on insert
+    _model_ids: Dict[str, int] = {}
+    # Bumped after every commit that changes leaderboard, stats or game list results
+    _write_version = 0
+    
+    def __init__(self, db_path="leaderboard.db"):
+        self.db_path = db_path
+        self._initialize_db()
+    
+    def _open_writer(self):
+        """Open the shared writer connection (and retire readers of any previous database)."""
+        conn = sqlite3.connect(self.db_path, timeout=60.0, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        # Readers no longer block the writer, and commits only fsync at checkpoints
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        
+        with LeaderboardManager._pool_lock:
+            LeaderboardManager._generation += 1
+            LeaderboardManager._reader_count = 0
+            while True:
+                try:
+                    LeaderboardManager._readers.get_nowait()[1].close()
+                except queue.Empty:
+                    break
+            LeaderboardManager._conn = conn
+            LeaderboardManager._conn_path = self.db_path
+            LeaderboardManager._model_ids = {}
+            LeaderboardManager._write_version += 1
+    
+    def _open_reader(self):
+        uri = Path(LeaderboardManager._conn_path).absolute().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=60.0, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+    
+    def _initialize_db(self):
+        """Create the database tables, or bring an existing database up to the latest schema."""
+        # Create a new connection only if we don't have one
+        if LeaderboardManager._conn is None:
+            self._open_writer()
         
-        LeaderboardManager._conn.commit()
+        with self._get_connection() as conn:
+            self._migrate(conn)
+            LeaderboardManager._model_ids = {
+                name: model_id for model_id, name in conn.execute("SELECT id, name FROM models")
+            }
+    
+    def _migrate(self, conn) -> None:
+        """Apply the migrations newer than the database's user_version, each in its own transaction."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS, start=1):
+            if number <= version:
+                continue
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+            print(f"Leaderboard database migrated to schema version {number}")
+        if version < len(MIGRATIONS):
+            # Refresh the query planner's statistics for the new indexes
+            conn.execute("PRAGMA optimize")
+    
+    @property
+    def write_version(self) -> int:
+        """Counter that changes whenever cached leaderboard results may be stale."""
+        return LeaderboardManager._write_version
     
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections."""
-        # If we don't have a connection, create one
+        """Context manager for the writer connection, held by one thread at a time."""
+        with LeaderboardManager._write_lock:
+            # If we don't have a connection, create one
+            if LeaderboardManager._conn is None:
+                self._open_writer()
+            conn = LeaderboardManager._conn
+            try:
+                yield conn
+            except Exception:
+                # Don't leave a half-written transaction open on the shared connection, and
+                # forget ids of models whose insert may have just been rolled back
+                conn.rollback()
+                LeaderboardManager._model_ids = {}
+                raise
+    
+    @contextmanager
+    def _read_connection(self):
+        """Context manager for a pooled read-only connection."""
         if LeaderboardManager._conn is None:
-            LeaderboardManager._conn = sqlite3.connect(self.db_path, timeout=60.0, check_same_thread=False)
-            LeaderboardManager._conn.execute("PRAGMA busy_timeout = 60000")
+            with LeaderboardManager._write_lock:
+                if LeaderboardManager._conn is None:
+                    self._open_writer()
+        
+        with LeaderboardManager._pool_lock:
+            generation = LeaderboardManager._generation
+            pooled = True
+            try:
+                conn = LeaderboardManager._readers.get_nowait()[1]
+            except queue.Empty:
+                conn = None
+                if LeaderboardManager._reader_count < READ_POOL_SIZE:
+                    LeaderboardManager._reader_count += 1
+                    conn = self._open_reader()
+        if conn is None:
+            # Never wait for a reader to come back: callers run on the event loop.
+            # A busy pool gets an extra reader that is closed after use.
+            pooled = False
+            conn = self._open_reader()
         
         try:
-            yield LeaderboardManager._conn
-        except sqlite3.OperationalError as e:
-            # If we get a database locked error, close and reopen the connection
-            if "database is locked" in str(e):
-                print("Database lock detected, recreating connection...")
+            yield conn
+        finally:
+            # A reader of a database that has since been replaced is dropped
+            with LeaderboardManager._pool_lock:
+                if pooled and generation == LeaderboardManager._generation:
+                    LeaderboardManager._readers.put((generation, conn))
+                else:
+                    conn.close()
+    
+    @classmethod
+    def close_connections(cls) -> None:
+        """Close the writer and every pooled reader."""
+        with cls._write_lock, cls._pool_lock:
+            cls._generation += 1
+            cls._reader_count = 0
+            while True:
                 try:
-                    LeaderboardManager._conn.close()
-                except:
-                    pass
-                LeaderboardManager._conn = sqlite3.connect(self.db_path, timeout=60.0, check_same_thread=False)
-                LeaderboardManager._conn.execute("PRAGMA busy_timeout = 60000")
-                # Retry the operation with new connection
-                yield LeaderboardManager._conn
-            else:
-                raise
+                    cls._readers.get_nowait()[1].close()
+                except queue.Empty:
+                    break
+            if cls._conn is not None:
+                cls._conn.close()
+                cls._conn = None
     
     def register_model(self, name: str, description: Optional[str] = None) -> int:
         """Register a new model in the leaderboard or get existing model id."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Check if model already exists
-            cursor.execute("SELECT id FROM models WHERE name = ?", (name,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                return existing[0]
-            
-            # Insert new model
-            cursor.execute(
-                "INSERT INTO models (name, description) VALUES (?, ?)",
-                (name, description)
-            )
+            model_id = self._model_id(cursor, name, description)
             conn.commit()
-            return cursor.lastrowid
+            LeaderboardManager._write_version += 1
+            return model_id
     
     def register_game(self, game_id: str, starting_chips: int, small_blind: int, 
                       big_blind: int, num_hands: int, models: List[str], is_official: bool = False) -> None:
@@ -136,13 +385,14 @@ class LeaderboardManager:
             
             # Register and link model participants
             for model_name in models:
-                model_id = self.register_model(model_name)
+                model_id = self._model_id(cursor, model_name)
                 cursor.execute(
                     "INSERT INTO game_participants (game_id, model_id) VALUES (?, ?)",
                     (game_id, model_id)
                 )
             
             conn.commit()
+            LeaderboardManager._write_version += 1
     
     def record_hand_result(self, game_id: str, hand_number: int, 
                           model_name: str, profit_loss: int, won_hand: bool,
@@ -150,26 +400,341 @@ class LeaderboardManager:
         """Record the result of a hand for a specific model."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Get model_id
+            self._insert_hand_result(cursor, game_id, hand_number, model_name, profit_loss, won_hand,
+                                     starting_chips, ending_chips, big_blind)
+            conn.commit()
+            LeaderboardManager._write_version += 1
+    
+    def record_llm_call(self, game_id: str, hand_number: int, call: Dict[str, Any]) -> None:
+        """Record the metrics of one LLM decision (see llm_metrics.LLMCallMetrics)."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            self._insert_llm_call(cursor, game_id, hand_number, call)
+            conn.commit()
+    
+    def write_batch(self, records: List[Tuple[str, tuple]]) -> None:
+        """Write queued hand results and LLM calls in a single transaction (see LeaderboardWriter)."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for kind, args in records:
+                if kind == "hand_result":
+                    self._insert_hand_result(cursor, *args)
+                elif kind == "llm_call":
+                    self._insert_llm_call(cursor, *args)
+                else:
+                    raise ValueError(f"Unknown leaderboard record type: {kind}")
+            conn.commit()
+            if any(kind == "hand_result" for kind, _ in records):
+                LeaderboardManager._write_version += 1
+    
+    def _lookup_model_id(self, cursor, model_name: str) -> Optional[int]:
+        """Id of a registered model, from the cache when possible."""
+        model_id = LeaderboardManager._model_ids.get(model_name)
+        if model_id is None:
             cursor.execute("SELECT id FROM models WHERE name = ?", (model_name,))
             model_result = cursor.fetchone()
-            if not model_result:
-                model_id = self.register_model(model_name)
-            else:
-                model_id = model_result[0]
-            
-            # Insert hand result
+            if model_result:
+                model_id = LeaderboardManager._model_ids[model_name] = model_result[0]
+        return model_id
+    
+    def _model_id(self, cursor, model_name: str, description: Optional[str] = None) -> int:
+        """Id of a model, registering it in the caller's transaction if it is new."""
+        model_id = LeaderboardManager._model_ids.get(model_name)
+        if model_id is not None:
+            return model_id
+        cursor.execute(
+            "INSERT INTO models (name, description) VALUES (?, ?) ON CONFLICT (name) DO NOTHING",
+            (model_name, description)
+        )
+        cursor.execute("SELECT id FROM models WHERE name = ?", (model_name,))
+        model_id = LeaderboardManager._model_ids[model_name] = cursor.fetchone()[0]
+        return model_id
+    
+    def _insert_hand_result(self, cursor, game_id: str, hand_number: int, 
+                            model_name: str, profit_loss: int, won_hand: bool,
+                            starting_chips: int, ending_chips: int, big_blind: int) -> None:
+        model_id = self._model_id(cursor, model_name)
+        
+        # Whether the game counts as official, and whether this is the model's first hand in it
+        cursor.execute(
+            """SELECT is_official,
+                      EXISTS (SELECT 1 FROM hand_results WHERE game_id = ? AND model_id = ?)
+               FROM games WHERE id = ?""",
+            (game_id, model_id, game_id)
+        )
+        game = cursor.fetchone()
+        
+        cursor.execute(
+            """INSERT INTO hand_results 
+               (game_id, hand_number, model_id, profit_loss, won_hand, 
+                starting_chips, ending_chips, big_blind) 
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (game_id, hand_number, model_id, profit_loss, won_hand, 
+             starting_chips, ending_chips, big_blind)
+        )
+        
+        # Hands of unregistered games never reach the leaderboard, so they aren't aggregated
+        if game is not None:
             cursor.execute(
-                """INSERT INTO hand_results 
-                   (game_id, hand_number, model_id, profit_loss, won_hand, 
-                    starting_chips, ending_chips, big_blind) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (game_id, hand_number, model_id, profit_loss, won_hand, 
-                 starting_chips, ending_chips, big_blind)
+                """INSERT INTO model_aggregates
+                   (model_id, is_official, games_played, hands_played, hands_won, net_profit, big_blinds)
+                   VALUES (?, ?, ?, 1, ?, ?, ?)
+                   ON CONFLICT (model_id, is_official) DO UPDATE SET
+                       games_played = games_played + excluded.games_played,
+                       hands_played = hands_played + 1,
+                       hands_won = hands_won + excluded.hands_won,
+                       net_profit = net_profit + excluded.net_profit,
+                       big_blinds = big_blinds + excluded.big_blinds""",
+                (model_id, game[0], 0 if game[1] else 1, int(bool(won_hand)), profit_loss, big_blind)
             )
-            
+    
+    def _insert_llm_call(self, cursor, game_id: str, hand_number: int, call: Dict[str, Any]) -> None:
+        model_id = self._model_id(cursor, call["model_name"])
+        cursor.execute(
+            """INSERT INTO llm_calls
+               (game_id, hand_number, model_id, player_name, wall_time, provider_time,
+                attempts, input_tokens, output_tokens, cached_tokens, cost,
+                parse_failures, defaulted_to_fold)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (game_id, hand_number, model_id, call["player_name"], call["wall_time"],
+             call["provider_time"], call["attempts"], call["input_tokens"],
+             call["output_tokens"], call["cached_tokens"], call["cost"],
+             ",".join(call["parse_failures"]), call["defaulted_to_fold"])
+        )
+    
+    def rebuild_aggregates(self) -> None:
+        """Recompute model_aggregates from hand_results plus the totals of archived hands."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM model_aggregates")
+            cursor.execute(AGGREGATES_REBUILD_SQL)
+            cursor.execute(ARCHIVED_AGGREGATES_MERGE_SQL)
             conn.commit()
+            LeaderboardManager._write_version += 1
+    
+    def check_aggregates(self) -> List[Dict[str, Any]]:
+        """Compare model_aggregates with totals recomputed from hand_results (plus archived totals); returns the rows that differ."""
+        columns = ["games_played", "hands_played", "hands_won", "net_profit", "big_blinds"]
+        expected_query = AGGREGATES_REBUILD_SQL[AGGREGATES_REBUILD_SQL.index("SELECT"):]
+        # The writer connection is held throughout, so both sides see the same hands
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(expected_query)
+            expected = {(row[0], row[1]): row[2:] for row in cursor.fetchall()}
+            cursor.execute(f"SELECT model_id, is_official, {', '.join(columns)} FROM archived_aggregates")
+            for row in cursor.fetchall():
+                current = expected.get((row[0], row[1]), (0,) * len(columns))
+                expected[(row[0], row[1])] = tuple(a + b for a, b in zip(current, row[2:]))
+            cursor.execute(f"SELECT model_id, is_official, {', '.join(columns)} FROM model_aggregates")
+            stored = {(row[0], row[1]): row[2:] for row in cursor.fetchall()}
+            cursor.execute("SELECT id, name FROM models")
+            names = dict(cursor.fetchall())
+        
+        mismatches = []
+        for key in sorted(set(expected) | set(stored)):
+            if expected.get(key) != stored.get(key):
+                mismatches.append({
+                    "model_name": names.get(key[0]),
+                    "is_official": bool(key[1]),
+                    "stored": dict(zip(columns, stored[key])) if key in stored else None,
+                    "expected": dict(zip(columns, expected[key])) if key in expected else None
+                })
+        return mismatches
+    
+    def archive_dir(self) -> str:
+        """Directory of the archive databases: LEADERBOARD_ARCHIVE_DIR, or archive/ next to the database."""
+        return os.getenv("LEADERBOARD_ARCHIVE_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(LeaderboardManager._conn_path or self.db_path)), "archive"
+        )
+    
+    def list_archives(self) -> List[str]:
+        """Paths of the archive databases, newest period first."""
+        directory = self.archive_dir()
+        if not os.path.isdir(directory):
+            return []
+        names = [name for name in os.listdir(directory) if name.startswith("leaderboard-") and name.endswith(".db")]
+        return [os.path.join(directory, name) for name in sorted(names, reverse=True)]
+    
+    def archive_games(self, before: Optional[str] = None, exhibition_only: bool = False,
+                      period: str = "month") -> Dict[str, int]:
+        """
+        Move completed games, with their participants, hands and LLM calls, to per-period archive databases.
+        
+        Each archive (archive_dir()/leaderboard-<YYYY-MM or YYYY>.db, by the
+        game's end_time) has the full schema, so it can be opened on its own.
+        model_aggregates keeps counting the moved hands: their totals are added
+        to archived_aggregates, which rebuild_aggregates() includes. Rows are
+        copied to the archive and committed before they are deleted here, so
+        an interrupted run can simply be repeated.
+        
+        Args:
+            before: Archive games that ended before this time ('YYYY-MM-DD[ HH:MM:SS]')
+            exhibition_only: Only archive exhibition (non-official) games
+            period: 'month' or 'year', the span of games kept in one archive file
+        
+        Returns the number of games moved to each archive file.
+        """
+        if before is None and not exhibition_only:
+            raise ValueError("Give a cutoff time, exhibition games only, or both")
+        if period not in ("month", "year"):
+            raise ValueError("period must be 'month' or 'year'")
+        
+        conditions = ["status = 'completed'"]
+        params: list = []
+        if before is not None:
+            conditions.append("end_time < ?")
+            params.append(before)
+        if exhibition_only:
+            conditions.append("is_official = 0")
+        
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id, end_time FROM games WHERE {' AND '.join(conditions)}", params)
+            by_period: Dict[str, List[str]] = {}
+            for game_id, end_time in cursor.fetchall():
+                by_period.setdefault(end_time[:7] if period == "month" else end_time[:4], []).append(game_id)
+        
+        os.makedirs(self.archive_dir(), exist_ok=True)
+        moved = {}
+        for key, game_ids in sorted(by_period.items()):
+            path = os.path.join(self.archive_dir(), f"leaderboard-{key}.db")
+            self._archive_to(path, game_ids)
+            moved[path] = len(game_ids)
+        return moved
+    
+    def _archive_to(self, path: str, game_ids: List[str]) -> None:
+        archive = sqlite3.connect(path, timeout=60.0)
+        try:
+            self._migrate(archive)
+        finally:
+            archive.close()
+        
+        with self._get_connection() as conn:
+            conn.execute("ATTACH DATABASE ? AS archive", (path,))
+            try:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM temp.archive_ids")
+                conn.executemany("INSERT INTO temp.archive_ids (id) VALUES (?)", [(game_id,) for game_id in game_ids])
+                
+                # 1. Copy (ids included, so a repeated run adds nothing twice)
+                conn.execute("INSERT OR IGNORE INTO archive.models SELECT * FROM main.models")
+                for table in reversed(ARCHIVED_TABLES):
+                    key = "id" if table == "games" else "game_id"
+                    conn.execute(f"""INSERT OR IGNORE INTO archive.{table}
+                                     SELECT * FROM main.{table} WHERE {key} IN (SELECT id FROM temp.archive_ids)""")
+                conn.commit()
+                
+                # 2. Carry the moved hands' totals over, then delete the rows here
+                hot_totals = AGGREGATES_REBUILD_SQL.replace("INSERT INTO model_aggregates", "INSERT INTO archived_aggregates")
+                hot_totals = hot_totals.replace("GROUP BY", "WHERE hr.game_id IN (SELECT id FROM temp.archive_ids)\nGROUP BY")
+                conn.execute(hot_totals + '''
+                    ON CONFLICT (model_id, is_official) DO UPDATE SET
+                        games_played = games_played + excluded.games_played,
+                        hands_played = hands_played + excluded.hands_played,
+                        hands_won = hands_won + excluded.hands_won,
+                        net_profit = net_profit + excluded.net_profit,
+                        big_blinds = big_blinds + excluded.big_blinds
+                ''')
+                for table in ARCHIVED_TABLES:
+                    key = "id" if table == "games" else "game_id"
+                    conn.execute(f"DELETE FROM main.{table} WHERE {key} IN (SELECT id FROM temp.archive_ids)")
+                conn.execute("DELETE FROM temp.archive_ids")
+                conn.commit()
+                LeaderboardManager._write_version += 1
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.execute("DETACH DATABASE archive")
+        
+        # The archive's own totals, for opening it on its own
+        archive = sqlite3.connect(path, timeout=60.0)
+        try:
+            archive.execute("DELETE FROM model_aggregates")
+            archive.execute(AGGREGATES_REBUILD_SQL)
+            archive.commit()
+        finally:
+            archive.close()
+    
+    @contextmanager
+    def _archive_read_connection(self, archives: Optional[List[str]] = None, include_main: bool = True):
+        """
+        Read-only connection of its own, outside the pool, where games,
+        game_participants and hand_results are the rows of the given archive
+        databases (at most MAX_ATTACHED_ARCHIVES), plus the main database's
+        unless include_main is False.
+        """
+        if LeaderboardManager._conn is None:
+            with LeaderboardManager._write_lock:
+                if LeaderboardManager._conn is None:
+                    self._open_writer()
+        
+        uri = Path(LeaderboardManager._conn_path).absolute().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=60.0, check_same_thread=False)
+        try:
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            schemas = ["main"] if include_main else []
+            archives = archives or []
+            for i, path in enumerate(archives):
+                conn.execute(f"ATTACH DATABASE ? AS archive{i}", (Path(path).absolute().as_uri() + "?mode=ro",))
+                schemas.append(f"archive{i}")
+            # Temporary views shadow the main tables for unqualified names
+            for table in ("games", "game_participants", "hand_results") if archives else ():
+                union = " UNION ALL ".join(f"SELECT * FROM {schema}.{table}" for schema in schemas)
+                conn.execute(f"CREATE TEMP VIEW {table} AS {union}")
+            yield conn
+        finally:
+            conn.close()
+    
+    def get_game_llm_costs(self, game_id: str) -> List[Dict[str, Any]]:
+        """Per-model latency, token and cost totals for a game's recorded LLM calls."""
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+            SELECT 
+                m.name,
+                COUNT(lc.id) AS calls,
+                SUM(lc.attempts) - COUNT(lc.id) AS retries,
+                SUM(CASE WHEN lc.defaulted_to_fold = 1 THEN 1 ELSE 0 END) AS defaulted_to_fold,
+                ROUND(AVG(lc.wall_time), 4) AS avg_wall_time,
+                ROUND(MAX(lc.wall_time), 4) AS max_wall_time,
+                ROUND(AVG(lc.provider_time), 4) AS avg_provider_time,
+                SUM(lc.input_tokens) AS input_tokens,
+                SUM(lc.output_tokens) AS output_tokens,
+                SUM(lc.cached_tokens) AS cached_tokens,
+                SUM(lc.cost) AS cost,
+                SUM(CASE WHEN lc.cost IS NULL THEN 1 ELSE 0 END) AS unpriced_calls
+            FROM 
+                llm_calls lc
+            JOIN
+                models m ON lc.model_id = m.id
+            WHERE
+                lc.game_id = ?
+            GROUP BY
+                m.id
+            ORDER BY
+                cost DESC
+            """, (game_id,))
+            
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    "model_name": row[0],
+                    "calls": row[1],
+                    "retries": row[2],
+                    "defaulted_to_fold": row[3],
+                    "avg_wall_time": row[4],
+                    "max_wall_time": row[5],
+                    "avg_provider_time": row[6],
+                    "input_tokens": row[7],
+                    "output_tokens": row[8],
+                    "cached_tokens": row[9],
+                    "cost": round(row[10], 6) if row[10] is not None else None,
+                    "unpriced_calls": row[11]
+                })
+            
+            return results
     
     def complete_game(self, game_id: str, final_chips: Dict[str, int]) -> None:
         """Mark a game as completed and record final chip counts."""
@@ -184,12 +749,8 @@ class LeaderboardManager:
             
             # Update final chip counts for participants
             for model_name, chips in final_chips.items():
-                # Get model_id
-                cursor.execute("SELECT id FROM models WHERE name = ?", (model_name,))
-                model_result = cursor.fetchone()
-                if model_result:
-                    model_id = model_result[0]
-                    
+                model_id = self._lookup_model_id(cursor, model_name)
+                if model_id is not None:
                     # Update participant record
                     cursor.execute(
                         "UPDATE game_participants SET final_chips = ? WHERE game_id = ? AND model_id = ?",
@@ -197,6 +758,25 @@ class LeaderboardManager:
                     )
             
             conn.commit()
+            LeaderboardManager._write_version += 1
+    
+    def save_game_summary(self, game_id: str, summary: Dict[str, Any]) -> None:
+        """Store the compact summary of a game that is being evicted from memory."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO game_summaries (game_id, summary) VALUES (?, ?)",
+                (game_id, json.dumps(summary))
+            )
+            conn.commit()
+    
+    def get_game_summary(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """Get the stored summary of an evicted game, if any."""
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT summary FROM game_summaries WHERE game_id = ?", (game_id,))
+            row = cursor.fetchone()
+            return json.loads(row[0]) if row else None
     
     def get_leaderboard(self, limit: int = 10, official_only: bool = True) -> List[Dict[str, Any]]:
         """
@@ -209,32 +789,31 @@ class LeaderboardManager:
             limit: Maximum number of results to return
             official_only: If True, only includes results from official games
         """
-        with self._get_connection() as conn:
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             
+            # Read from the per-model totals maintained with every hand (see model_aggregates)
             query = """
             SELECT 
                 m.name AS model_name,
-                COUNT(DISTINCT hr.game_id) AS games_played,
-                COUNT(hr.id) AS hands_played,
-                SUM(hr.profit_loss) AS net_profit,
-                SUM(CASE WHEN hr.won_hand = 1 THEN 1 ELSE 0 END) AS hands_won,
-                ROUND(SUM(CASE WHEN hr.won_hand = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(hr.id), 2) AS win_rate,
-                ROUND(SUM(hr.profit_loss) * 100.0 / SUM(hr.big_blind) / COUNT(hr.id), 2) AS bb_per_100
+                SUM(a.games_played) AS games_played,
+                SUM(a.hands_played) AS hands_played,
+                SUM(a.net_profit) AS net_profit,
+                SUM(a.hands_won) AS hands_won,
+                ROUND(SUM(a.hands_won) * 100.0 / SUM(a.hands_played), 2) AS win_rate,
+                ROUND(SUM(a.net_profit) * 100.0 / SUM(a.big_blinds) / SUM(a.hands_played), 2) AS bb_per_100
             FROM 
-                models m
+                model_aggregates a
             JOIN 
-                hand_results hr ON m.id = hr.model_id
-            JOIN
-                games g ON hr.game_id = g.id
+                models m ON m.id = a.model_id
             WHERE
                 {}
             GROUP BY 
-                m.id
+                a.model_id
             ORDER BY 
                 net_profit DESC
             LIMIT ?
-            """.format("g.is_official = 1" if official_only else "1=1")
+            """.format("a.is_official = 1" if official_only else "1=1")
             
             cursor.execute(query, (limit,))
             results = []
@@ -254,12 +833,57 @@ class LeaderboardManager:
     
     def get_all_games(self, limit: int = 50, include_in_progress: bool = False) -> List[Dict[str, Any]]:
         """Get a list of all games with their details."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            status_filter = "" if include_in_progress else "WHERE g.status = 'completed'"
-            
-            query = f"""
+        return self.get_games_page(limit=limit, include_in_progress=include_in_progress)[0]
+    
+    def get_games_page(self, limit: int = 50, include_in_progress: bool = False,
+                       after: Optional[str] = None,
+                       include_archives: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of games, newest first, and the cursor of the next page.
+        
+        Pages are keyed on (start_time, id) rather than an offset, so each page
+        costs the same however deep into the history it is.
+        
+        Args:
+            limit: Maximum number of games to return
+            include_in_progress: Whether to include games that haven't finished
+            after: Cursor returned with the previous page
+            include_archives: Whether to include games moved to archive databases
+        """
+        query, params = self._games_query(include_in_progress, decode_cursor(after) if after else None)
+        if include_archives:
+            rows = self._history_rows(query + " LIMIT ?", params + [limit], self._game_row, True,
+                                      key=self._game_key, reverse=True)
+            results = [row for _, row in zip(range(limit), rows)]
+            rows.close()
+        else:
+            with self._read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query + " LIMIT ?", params + [limit])
+                results = [self._game_row(row) for row in cursor.fetchall()]
+        
+        next_cursor = None
+        if len(results) == limit:
+            next_cursor = encode_cursor([results[-1]["start_time"], results[-1]["game_id"]])
+        return results, next_cursor
+    
+    def iter_games(self, include_in_progress: bool = True, include_archives: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield every game, newest first, straight from a database cursor."""
+        query, params = self._games_query(include_in_progress, None)
+        yield from self._history_rows(query, params, self._game_row, include_archives,
+                                      key=self._game_key, reverse=True)
+    
+    def _games_query(self, include_in_progress: bool, after: Optional[list]) -> Tuple[str, list]:
+        conditions = [] if include_in_progress else ["g.status = 'completed'"]
+        params: list = []
+        if after is not None:
+            if len(after) != 2:
+                raise ValueError("Invalid cursor for games")
+            conditions.append("(g.start_time, g.id) < (?, ?)")
+            params.extend(after)
+        
+        # Participants are looked up per game so no grouping over the whole table is needed
+        query = f"""
             SELECT 
                 g.id,
                 g.start_time,
@@ -270,27 +894,154 @@ class LeaderboardManager:
                 g.num_hands,
                 g.status,
                 g.is_official,
-                COUNT(DISTINCT gp.model_id) as num_models,
-                GROUP_CONCAT(m.name, ', ') as models
+                (SELECT GROUP_CONCAT(m.name, ', ')
+                 FROM game_participants gp JOIN models m ON gp.model_id = m.id
+                 WHERE gp.game_id = g.id) AS models
             FROM 
                 games g
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            ORDER BY 
+                g.start_time DESC, g.id DESC
+            """
+        return query, params
+    
+    @staticmethod
+    def _game_key(game: Dict[str, Any]) -> tuple:
+        return game["start_time"], game["game_id"]
+    
+    def _game_row(self, row) -> Dict[str, Any]:
+        models = row[9].split(', ') if row[9] else []
+        return {
+            "game_id": row[0],
+            "start_time": row[1],
+            "end_time": row[2],
+            "starting_chips": row[3],
+            "small_blind": row[4],
+            "big_blind": row[5],
+            "num_hands": row[6],
+            "status": row[7],
+            "is_official": bool(row[8]),
+            "num_models": len(set(models)),
+            "models": models
+        }
+    
+    def get_hand_results_page(self, limit: int = 100, after: Optional[str] = None,
+                              game_id: Optional[str] = None, model_name: Optional[str] = None,
+                              include_archives: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of recorded hand results, oldest first, and the cursor of the next page.
+        
+        Args:
+            limit: Maximum number of hand results to return
+            after: Cursor returned with the previous page
+            game_id: Only return hands of this game
+            model_name: Only return hands of this model
+            include_archives: Whether to include hands moved to archive databases
+        """
+        after_id = 0
+        if after:
+            values = decode_cursor(after)
+            if len(values) != 1 or not isinstance(values[0], int):
+                raise ValueError("Invalid cursor for hand results")
+            after_id = values[0]
+        query, params = self._hand_results_query(None if game_id is None else [game_id], model_name, after_id)
+        if include_archives:
+            rows = self._history_rows(query + " LIMIT ?", params + [limit], self._hand_result_row, True,
+                                      key=lambda hand: hand["id"])
+            results = [row for _, row in zip(range(limit), rows)]
+            rows.close()
+        else:
+            with self._read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query + " LIMIT ?", params + [limit])
+                results = [self._hand_result_row(row) for row in cursor.fetchall()]
+        
+        next_cursor = encode_cursor([results[-1]["id"]]) if len(results) == limit else None
+        return results, next_cursor
+    
+    def iter_hand_results(self, game_id: Optional[str] = None, model_name: Optional[str] = None,
+                          include_archives: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield every recorded hand result, oldest first, straight from a database cursor."""
+        query, params = self._hand_results_query(None if game_id is None else [game_id], model_name, 0)
+        yield from self._history_rows(query, params, self._hand_result_row, include_archives,
+                                      key=lambda hand: hand["id"])
+    
+    def _hand_results_query(self, game_ids: Optional[List[str]], model_name: Optional[str],
+                            after_id: int) -> Tuple[str, list]:
+        conditions = ["hr.id > ?"]
+        params: list = [after_id]
+        if game_ids is not None:
+            conditions.append(f"hr.game_id IN ({', '.join('?' for _ in game_ids)})")
+            params.extend(game_ids)
+        if model_name is not None:
+            conditions.append("m.name = ?")
+            params.append(model_name)
+        
+        query = f"""
+            SELECT 
+                hr.id,
+                hr.game_id,
+                hr.hand_number,
+                m.name,
+                hr.profit_loss,
+                hr.won_hand,
+                hr.starting_chips,
+                hr.ending_chips,
+                hr.big_blind
+            FROM 
+                hand_results hr
             JOIN 
-                game_participants gp ON g.id = gp.game_id
-            JOIN
-                models m ON gp.model_id = m.id
-            {status_filter}
-            GROUP BY
-                g.id
+                models m ON hr.model_id = m.id
+            WHERE 
+                {" AND ".join(conditions)}
             ORDER BY 
-                g.start_time DESC
-            LIMIT ?
+                hr.id
             """
-            
-            cursor.execute(query, (limit,))
-            results = []
-            
-            for row in cursor.fetchall():
-                results.append({
+        return query, params
+    
+    def _hand_result_row(self, row) -> Dict[str, Any]:
+        return {
+            "id": row[0],
+            "game_id": row[1],
+            "hand_number": row[2],
+            "model_name": row[3],
+            "profit_loss": row[4],
+            "won_hand": bool(row[5]),
+            "starting_chips": row[6],
+            "ending_chips": row[7],
+            "big_blind": row[8]
+        }
+    
+    def get_completed_games(self, since: Optional[str] = None, exclude_ids: Optional[List[str]] = None,
+                            limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Get completed games in the order they finished, for incremental exports.
+        
+        Args:
+            since: Only return games that ended at or after this end_time
+            exclude_ids: Games already returned that ended exactly at since
+            limit: Maximum number of games to return
+        """
+        conditions = ["status = 'completed'"]
+        params: list = []
+        if since is not None:
+            conditions.append("end_time >= ?")
+            params.append(since)
+        if exclude_ids:
+            conditions.append(f"id NOT IN ({', '.join('?' for _ in exclude_ids)})")
+            params.extend(exclude_ids)
+        
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, start_time, end_time, starting_chips, small_blind, big_blind, num_hands, is_official
+                FROM games
+                WHERE {" AND ".join(conditions)}
+                ORDER BY end_time, id
+                LIMIT ?
+            """, params + [limit])
+            return [
+                {
                     "game_id": row[0],
                     "start_time": row[1],
                     "end_time": row[2],
@@ -298,14 +1049,79 @@ class LeaderboardManager:
                     "small_blind": row[4],
                     "big_blind": row[5],
                     "num_hands": row[6],
-                    "status": row[7],
-                    "is_official": bool(row[8]),
-                    "num_models": row[9],
-                    "models": row[10].split(', ') if row[10] else []
-                })
-            
-            return results
+                    "is_official": bool(row[7])
+                }
+                for row in cursor.fetchall()
+            ]
+    
+    def get_games_details(self, game_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the participants and hand results of the given games."""
+        if not game_ids:
+            return {"game_participants": [], "hand_results": []}
+        placeholders = ", ".join("?" for _ in game_ids)
+        
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT gp.game_id, m.name, gp.final_chips
+                FROM game_participants gp
+                JOIN models m ON gp.model_id = m.id
+                WHERE gp.game_id IN ({placeholders})
+                ORDER BY gp.game_id, gp.id
+            """, game_ids)
+            game_participants = [
+                {"game_id": row[0], "model_name": row[1], "final_chips": row[2]}
+                for row in cursor.fetchall()
+            ]
             
+            query, params = self._hand_results_query(game_ids, None, 0)
+            cursor.execute(query, params)
+            hand_results = [self._hand_result_row(row) for row in cursor.fetchall()]
+        
+        return {"game_participants": game_participants, "hand_results": hand_results}
+    
+    def _history_rows(self, query: str, params: list, to_dict, include_archives: bool,
+                      key, reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Rows of a query over the main database and, if asked, every archive.
+        
+        Archives are read in groups of MAX_ATTACHED_ARCHIVES, each on its own
+        connection, and the groups' rows are merged by key into the query's order.
+        """
+        if not include_archives:
+            yield from self._iter_rows(query, params, to_dict)
+            return
+        archives = self.list_archives()
+        groups = [archives[i:i + MAX_ATTACHED_ARCHIVES] for i in range(0, len(archives), MAX_ATTACHED_ARCHIVES)] or [[]]
+        streams = [self._iter_rows(query, params, to_dict, group, include_main=(i == 0)) for i, group in enumerate(groups)]
+        try:
+            yield from heapq.merge(*streams, key=key, reverse=reverse)
+        finally:
+            for stream in streams:
+                stream.close()
+    
+    def _iter_rows(self, query: str, params: list, to_dict, archives: Optional[List[str]] = None,
+                   include_main: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a query's rows in chunks; one statement, so the rows come from a single snapshot.
+        
+        A stream may be held open by a slow client for as long as it likes, so it
+        reads from a connection of its own rather than holding one of the pool's.
+        """
+        with self._archive_read_connection(archives, include_main) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield to_dict(row)
+            finally:
+                # Ends the read, even when the consumer stops early
+                cursor.close()
+    
     def get_model_stats(self, model_name: str, official_only: bool = True) -> Dict[str, Any]:
         """
         Get detailed stats for a specific model.
@@ -314,114 +1130,110 @@ class LeaderboardManager:
             model_name: Name of the model to get stats for
             official_only: If True, only includes results from official games
         """
-        with self._get_connection() as conn:
+        stats = self.get_models_stats([model_name], official_only=official_only)
+        if model_name not in stats:
+            return {"error": f"Model '{model_name}' not found"}
+        return stats[model_name]
+    
+    def get_models_stats(self, model_names: List[str], official_only: bool = True,
+                         recent_games: int = 5) -> Dict[str, Dict[str, Any]]:
+        """
+        Get detailed stats for several models at once, keyed by model name.
+        
+        Overall and official/exhibition totals come from one grouped query over
+        model_aggregates and the recent games of every model from one windowed
+        query. Unknown models are left out.
+        
+        Args:
+            model_names: Names of the models to get stats for
+            official_only: If True, overall stats and recent games only include official games
+            recent_games: Number of recent completed games to return per model
+        """
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             
-            # Get model id
-            cursor.execute("SELECT id FROM models WHERE name = ?", (model_name,))
-            model_result = cursor.fetchone()
-            if not model_result:
-                return {"error": f"Model '{model_name}' not found"}
-                
-            model_id = model_result[0]
-            
-            # Get overall stats
-            query = """
-            SELECT 
-                COUNT(DISTINCT hr.game_id) AS games_played,
-                COUNT(hr.id) AS hands_played,
-                SUM(hr.profit_loss) AS net_profit,
-                SUM(CASE WHEN hr.won_hand = 1 THEN 1 ELSE 0 END) AS hands_won,
-                ROUND(SUM(CASE WHEN hr.won_hand = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(hr.id), 2) AS win_rate,
-                ROUND(SUM(hr.profit_loss) * 100.0 / SUM(hr.big_blind) / COUNT(hr.id), 2) AS bb_per_100
-            FROM 
-                hand_results hr
-            JOIN
-                games g ON hr.game_id = g.id
-            WHERE 
-                hr.model_id = ? AND {}
-            """.format("g.is_official = 1" if official_only else "1=1")
+            # Get model ids
+            names = list(dict.fromkeys(model_names))
+            placeholders = ", ".join("?" for _ in names)
+            cursor.execute(f"SELECT id, name FROM models WHERE name IN ({placeholders})", names)
+            model_ids = dict(cursor.fetchall())
+            if not model_ids:
+                return {}
+            id_placeholders = ", ".join("?" for _ in model_ids)
             
-            cursor.execute(query, (model_id,))
-            row = cursor.fetchone()
+            # Official and exhibition totals of every model
+            cursor.execute(f"""
+            SELECT model_id, is_official, games_played, hands_played, hands_won, net_profit, big_blinds
+            FROM model_aggregates
+            WHERE model_id IN ({id_placeholders})
+            """, list(model_ids))
+            totals: Dict[int, List[tuple]] = {model_id: [] for model_id in model_ids}
+            for row in cursor.fetchall():
+                totals[row[0]].append(row[1:])
             
-            if not row:
-                return {"error": f"No data found for model '{model_name}'"}
-                
+            # Latest completed games of every model
+            cursor.execute(f"""
+            SELECT model_id, id, start_time, end_time, final_chips, starting_chips, profit_loss, is_official
+            FROM (
+                SELECT 
+                    gp.model_id,
+                    g.id,
+                    g.start_time,
+                    g.end_time,
+                    gp.final_chips,
+                    g.starting_chips,
+                    (gp.final_chips - g.starting_chips) AS profit_loss,
+                    g.is_official,
+                    ROW_NUMBER() OVER (PARTITION BY gp.model_id ORDER BY g.end_time DESC) AS recency
+                FROM 
+                    game_participants gp
+                JOIN 
+                    games g ON g.id = gp.game_id
+                WHERE 
+                    gp.model_id IN ({id_placeholders}) AND g.status = 'completed'
+                    AND {"g.is_official = 1" if official_only else "1=1"}
+            )
+            WHERE recency <= ?
+            ORDER BY model_id, recency
+            """, list(model_ids) + [recent_games])
+            recent: Dict[int, List[Dict[str, Any]]] = {model_id: [] for model_id in model_ids}
+            for row in cursor.fetchall():
+                recent[row[0]].append({
+                    "game_id": row[1],
+                    "start_time": row[2],
+                    "end_time": row[3],
+                    "final_chips": row[4],
+                    "starting_chips": row[5],
+                    "profit_loss": row[6],
+                    "is_official": bool(row[7])
+                })
+        
+        # Keyed in the order the models were asked for
+        ids_by_name = {model_name: model_id for model_id, model_name in model_ids.items()}
+        results = {}
+        for model_name in [name for name in names if name in ids_by_name]:
+            model_id = ids_by_name[model_name]
+            rows = [row for row in totals[model_id] if row[0] or not official_only]
+            games_played, hands_played, hands_won, net_profit, big_blinds = (
+                sum(row[i] for row in rows) for i in range(1, 6)
+            )
             stats = {
                 "model_name": model_name,
-                "games_played": row[0],
-                "hands_played": row[1],
-                "net_profit": row[2],
-                "hands_won": row[3],
-                "win_rate": row[4],  # as percentage
-                "bb_per_100": row[5]  # BB/100 hands
+                "games_played": games_played,
+                "hands_played": hands_played,
+                "net_profit": net_profit if rows else None,
+                "hands_won": hands_won if rows else None,
+                "win_rate": round(hands_won * 100.0 / hands_played, 2) if hands_played else None,  # as percentage
+                "bb_per_100": round(net_profit * 100.0 / big_blinds / hands_played, 2) if big_blinds else None  # BB/100 hands
             }
-            
-            # Get official status counts
-            status_query = """
-            SELECT 
-                g.is_official,
-                COUNT(DISTINCT g.id) as game_count,
-                COUNT(hr.id) as hand_count,
-                SUM(hr.profit_loss) as total_profit
-            FROM 
-                hand_results hr
-            JOIN
-                games g ON hr.game_id = g.id
-            WHERE
-                hr.model_id = ?
-            GROUP BY
-                g.is_official
-            """
-            
-            cursor.execute(status_query, (model_id,))
-            status_counts = {}
-            for row in cursor.fetchall():
-                status_type = "official" if row[0] == 1 else "exhibition"
-                status_counts[status_type] = {
+            stats["status_counts"] = {
+                ("official" if row[0] else "exhibition"): {
                     "games_played": row[1],
                     "hands_played": row[2],
-                    "net_profit": row[3]
+                    "net_profit": row[4]
                 }
-            
-            stats["status_counts"] = status_counts
-            
-            # Get recent games
-            recent_games_query = """
-            SELECT 
-                g.id,
-                g.start_time,
-                g.end_time,
-                gp.final_chips,
-                g.starting_chips,
-                (gp.final_chips - g.starting_chips) AS profit_loss,
-                g.is_official
-            FROM 
-                games g
-            JOIN 
-                game_participants gp ON g.id = gp.game_id
-            WHERE 
-                gp.model_id = ? AND g.status = 'completed'
-                AND {}
-            ORDER BY 
-                g.end_time DESC
-            LIMIT 5
-            """.format("g.is_official = 1" if official_only else "1=1")
-            
-            cursor.execute(recent_games_query, (model_id,))
-            recent_games = []
-            
-            for row in cursor.fetchall():
-                recent_games.append({
-                    "game_id": row[0],
-                    "start_time": row[1],
-                    "end_time": row[2],
-                    "final_chips": row[3],
-                    "starting_chips": row[4],
-                    "profit_loss": row[5],
-                    "is_official": bool(row[6])
-                })
-            
-            stats["recent_games"] = recent_games
-            return stats
\ No newline at end of file
+                for row in totals[model_id]
+            }
+            stats["recent_games"] = recent[model_id]
+            results[model_name] = stats
+        return results
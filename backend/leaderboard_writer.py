@@ -0,0 +1,191 @@
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from leaderboard import LeaderboardManager
+
+# A batch is committed once it holds this many records...
+MAX_BATCH_SIZE = 200
+# ...or once its oldest record has waited this long (seconds)
+FLUSH_INTERVAL = 0.5
+# Seconds before a failed batch is tried again
+RETRY_DELAY = 0.1
+
+RECORD_KINDS = ("hand_result", "llm_call")
+
+
+class WriteStatus(threading.Event):
+    """Set once a complete_game() or flush() is processed; ok is False if records before it were lost"""
+
+    def __init__(self, dropped: int = 0):
+        super().__init__()
+        self.ok = True
+        # Writer's dropped-record count when this was queued
+        self.dropped = dropped
+
+
+class LeaderboardWriter:
+    """
+    Writes leaderboard records from a background thread.
+
+    Hand results and LLM calls are queued without blocking the event loop
+    and committed in batches of up to max_batch records, or after
+    flush_interval seconds, in one transaction each. complete_game() and
+    flush() commit everything queued before them.
+
+    A batch that fails is tried once more and then written one record at a
+    time, so a bad record only loses itself. Lost records are logged and
+    reported through the WriteStatus of the game's complete_game().
+    """
+
+    def __init__(self, manager: LeaderboardManager, max_batch: int = MAX_BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.manager = manager
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.queue: queue.Queue = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.records = 0
+        self.errors = 0
+        self.dropped = 0
+        # Records lost per game since its complete_game() was last processed
+        self.dropped_by_game: Dict[str, int] = {}
+        self.last_batch_size = 0
+        self.last_batch_time = 0.0
+
+    def start(self) -> None:
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+                self.thread.start()
+
+    def record_hand_result(self, game_id: str, hand_number: int, model_name: str, profit_loss: int,
+                           won_hand: bool, starting_chips: int, ending_chips: int, big_blind: int) -> None:
+        self._put(("hand_result", (game_id, hand_number, model_name, profit_loss, won_hand,
+                                   starting_chips, ending_chips, big_blind)))
+
+    def record_llm_call(self, game_id: str, hand_number: int, call: Dict[str, Any]) -> None:
+        self._put(("llm_call", (game_id, hand_number, call)))
+
+    def complete_game(self, game_id: str, final_chips: Dict[str, int]) -> WriteStatus:
+        """
+        Queue the end of a game; the returned status is set once it and everything
+        before it is processed, with ok False if it or any of the game's records were lost
+        """
+        done = WriteStatus()
+        self._put(("complete_game", (game_id, final_chips), done))
+        return done
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is processed; False on timeout or if records were lost meanwhile"""
+        done = WriteStatus(self.dropped)
+        self._put(("flush", (), done))
+        return done.wait(timeout) and done.ok
+
+    async def wait(self, done: WriteStatus, timeout: Optional[float] = None) -> bool:
+        """Wait for a status from complete_game() or flush() without blocking the event loop; False on failure"""
+        return await asyncio.get_running_loop().run_in_executor(None, done.wait, timeout) and done.ok
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        done = WriteStatus(self.dropped)
+        self._put(("flush", (), done))
+        return await self.wait(done, timeout)
+
+    def _put(self, item) -> None:
+        self.start()
+        self.queue.put(item)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            # Keep collecting until the batch is full, a record needs an
+            # immediate commit, or the oldest record has waited long enough
+            while len(batch) < self.max_batch and batch[-1][0] in RECORD_KINDS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(batch)
+                    return
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List) -> None:
+        started = time.perf_counter()
+        records = [item[:2] for item in batch if item[0] in RECORD_KINDS]
+        if records:
+            self._write_records(records)
+        for item in batch:
+            if item[0] == "complete_game":
+                game_id = item[1][0]
+                try:
+                    self.manager.complete_game(*item[1])
+                except Exception as e:
+                    self.errors += 1
+                    item[2].ok = False
+                    print(f"Error completing game {game_id} on the leaderboard: {e}")
+                if self.dropped_by_game.pop(game_id, 0):
+                    item[2].ok = False
+            elif item[0] == "flush":
+                item[2].ok = self.dropped == item[2].dropped
+            if len(item) > 2:
+                item[2].set()
+        self.batches += 1
+        self.records += len(records)
+        self.last_batch_size = len(records)
+        self.last_batch_time = time.perf_counter() - started
+
+    def _write_records(self, records: List) -> None:
+        """Commit records in one transaction, retrying once and then record by record"""
+        for attempt in range(2):
+            try:
+                self.manager.write_batch(records)
+                return
+            except Exception as e:
+                self.errors += 1
+                print(f"Error writing {len(records)} leaderboard records (attempt {attempt + 1}): {e}")
+                if attempt == 0:
+                    time.sleep(RETRY_DELAY)
+
+        for kind, args in records:
+            try:
+                self.manager.write_batch([(kind, args)])
+            except Exception as e:
+                game_id, hand_number = args[0], args[1]
+                self.dropped += 1
+                self.dropped_by_game[game_id] = self.dropped_by_game.get(game_id, 0) + 1
+                print(f"Dropped leaderboard {kind} for game {game_id} hand {hand_number}: {e}")
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Commit everything queued and stop the writer thread"""
+        with self.lock:
+            thread = self.thread
+            self.thread = None
+        if thread is not None and thread.is_alive():
+            self.queue.put(None)
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "records": self.records,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_time * 1000, 2),
+            "max_batch": self.max_batch,
+            "flush_interval": self.flush_interval
+        }
@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+"""
+Batch submission of LLM prompts for offline workloads.
+
+Replays of stored decision points and PokerBench evaluations do not need
+interactive latency, so their prompts are collected and sent through a
+provider batch endpoint instead of one completion call at a time.
+"""
+import argparse
+import io
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from deck import Card
+from llm_player import LLMPlayer
+from prompts import DEFAULT_PROMPT_VERSION
+from providers import provider_api_key, resolve_provider
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch states that will not change any more
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Providers with an OpenAI-format file + batch API that litellm can submit to
+BATCH_PROVIDERS = ("openai",)
+
+
+class BatchRequest:
+    """One chat completion request inside a batch."""
+
+    def __init__(self, custom_id: str, model: str, messages: List[Dict[str, Any]]):
+        self.custom_id = custom_id
+        self.model = model
+        self.messages = messages
+
+
+def player_from_decision_point(record: Dict[str, Any], model: Optional[str] = None) -> LLMPlayer:
+    """Rebuild an LLMPlayer in the state it was in when the decision was recorded."""
+    player = LLMPlayer(
+        name=record["name"],
+        chips=record["chips"],
+        position=0,
+        model_name=model or record["model"],
+        api_key=None,
+        prompt_version=record.get("prompt_version", DEFAULT_PROMPT_VERSION),
+        history_token_budget=record.get("history_token_budget")
+    )
+    hole_cards = record.get("hole_cards", "")
+    player.hand = [Card.from_treys_str(hole_cards[i:i + 2]) for i in range(0, len(hole_cards), 2)]
+    player.current_bet = record.get("player_bet", 0)
+    return player
+
+
+class BatchCollector:
+    """Collects prompts from decision points or raw text into batch requests."""
+
+    def __init__(self):
+        self.requests: List[BatchRequest] = []
+
+    def add_decision(self, custom_id: str, record: Dict[str, Any], model: Optional[str] = None) -> None:
+        """Add a stored decision point (see LLMPlayer.to_decision_point)."""
+        player = player_from_decision_point(record, model)
+        messages = player.generate_messages(record["current_bet"], record["game_state"])
+        self.requests.append(BatchRequest(custom_id, player.model_name, messages))
+
+    def add_prompt(self, custom_id: str, model: str, prompt: str) -> None:
+        """Add a raw prompt, e.g. a PokerBench instruction."""
+        self.requests.append(BatchRequest(custom_id, model, [{"role": "user", "content": prompt}]))
+
+
+def split_provider(model: str):
+    """Split a model name into (provider, provider-side model name), as the server resolves it."""
+    provider, litellm_name = resolve_provider(model)
+    if litellm_name.startswith(provider + "/"):
+        litellm_name = litellm_name[len(provider) + 1:]
+    return provider, litellm_name
+
+
+class LocalBatchBackend:
+    """
+    In-process stand-in for a provider batch endpoint.
+
+    Requests are answered one at a time through completion_fn when the batch
+    is first polled, so tests and dry runs follow the same submit/poll/results
+    flow as a real provider without network access.
+    """
+
+    def __init__(self, completion_fn: Optional[Callable[..., Any]] = None, api_key: Optional[str] = None):
+        if completion_fn is None:
+            from litellm import completion
+            completion_fn = completion
+        self.completion_fn = completion_fn
+        self.api_key = api_key
+        self.batches: Dict[str, Dict[str, Any]] = {}
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        batch_id = f"local-{uuid.uuid4()}"
+        self.batches[batch_id] = {"requests": requests, "status": "in_progress", "results": {}}
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.batches[batch_id]
+        if batch["status"] == "in_progress":
+            for request in batch["requests"]:
+                try:
+                    response = self.completion_fn(
+                        model=request.model,
+                        api_key=self.api_key or provider_api_key(request.model),
+                        messages=request.messages,
+                    )
+                    batch["results"][request.custom_id] = response["choices"][0]["message"]["content"]
+                except Exception as e:
+                    print(f"Local batch request {request.custom_id} failed: {e}")
+                    batch["results"][request.custom_id] = None
+            batch["status"] = "completed"
+        return batch["status"]
+
+    def results(self, batch_id: str) -> Dict[str, Optional[str]]:
+        return dict(self.batches[batch_id]["results"])
+
+
+class ProviderBatchBackend:
+    """
+    Submits requests through a provider's OpenAI-format batch API via litellm.
+
+    All requests in one batch must go to the same provider, one of
+    BATCH_PROVIDERS. Without an api_key, the provider's key is read from the
+    environment the same way the server reads it.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self.providers: Dict[str, str] = {}
+        self.api_keys: Dict[str, Optional[str]] = {}
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        import litellm
+
+        providers = {split_provider(r.model)[0] for r in requests}
+        if len(providers) != 1:
+            raise ValueError(f"A batch must target a single provider, got: {', '.join(sorted(providers))}")
+        provider = providers.pop()
+        if provider not in BATCH_PROVIDERS:
+            raise ValueError(f"Provider '{provider}' has no OpenAI-format batch API; "
+                             f"supported: {', '.join(BATCH_PROVIDERS)} (or use --backend local)")
+        api_key = self.api_key or provider_api_key(requests[0].model)
+
+        lines = []
+        for request in requests:
+            lines.append(json.dumps({
+                "custom_id": request.custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {"model": split_provider(request.model)[1], "messages": request.messages},
+            }))
+        payload = io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+        batch_file = litellm.create_file(
+            file=("batch.jsonl", payload),
+            purpose="batch",
+            custom_llm_provider=provider,
+            api_key=api_key,
+        )
+        batch = litellm.create_batch(
+            completion_window="24h",
+            endpoint=BATCH_ENDPOINT,
+            input_file_id=batch_file.id,
+            custom_llm_provider=provider,
+            api_key=api_key,
+        )
+        self.providers[batch.id] = provider
+        self.api_keys[batch.id] = api_key
+        return batch.id
+
+    def _retrieve(self, batch_id: str):
+        import litellm
+        return litellm.retrieve_batch(
+            batch_id=batch_id,
+            custom_llm_provider=self.providers.get(batch_id, "openai"),
+            api_key=self.api_keys.get(batch_id, self.api_key),
+        )
+
+    def status(self, batch_id: str) -> str:
+        return self._retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> Dict[str, Optional[str]]:
+        import litellm
+
+        batch = self._retrieve(batch_id)
+        results: Dict[str, Optional[str]] = {}
+        if not batch.output_file_id:
+            return results
+
+        content = litellm.file_content(
+            file_id=batch.output_file_id,
+            custom_llm_provider=self.providers.get(batch_id, "openai"),
+            api_key=self.api_keys.get(batch_id, self.api_key),
+        )
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            body = response.get("body") or {}
+            choices = body.get("choices") or []
+            results[entry["custom_id"]] = choices[0]["message"]["content"] if choices else None
+        return results
+
+
+def run_batch(requests: List[BatchRequest], backend, poll_interval: float = 30.0,
+              timeout: Optional[float] = None, sleep: Callable[[float], None] = time.sleep) -> Dict[str, Optional[str]]:
+    """Submit a batch, poll until it finishes and return response text by custom_id."""
+    if not requests:
+        return {}
+
+    batch_id = backend.submit(requests)
+    print(f"Submitted batch {batch_id} with {len(requests)} requests")
+
+    started = time.monotonic()
+    while True:
+        status = backend.status(batch_id)
+        if status in TERMINAL_STATUSES:
+            break
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batch {batch_id} did not finish within {timeout} seconds (status: {status})")
+        print(f"Batch {batch_id} status: {status}")
+        sleep(poll_interval)
+
+    if status != "completed":
+        raise RuntimeError(f"Batch {batch_id} ended with status '{status}'")
+
+    return backend.results(batch_id)
+
+
+def replay_decisions(records: List[Dict[str, Any]], results: Dict[str, Optional[str]]) -> List[Dict[str, Any]]:
+    """Parse batch responses for stored decision points and compare with the recorded action."""
+    player = LLMPlayer("replay", 0, 0, "replay", None)
+    replayed = []
+    for record in records:
+        response_text = results.get(record["custom_id"])
+        entry = {
+            "custom_id": record["custom_id"],
+            "recorded_action": record.get("action"),
+            "action": None,
+            "raise_amount": None,
+            "error": None,
+        }
+        try:
+            if response_text is None:
+                raise ValueError("No response returned for this request")
+            action, raise_amount = player.parse_response(response_text)
+            entry["action"] = action.value
+            entry["raise_amount"] = raise_amount
+        except ValueError as e:
+            entry["error"] = str(e)
+        replayed.append(entry)
+    return replayed
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """Read a JSONL file, assigning a custom_id to records that have none."""
+    records = []
+    with open(path) as f:
+        for i, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record.setdefault("custom_id", f"request-{i}")
+            records.append(record)
+    return records
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run stored decision points or PokerBench prompts through a batch endpoint.")
+    parser.add_argument("input", help="JSONL file of decision points (from LLMPlayer decision_log) or prompts with an 'instruction' field")
+    parser.add_argument("--model", help="Model to query (defaults to each decision point's recorded model)")
+    parser.add_argument("--backend", choices=["provider", "local"], default="provider", help="Use the provider batch API or run requests locally")
+    parser.add_argument("--api-key", help="Provider API key (defaults to the model provider's key from the environment)")
+    parser.add_argument("--output", default="batch_results.json", help="Where to write results")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="Seconds between status checks")
+    parser.add_argument("--timeout", type=float, default=None, help="Give up after this many seconds")
+    args = parser.parse_args()
+
+    records = load_records(args.input)
+    collector = BatchCollector()
+    is_replay = all("game_state" in record for record in records)
+    for record in records:
+        if is_replay:
+            collector.add_decision(record["custom_id"], record, args.model)
+        else:
+            if not args.model:
+                parser.error("--model is required for prompt inputs")
+            collector.add_prompt(record["custom_id"], args.model, record.get("instruction") or record["prompt"])
+
+    backend = LocalBatchBackend(api_key=args.api_key) if args.backend == "local" else ProviderBatchBackend(api_key=args.api_key)
+    results = run_batch(collector.requests, backend, poll_interval=args.poll_interval, timeout=args.timeout)
+
+    if is_replay:
+        output = replay_decisions(records, results)
+    else:
+        # Same layout as the pokerbench.ipynb results files so its evaluation cells can load it
+        output = [{"Index": i, "Response": results.get(record["custom_id"])} for i, record in enumerate(records)]
+
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=4)
+    print(f"Saved {len(output)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from fake_llm import is_fake_model
+from prompts import cached_prompt_tokens, usage_value
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+
+def classify_failure(error: Exception) -> str:
+    """Map a parse_response error to a short, countable reason."""
+    message = str(error)
+    if "did not contain any JSON" in message:
+        return "no_json"
+    if "Expecting" in message or "JSON" in message or "delimiter" in message:
+        return "invalid_json"
+    if "raise_amount" in message:
+        return "bad_raise_amount"
+    if "action" in message:
+        return "bad_action"
+    return "other"
+
+
+def estimate_cost(model_name: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """Estimated USD cost of one completion, or None when the model has no known pricing."""
+    if is_fake_model(model_name):
+        return 0.0
+    try:
+        import litellm
+        prompt_cost, completion_cost = litellm.cost_per_token(
+            model=model_name,
+            prompt_tokens=input_tokens,
+            completion_tokens=output_tokens,
+        )
+        return prompt_cost + completion_cost
+    except Exception:
+        return None
+
+
+class LLMCallMetrics:
+    """Measurements for one choose_action call, across all of its attempts."""
+
+    def __init__(self, model_name: str, player_name: str):
+        self.model_name = model_name
+        self.player_name = player_name
+        self.started = time.perf_counter()
+        self.wall_time = 0.0
+        self.provider_time = 0.0
+        self.attempts = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.cost: Optional[float] = 0.0
+        self.provider_errors = 0
+        self.parse_failures: List[str] = []
+        self.defaulted_to_fold = False
+
+    def add_response(self, response: Any, elapsed: float) -> None:
+        self.attempts += 1
+        self.provider_time += elapsed
+
+        usage = response.get("usage") if hasattr(response, "get") else None
+        input_tokens = int(usage_value(usage, "prompt_tokens") or 0)
+        output_tokens = int(usage_value(usage, "completion_tokens") or 0)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cached_tokens += cached_prompt_tokens(usage)
+
+        cost = estimate_cost(self.model_name, input_tokens, output_tokens)
+        self.cost = None if cost is None or self.cost is None else self.cost + cost
+
+    def add_provider_error(self, elapsed: float) -> None:
+        self.attempts += 1
+        self.provider_time += elapsed
+        self.provider_errors += 1
+
+    def add_parse_failure(self, error: Exception) -> None:
+        self.parse_failures.append(classify_failure(error))
+
+    def finish(self, defaulted_to_fold: bool) -> Dict[str, Any]:
+        self.wall_time = time.perf_counter() - self.started
+        self.defaulted_to_fold = defaulted_to_fold
+        return self.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "player_name": self.player_name,
+            "wall_time": round(self.wall_time, 4),
+            "provider_time": round(self.provider_time, 4),
+            "attempts": self.attempts,
+            "retries": max(0, self.attempts - 1),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cost": self.cost,
+            "provider_errors": self.provider_errors,
+            "parse_failures": list(self.parse_failures),
+            "defaulted_to_fold": self.defaulted_to_fold,
+        }
+
+
+class Histogram:
+    """Fixed-bucket histogram with running sum, min and max."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket containing the p-th percentile."""
+        if not self.count:
+            return None
+        target = self.count * p / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class LLMMetrics:
+    """Per-model aggregation of LLM call measurements."""
+
+    def __init__(self):
+        self.models: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, call: Dict[str, Any]) -> None:
+        stats = self.models.get(call["model_name"])
+        if stats is None:
+            stats = {
+                "calls": 0,
+                "attempts": 0,
+                "retries": 0,
+                "provider_errors": 0,
+                "defaulted_to_fold": 0,
+                "parse_failures": {},
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cached_tokens": 0,
+                "cost": 0.0,
+                "unpriced_calls": 0,
+                "wall_time": Histogram(),
+                "provider_time": Histogram(),
+            }
+            self.models[call["model_name"]] = stats
+
+        stats["calls"] += 1
+        stats["attempts"] += call["attempts"]
+        stats["retries"] += call["retries"]
+        stats["provider_errors"] += call["provider_errors"]
+        stats["defaulted_to_fold"] += int(call["defaulted_to_fold"])
+        for reason in call["parse_failures"]:
+            stats["parse_failures"][reason] = stats["parse_failures"].get(reason, 0) + 1
+        stats["input_tokens"] += call["input_tokens"]
+        stats["output_tokens"] += call["output_tokens"]
+        stats["cached_tokens"] += call["cached_tokens"]
+        if call["cost"] is None:
+            stats["unpriced_calls"] += 1
+        else:
+            stats["cost"] += call["cost"]
+        stats["wall_time"].observe(call["wall_time"])
+        stats["provider_time"].observe(call["provider_time"])
+
+    def get_stats(self, model_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for name, stats in self.models.items():
+            if model_name is not None and name != model_name:
+                continue
+            entry = dict(stats)
+            entry["cost"] = round(stats["cost"], 6)
+            entry["parse_failures"] = dict(stats["parse_failures"])
+            entry["wall_time"] = stats["wall_time"].to_dict()
+            entry["provider_time"] = stats["provider_time"].to_dict()
+            results[name] = entry
+        return results
+
+
+llm_metrics = LLMMetrics()
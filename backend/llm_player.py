@@ -3,6 +3,12 @@ import json
 from litellm import completion
 from pydantic import BaseModel, ValidationError, Field
 import re
+import time
+from fake_llm import create_fake_model, is_fake_model
+from llm_metrics import LLMCallMetrics, llm_metrics
+from prompts import (DEFAULT_PROMPT_VERSION, DEFAULT_HISTORY_TOKEN_BUDGET,
+                     build_messages, cached_prompt_tokens, estimate_tokens,
+                     fit_history, get_template, prompt_cache_stats, usage_value)
 
 class PokerActionResponse(BaseModel):
     action: str = Field(..., pattern="^(fold|call|raise)$")
@@ -20,100 +26,123 @@ class PokerActionResponse(BaseModel):
         return response
     
 class LLMPlayer(Player):
-    def __init__(self, name, chips, position, model_name, api_key):
+    def __init__(self, name, chips, position, model_name, api_key,
+                 prompt_version=DEFAULT_PROMPT_VERSION,
+                 history_token_budget=DEFAULT_HISTORY_TOKEN_BUDGET,
+                 decision_log=None, api_base=None):
         super().__init__(name, False, chips, position)
         self.model_name = model_name
         self.api_key = api_key
+        # Offline fake model of this player, answered in-process
+        self.fake_model = create_fake_model(model_name) if is_fake_model(model_name) else None
+        self.api_base = api_base
+        # Validate the version up front so a typo fails at game creation
+        get_template(prompt_version)
+        self.prompt_version = prompt_version
+        self.history_token_budget = history_token_budget
+        # Optional JSONL path where every decision point is appended for offline replay
+        self.decision_log = decision_log
+        # Optional hook called with the metrics dict of every choose_action call
+        self.on_call_metrics = None
     
-    def generate_prompt(self, current_bet, game_state):
-        game_history = "\n".join(game_state['actions_so_far'])
+    def _prompt_state(self, current_bet, game_state):
+        history = fit_history(game_state['actions_so_far'], self.history_token_budget)
         hole_cards_str = "".join([card.to_treys_str() for card in self.hand])
         call_amount = max(0, current_bet - self.current_bet)
-        
-        prompt_text = f"""
-        You are an expert-level poker AI tasked with making optimal decisions in a poker game. Your job is to WIN! You will be given the current game state and your goal is to determine the best action to take.
-
-        Here's the current game state:
-
-        Game history: {game_history}
-
-        Your Hole Cards: {hole_cards_str}
-        Community Cards: {game_state['community_cards']}
-        Pot: {game_state['pot']}
-        Your Chips: {self.chips}
-        Amount to call: {call_amount}
-        Minimum raise over current bet: {game_state['min_raise']}
-        Current bet to match: {current_bet}
-
-        RESPONSE FORMAT REQUIREMENTS:
-        You MUST respond with ONLY a valid JSON object in the following exact format:
-
-        For folding:
-        {{
-          "action": "fold",
-          "raise_amount": null
-        }}
-
-        For calling:
-        {{
-          "action": "call",
-          "raise_amount": null
-        }}
-
-        For raising:
-        {{
-          "action": "raise",
-          "raise_amount": [your raise amount as integer]
-        }}
-
-        CRITICAL RULES:
-        1. Output ONLY the JSON object - no explanations, thoughts, or other text
-        2. Only use actions "fold", "call", or "raise" (lowercase only)
-        3. If action is "raise", raise_amount must be a positive integer (minimum {game_state['min_raise']})
-        4. If action is "fold" or "call", raise_amount MUST be null (not a number)
-        5. Do not use any other fields in your JSON response
-
-        EXAMPLE VALID RESPONSES:
-        {{
-          "action": "fold",
-          "raise_amount": null
-        }}
 
-        {{
-          "action": "call",
-          "raise_amount": null
-        }}
+        return {
+            "history": history,
+            "hole_cards": hole_cards_str,
+            "community_cards": game_state['community_cards'],
+            "pot": game_state['pot'],
+            "chips": self.chips,
+            "call_amount": call_amount,
+            "min_raise": game_state['min_raise'],
+            "current_bet": current_bet,
+        }
 
-        {{
-          "action": "raise",
-          "raise_amount": 50
-        }}
-
-        Any deviation from this exact format will cause errors. Respond with JSON only.
-        """
-
-        return prompt_text.strip()
+    def generate_prompt(self, current_bet, game_state):
+        template = get_template(self.prompt_version)
+        return template.render(self._prompt_state(current_bet, game_state))
+
+    def generate_messages(self, current_bet, game_state, error_context=""):
+        """Chat messages with the static instructions first and the game state last."""
+        template = get_template(self.prompt_version)
+        state_text = template.render_state(self._prompt_state(current_bet, game_state))
+        if error_context:
+            state_text += "\n" + error_context
+        return build_messages(self.model_name, template.instructions, state_text)
     
+    def to_decision_point(self, current_bet, game_state):
+        """Everything needed to rebuild this decision's prompt offline."""
+        return {
+            "name": self.name,
+            "model": self.model_name,
+            "prompt_version": self.prompt_version,
+            "history_token_budget": self.history_token_budget,
+            "chips": self.chips,
+            "player_bet": self.current_bet,
+            "hole_cards": "".join([card.to_treys_str() for card in self.hand]),
+            "current_bet": current_bet,
+            "game_state": game_state,
+        }
+
+    def _log_decision(self, current_bet, game_state, action, raise_amount):
+        if not self.decision_log:
+            return
+        record = self.to_decision_point(current_bet, game_state)
+        record["action"] = action.value
+        record["raise_amount"] = raise_amount
+        # The decision has already been made; a failed log write must not retry or change it
+        try:
+            with open(self.decision_log, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            print(f"Error logging {self.name}'s decision to {self.decision_log}: {e}")
+
     async def choose_action(self, current_bet, game_state):
-        original_prompt = self.generate_prompt(current_bet, game_state)
+        template = get_template(self.prompt_version)
+        messages = self.generate_messages(current_bet, game_state)
+        state_tokens = estimate_tokens(messages[-1]["content"])
+        print(f"{self.name} prompt [{self.prompt_version}]: ~{estimate_tokens(template.instructions)} static + ~{state_tokens} state tokens")
         max_attempts = 3
-        prompt = original_prompt
         error_context = ""
+        call_metrics = LLMCallMetrics(self.model_name, self.name)
         
         for attempt in range(max_attempts):
             try:
-                messages = [{"role": "user", "content": prompt}]
-                
-                response = completion(
-                    model=self.model_name,
-                    api_key=self.api_key,
-                    messages=messages,
-                )
+                call_started = time.perf_counter()
+                try:
+                    if self.fake_model:
+                        response = await self.fake_model.acomplete(messages)
+                    else:
+                        response = completion(
+                            model=self.model_name,
+                            api_key=self.api_key,
+                            api_base=self.api_base,
+                            messages=messages,
+                        )
+                except Exception:
+                    call_metrics.add_provider_error(time.perf_counter() - call_started)
+                    raise
+                call_metrics.add_response(response, time.perf_counter() - call_started)
+
                 response_text = response["choices"][0]["message"]["content"]
                 print(f"{self.name} raw response: {response_text}")
 
-                action, raise_amount = self.parse_response(response_text)
-                return action, raise_amount
+                usage = response.get("usage")
+                if usage:
+                    prompt_cache_stats.record(self.model_name, usage)
+                    print(f"{self.name} tokens: {usage_value(usage, 'prompt_tokens')} in "
+                          f"({cached_prompt_tokens(usage)} cached) / {usage_value(usage, 'completion_tokens')} out")
+
+                try:
+                    action, raise_amount = self.parse_response(response_text)
+                except Exception as e:
+                    call_metrics.add_parse_failure(e)
+                    raise
+                defaulted_to_fold = False
+                break
                 
             except Exception as e:
                 error_message = str(e)
@@ -125,13 +154,26 @@ class LLMPlayer(Player):
                     error_context += "Please correct your response to match EXACTLY one of the valid formats shown above.\n"
                     error_context += "Remember: The action MUST be 'fold', 'call', or 'raise' with correct raise_amount handling.\n"
                     
-                    # Create a new prompt with error feedback
-                    prompt = original_prompt + "\n" + error_context
+                    # Rebuild the state message with error feedback, keeping the cached prefix intact
+                    messages = self.generate_messages(current_bet, game_state, error_context)
                 else:
                     print(f"Error parsing {self.name}'s response after {max_attempts} attempts: {error_message}. Defaulting to FOLD.")
                     action, raise_amount = PlayerAction.FOLD, None
+                    defaulted_to_fold = True
         
+        # Recorded once per decision, outside the retry loop, so a failing hook never triggers another LLM call
+        self._finish_call(call_metrics, defaulted_to_fold)
+        self._log_decision(current_bet, game_state, action, raise_amount)
         return action, raise_amount
+
+    def _finish_call(self, call_metrics, defaulted_to_fold):
+        call = call_metrics.finish(defaulted_to_fold)
+        llm_metrics.record(call)
+        if self.on_call_metrics:
+            try:
+                self.on_call_metrics(call)
+            except Exception as e:
+                print(f"Error recording call metrics for {self.name}: {e}")
     
     def parse_response(self, response_text: str):
         # First, try to find a JSON object with regex
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Local OpenAI-compatible server backed by fake models.
+
+Point LLM players at it with a 'mock/<spec>' model name (see fake_llm.py for
+the spec format). The web server sends those through litellm's OpenAI
+client to MOCK_LLM_API_BASE, so the full network path is exercised without
+any real provider.
+"""
+import argparse
+import time
+from typing import Dict
+
+from fastapi import FastAPI, Body
+from fastapi.responses import JSONResponse
+
+from fake_llm import FakeModel, FakeModelError, create_fake_model
+
+app = FastAPI(title="PokerMind Mock LLM")
+
+# Requests carry no player identity, so like a real provider the server keeps
+# one model per spec whose random stream continues across requests
+models: Dict[str, FakeModel] = {}
+
+
+@app.get("/v1/models")
+async def list_models():
+    """List the fake strategies that can be used as model names"""
+    return {
+        "object": "list",
+        "data": [
+            {"id": name, "object": "model", "created": int(time.time()), "owned_by": "pokermind"}
+            for name in ("random", "caller", "folder", "raiser")
+        ]
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: dict = Body(...)):
+    """OpenAI chat completions endpoint answered by a fake model"""
+    try:
+        spec = request.get("model", "random")
+        if spec not in models:
+            models[spec] = create_fake_model(spec)
+        model = models[spec]
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={
+            "error": {"message": str(e), "type": "invalid_request_error", "code": "model_not_found"}
+        })
+
+    try:
+        return await model.acomplete(request.get("messages", []))
+    except FakeModelError as e:
+        return JSONResponse(status_code=503, content={
+            "error": {"message": str(e), "type": "server_error", "code": "service_unavailable"}
+        })
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock LLM server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8001, help="Port to listen on")
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,305 @@
+from typing import Any, Callable, Dict, List, Optional
+
+# Rough characters-per-token ratio used for budgeting. Real tokenizers vary by
+# provider, so this is only used to keep prompts within a budget; the exact
+# counts reported by the provider are logged separately when available.
+CHARS_PER_TOKEN = 4
+
+# The original prompt with the full hand history. Compact prompts and history
+# budgets change what the models see, so games opt into them explicitly.
+DEFAULT_PROMPT_VERSION = "verbose-v1"
+DEFAULT_HISTORY_TOKEN_BUDGET = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, provider-independent estimate of the token count of a string."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def summarize_actions(actions: List[str]) -> str:
+    """Collapse a list of history lines into a one-line summary."""
+    counts = {}
+    for line in actions:
+        lowered = line.lower()
+        if lowered.startswith("current round:"):
+            continue
+        for verb in ("folds", "checks", "calls", "bets", "raises", "all-in"):
+            if verb in lowered:
+                counts[verb] = counts.get(verb, 0) + 1
+                break
+
+    if not counts:
+        return f"[{len(actions)} earlier entries omitted]"
+
+    parts = ", ".join(f"{count} {verb}" for verb, count in counts.items())
+    return f"[{len(actions)} earlier entries omitted: {parts}]"
+
+
+def fit_history(actions: List[str], budget_tokens: Optional[int]) -> List[str]:
+    """
+    Keep the most recent history lines that fit in the token budget.
+
+    Older lines that do not fit are replaced by a single summary line so the
+    model still knows how much action happened earlier in the hand. Lines of
+    the current betting round are always kept, even over the budget.
+    """
+    if budget_tokens is None or budget_tokens <= 0:
+        return list(actions)
+
+    total = sum(estimate_tokens(line) for line in actions)
+    if total <= budget_tokens:
+        return list(actions)
+
+    current_round = 0
+    for i, line in enumerate(actions):
+        if line.lower().startswith("current round:"):
+            current_round = i
+    earlier, kept = actions[:current_round], list(actions[current_round:])
+    if not earlier:
+        return kept
+
+    used = sum(estimate_tokens(line) for line in kept)
+    # Reserve room for the summary line itself
+    remaining_budget = budget_tokens - estimate_tokens(summarize_actions(earlier))
+    for line in reversed(earlier):
+        cost = estimate_tokens(line)
+        if used + cost > remaining_budget:
+            break
+        kept.insert(0, line)
+        used += cost
+
+    omitted = actions[:len(actions) - len(kept)]
+    return [summarize_actions(omitted)] + kept
+
+
+VERBOSE_V1_INSTRUCTIONS = """
+You are an expert-level poker AI tasked with making optimal decisions in a poker game. Your job is to WIN! You will be given the current game state and your goal is to determine the best action to take.
+
+RESPONSE FORMAT REQUIREMENTS:
+You MUST respond with ONLY a valid JSON object in the following exact format:
+
+For folding:
+{
+  "action": "fold",
+  "raise_amount": null
+}
+
+For calling:
+{
+  "action": "call",
+  "raise_amount": null
+}
+
+For raising:
+{
+  "action": "raise",
+  "raise_amount": [your raise amount as integer]
+}
+
+CRITICAL RULES:
+1. Output ONLY the JSON object - no explanations, thoughts, or other text
+2. Only use actions "fold", "call", or "raise" (lowercase only)
+3. If action is "raise", raise_amount must be a positive integer (minimum is the "Minimum raise over current bet" in the game state)
+4. If action is "fold" or "call", raise_amount MUST be null (not a number)
+5. Do not use any other fields in your JSON response
+
+EXAMPLE VALID RESPONSES:
+{
+  "action": "fold",
+  "raise_amount": null
+}
+
+{
+  "action": "call",
+  "raise_amount": null
+}
+
+{
+  "action": "raise",
+  "raise_amount": 50
+}
+
+Any deviation from this exact format will cause errors. Respond with JSON only.
+""".strip()
+
+COMPACT_V1_INSTRUCTIONS = "\n".join([
+    "You are an expert poker player in a No-Limit Texas Hold'em game. Play to win.",
+    'Reply with ONLY one JSON object: {"action": "fold"|"call"|"raise", "raise_amount": integer|null}',
+    'raise_amount is an integer >= "Minimum raise over current bet" when action is "raise", otherwise null. No other text or fields.',
+])
+
+
+def render_verbose_state(state: Dict[str, Any]) -> str:
+    """Game state block used by the verbose template."""
+    history = "\n".join(state['history'])
+    return "\n".join([
+        "Here's the current game state:",
+        "",
+        f"Game history: {history}",
+        "",
+        f"Your Hole Cards: {state['hole_cards']}",
+        f"Community Cards: {state['community_cards']}",
+        f"Pot: {state['pot']}",
+        f"Your Chips: {state['chips']}",
+        f"Amount to call: {state['call_amount']}",
+        f"Minimum raise over current bet: {state['min_raise']}",
+        f"Current bet to match: {state['current_bet']}",
+    ])
+
+
+def render_compact_state(state: Dict[str, Any]) -> str:
+    """Game state block used by the compact template."""
+    return "\n".join([
+        f"Game history: {'; '.join(state['history'])}",
+        f"Your Hole Cards: {state['hole_cards']}",
+        f"Community Cards: {state['community_cards']}",
+        f"Pot: {state['pot']}",
+        f"Your Chips: {state['chips']}",
+        f"Amount to call: {state['call_amount']}",
+        f"Minimum raise over current bet: {state['min_raise']}",
+        f"Current bet to match: {state['current_bet']}",
+    ])
+
+
+class PromptTemplate:
+    """
+    A prompt split into a static instruction prefix and a per-decision state part.
+
+    The instructions never change between decisions, so they are sent first
+    where providers can serve them from their prompt cache.
+    """
+
+    def __init__(self, version: str, instructions: str, render_state: Callable[[Dict[str, Any]], str]):
+        self.version = version
+        self.instructions = instructions
+        self.render_state = render_state
+
+    def render(self, state: Dict[str, Any]) -> str:
+        """Render the whole prompt as a single string."""
+        return self.instructions + "\n\n" + self.render_state(state)
+
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {
+    "verbose-v1": PromptTemplate("verbose-v1", VERBOSE_V1_INSTRUCTIONS, render_verbose_state),
+    "compact-v1": PromptTemplate("compact-v1", COMPACT_V1_INSTRUCTIONS, render_compact_state),
+}
+
+
+def get_template(version: str) -> PromptTemplate:
+    """Look up a prompt template by version name."""
+    if version not in PROMPT_TEMPLATES:
+        available = ", ".join(sorted(PROMPT_TEMPLATES))
+        raise ValueError(f"Unknown prompt version '{version}'. Available versions: {available}")
+    return PROMPT_TEMPLATES[version]
+
+
+# Providers that take explicit cache breakpoints on message content. Others
+# (OpenAI, DeepSeek, Gemini) cache repeated prefixes automatically.
+EXPLICIT_CACHE_PREFIXES = ("claude", "anthropic/")
+
+# Shortest prefix providers will cache (Anthropic and OpenAI both require 1024
+# tokens); a cache_control marker on anything shorter never produces a hit
+MIN_CACHEABLE_PREFIX_TOKENS = 1024
+
+# Models that reject a system role; their instructions go first in the user turn
+NO_SYSTEM_ROLE_PREFIXES = ("o1-mini", "gemini/gemma")
+
+
+def build_messages(model_name: str, instructions: str, state_text: str) -> List[Dict[str, Any]]:
+    """
+    Build chat messages with the static instructions as a stable prefix.
+
+    Anthropic models get an ephemeral cache_control marker on the prefix once
+    it is long enough to be cached at all. The shipped templates are shorter
+    than that, so they are sent unmarked and cost no cache writes.
+    """
+    if model_name.startswith(NO_SYSTEM_ROLE_PREFIXES):
+        return [{"role": "user", "content": instructions + "\n\n" + state_text}]
+
+    if (model_name.startswith(EXPLICIT_CACHE_PREFIXES)
+            and estimate_tokens(instructions) >= MIN_CACHEABLE_PREFIX_TOKENS):
+        system_content = [{
+            "type": "text",
+            "text": instructions,
+            "cache_control": {"type": "ephemeral"},
+        }]
+    else:
+        system_content = instructions
+
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": state_text},
+    ]
+
+
+def usage_value(usage: Any, key: str) -> Any:
+    """Read a field from a usage dict or a provider usage object."""
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get(key)
+    return getattr(usage, key, None)
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """Number of prompt tokens the provider served from its prompt cache."""
+    details = usage_value(usage, "prompt_tokens_details")
+    cached = usage_value(details, "cached_tokens")
+    if cached:
+        return int(cached)
+
+    # Anthropic and DeepSeek report cache reads under their own field names
+    for key in ("cache_read_input_tokens", "prompt_cache_hit_tokens"):
+        cached = usage_value(usage, key)
+        if cached:
+            return int(cached)
+    return 0
+
+
+class PromptCacheStats:
+    """Per-model prompt cache hit counters."""
+
+    def __init__(self):
+        self.models: Dict[str, Dict[str, int]] = {}
+        # Called with (model_name, prompt_tokens, cached_tokens) for every recorded request
+        self.on_record: Optional[Callable[[str, int, int], None]] = None
+
+    def record(self, model_name: str, usage: Any) -> None:
+        """Record the usage block of one completion."""
+        if usage is None:
+            return
+        self.record_tokens(model_name, int(usage_value(usage, "prompt_tokens") or 0), cached_prompt_tokens(usage))
+
+    def record_tokens(self, model_name: str, prompt_tokens: int, cached: int) -> None:
+        """Record one request's prompt and cached token counts (also relayed from worker processes)."""
+        stats = self.models.setdefault(model_name, {
+            "requests": 0,
+            "cache_hits": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+        })
+        stats["requests"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_tokens"] += cached
+        if cached > 0:
+            stats["cache_hits"] += 1
+        if self.on_record is not None:
+            self.on_record(model_name, prompt_tokens, cached)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return counters and hit rates for every model seen so far."""
+        results = {}
+        for model_name, stats in self.models.items():
+            requests = stats["requests"]
+            prompt_tokens = stats["prompt_tokens"]
+            results[model_name] = dict(
+                stats,
+                hit_rate=round(stats["cache_hits"] * 100.0 / requests, 2) if requests else 0.0,
+                cached_token_rate=round(stats["cached_tokens"] * 100.0 / prompt_tokens, 2) if prompt_tokens else 0.0,
+            )
+        return results
+
+
+prompt_cache_stats = PromptCacheStats()
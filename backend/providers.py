@@ -0,0 +1,41 @@
+"""
+Provider lookup for the model names the server accepts.
+
+Model names are either the short names offered in the UI (claude-*, gpt-*,
+gemini-2.0-flash, deepseek-chat, ...) or litellm names with a provider
+prefix (anthropic/..., gemini/..., deepseek/...). Both map to the same
+provider, litellm model name and API key variable.
+"""
+import os
+from typing import Optional, Tuple
+
+# API key variable of each provider
+PROVIDER_API_KEYS = {
+    "anthropic": "ANTHROPIC_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "gemini": "GEMINI_API_KEY",
+    "deepseek": "DEEPSEEK_API_KEY",
+}
+
+# Short model names whose litellm name carries a provider prefix
+PREFIXED_MODELS = {
+    "gemini-2.0-flash": "gemini/gemini-2.0-flash",
+    "gemma-3-4b-it": "gemini/gemma-3-4b-it",
+    "deepseek-chat": "deepseek/deepseek-chat",
+    "deepseek-reasoner": "deepseek/deepseek-reasoner",
+}
+
+
+def resolve_provider(model_name: str) -> Tuple[str, str]:
+    """Provider and litellm model name of a model; unknown bare names default to OpenAI."""
+    model_name = PREFIXED_MODELS.get(model_name, model_name)
+    if "/" in model_name:
+        return model_name.split("/", 1)[0], model_name
+    if model_name.startswith("claude"):
+        return "anthropic", model_name
+    return "openai", model_name
+
+
+def provider_api_key(model_name: str) -> Optional[str]:
+    """API key for a model's provider, from the environment (OPENAI_API_KEY for unlisted providers)."""
+    return os.getenv(PROVIDER_API_KEYS.get(resolve_provider(model_name)[0], "OPENAI_API_KEY"))
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+import os
+import argparse
+import sys
+
+from leaderboard import LeaderboardManager
+
+def rebuild_aggregates(check_only=False):
+    """
+    Check the per-model leaderboard totals against the hand history and rebuild them.
+
+    Args:
+        check_only: If True, only report differences; exit with status 1 if there are any
+    """
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leaderboard.db')
+    if not os.path.exists(db_path):
+        print(f"Database file not found at {db_path}")
+        return
+
+    manager = LeaderboardManager(db_path)
+    mismatches = manager.check_aggregates()
+    for mismatch in mismatches:
+        kind = "official" if mismatch["is_official"] else "exhibition"
+        print(f"{mismatch['model_name']} ({kind}): stored {mismatch['stored']}, expected {mismatch['expected']}")
+
+    if not mismatches:
+        print("Model aggregates match the hand history.")
+    elif check_only:
+        sys.exit(1)
+
+    if not check_only:
+        manager.rebuild_aggregates()
+        print("Model aggregates rebuilt from the hand history.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and rebuild the per-model leaderboard aggregates.")
+    parser.add_argument('--check', action='store_true', help='Only report differences, do not rebuild')
+    args = parser.parse_args()
+
+    rebuild_aggregates(check_only=args.check)
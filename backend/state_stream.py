@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+from broadcaster import EncodedMessage
+
+DEFAULT_KEYFRAME_INTERVAL = 100
+DEFAULT_HISTORY_SIZE = 1000
+
+# Events after which a game's stream gets no more events
+FINAL_EVENTS = ("game_complete", "game_error")
+
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compact difference between two get_game_state snapshots.
+
+    Top-level fields that changed go under "changes"; per-player field
+    changes go under "players", keyed by player name.
+    """
+    changes = {
+        key: value for key, value in new.items()
+        if key != "players" and old.get(key) != value
+    }
+
+    old_players = {p["name"]: p for p in old.get("players", [])}
+    player_changes = {}
+    for player in new.get("players", []):
+        previous = old_players.get(player["name"], {})
+        changed = {key: value for key, value in player.items() if key != "name" and previous.get(key) != value}
+        if changed:
+            player_changes[player["name"]] = changed
+
+    delta = {}
+    if changes:
+        delta["changes"] = changes
+    if player_changes:
+        delta["players"] = player_changes
+    return delta
+
+
+class EventRing:
+    """
+    Fixed-size buffer of the most recent messages, addressed by sequence number.
+
+    Sequence numbers must be appended in increasing order; message seq
+    lives in slot seq % capacity, so append and lookup are O(1) and the
+    oldest message is overwritten once the buffer is full. After a gap only
+    the messages from the gap onwards can be replayed.
+    """
+
+    def __init__(self, capacity: int, start_seq: int = 0):
+        self.capacity = capacity
+        self.slots: List[Optional[EncodedMessage]] = [None] * capacity
+        self.first_seq = start_seq + 1
+        self.last_seq = start_seq
+
+    def __len__(self) -> int:
+        return self.last_seq - self.first_seq + 1
+
+    def append(self, seq: int, message: EncodedMessage) -> None:
+        if seq != self.last_seq + 1:
+            self.first_seq = seq
+        self.slots[seq % self.capacity] = message
+        self.last_seq = seq
+        self.first_seq = max(self.first_seq, seq - self.capacity + 1)
+
+    def get(self, seq: int) -> Optional[EncodedMessage]:
+        if self.first_seq <= seq <= self.last_seq:
+            return self.slots[seq % self.capacity]
+        return None
+
+    def since(self, seq: int) -> Optional[List[EncodedMessage]]:
+        """Messages after seq, or None if some of them were already overwritten."""
+        if seq > self.last_seq or seq + 1 < self.first_seq:
+            return None
+        return [self.slots[s % self.capacity] for s in range(seq + 1, self.last_seq + 1)]
+
+
+class GameStateStream:
+    """
+    Versioned state stream for one game.
+
+    Every game event advances the sequence number and produces a delta
+    against the previous snapshot. A keyframe (full state) is emitted every
+    keyframe_interval events, and the most recent deltas are kept so a
+    reconnecting client can resume from the last sequence it saw. Clients
+    apply a keyframe and then any delta with a higher seq, ignoring the rest.
+
+    The full events are kept in a second ring under the same sequence
+    numbers for late joiners and the SSE and long-poll feeds, which wait on
+    new events with wait_for(). Messages are stored encoded, so a replay
+    reuses the frames already built for the live broadcast.
+    """
+
+    def __init__(self, snapshot_fn: Callable[[], Dict[str, Any]],
+                 keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 history_size: int = DEFAULT_HISTORY_SIZE, start_seq: int = 0):
+        self.snapshot_fn = snapshot_fn
+        self.keyframe_interval = keyframe_interval
+        self.seq = start_seq
+        self.state = snapshot_fn()
+        self.deltas = EventRing(history_size, start_seq)
+        self.events = EventRing(history_size, start_seq)
+        self.complete = False
+        self._new_event = asyncio.Event()
+
+    def keyframe(self) -> Dict[str, Any]:
+        """Full state as of the current sequence number."""
+        return {"type": "keyframe", "seq": self.seq, "state": self.state}
+
+    def update(self, event_type: str, data: Dict[str, Any], seq: Optional[int] = None):
+        """
+        Advance the stream for a game event.
+
+        seq is only given when mirroring another node's stream. Returns the
+        full event and the delta-channel messages to broadcast, all as
+        EncodedMessage.
+        """
+        new_state = self.snapshot_fn()
+        self.seq = self.seq + 1 if seq is None else seq
+
+        event = EncodedMessage({"event": event_type, "data": data, "seq": self.seq})
+
+        # Event payloads are sent without their full player lists; player
+        # changes travel in the delta instead
+        delta = {
+            "type": "delta",
+            "seq": self.seq,
+            "event": event_type,
+            "data": {key: value for key, value in data.items() if key != "players"},
+        }
+        delta.update(diff_states(self.state, new_state))
+        self.state = new_state
+
+        deltas = [EncodedMessage(delta)]
+        if self.seq % self.keyframe_interval == 0:
+            deltas.append(EncodedMessage(self.keyframe()))
+
+        self.events.append(self.seq, event)
+        self.deltas.append(self.seq, deltas[0])
+        if event_type in FINAL_EVENTS:
+            self.complete = True
+
+        # Wake every waiter, then start a fresh event for the next round of waits
+        self._new_event.set()
+        self._new_event = asyncio.Event()
+        return event, deltas
+
+    def since(self, seq: int) -> Optional[List[EncodedMessage]]:
+        """
+        Deltas after the given sequence number, or None if they are no
+        longer buffered and the client needs a keyframe instead.
+        """
+        return self.deltas.since(seq)
+
+    def events_since(self, seq: int) -> Optional[List[EncodedMessage]]:
+        """Full events after the given sequence number, or None if some were already evicted."""
+        return self.events.since(seq)
+
+    async def wait_for(self, seq: int, timeout: float) -> bool:
+        """Wait until an event after seq exists; False on timeout or a finished game."""
+        if self.seq > seq:
+            return True
+        if self.complete:
+            return False
+        try:
+            await asyncio.wait_for(self._new_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.seq > seq
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import json
+import time
+
+import requests
+import websockets
+
+API_URL = "http://localhost:8000"
+WS_URL = "ws://localhost:8000"
+
+def create_game(models, num_hands):
+    response = requests.post(f"{API_URL}/games", json={
+        "small_blind": 5,
+        "big_blind": 10,
+        "player_stack": 1000,
+        "num_hands": num_hands,
+        "game_speed": "fast",
+        "llm_players": [
+            {"name": f"Player-{i}", "model": model} for i, model in enumerate(models)
+        ]
+    })
+    response.raise_for_status()
+    return response.json()["game_id"]
+
+def start_game(game_id):
+    response = requests.post(f"{API_URL}/games/{game_id}/start")
+    response.raise_for_status()
+
+async def spectate(game_id, counts):
+    """Count events until the game completes"""
+    async with websockets.connect(f"{WS_URL}/ws/games/{game_id}") as websocket:
+        while True:
+            event = json.loads(await websocket.recv())
+            counts[game_id] = counts.get(game_id, 0) + 1
+            if event.get("event") == "game_complete":
+                return
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the API with offline fake models.")
+    parser.add_argument("--games", type=int, default=10, help="Number of concurrent games")
+    parser.add_argument("--hands", type=int, default=10, help="Hands per game")
+    parser.add_argument("--spectators", type=int, default=1, help="WebSocket spectators per game")
+    parser.add_argument("--model", default="fake/random?latency=0.5&latency_dist=exponential&malformed_rate=0.05",
+                        help="Model spec for every player (fake/... in-process, mock/... via mock_llm_server.py)")
+    args = parser.parse_args()
+
+    models = [args.model] * 3
+    # requests is blocking, so calls run in threads to keep the spectators' event loop free
+    loop = asyncio.get_running_loop()
+    game_ids = await asyncio.gather(*(
+        loop.run_in_executor(None, create_game, models, args.hands) for _ in range(args.games)
+    ))
+    print(f"Created {len(game_ids)} games")
+
+    counts = {}
+    spectators = [
+        asyncio.create_task(spectate(game_id, counts))
+        for game_id in game_ids
+        for _ in range(args.spectators)
+    ]
+    await asyncio.sleep(0.5)
+
+    started = time.monotonic()
+    await asyncio.gather(*(loop.run_in_executor(None, start_game, game_id) for game_id in game_ids))
+
+    await asyncio.gather(*spectators)
+    elapsed = time.monotonic() - started
+    total_events = sum(counts.values())
+    print(f"{args.games} games finished in {elapsed:.1f}s, {total_events} events delivered ({total_events / elapsed:.1f}/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+import sys
+import os
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import broadcaster as broadcaster_module
+from broadcaster import GameBroadcaster, MSGPACK_SUBPROTOCOL
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.closed = False
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("socket is gone")
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        await asyncio.sleep(self.delay)
+        self.sent.append(broadcaster_module.msgpack.unpackb(data))
+
+    async def close(self):
+        self.closed = True
+
+
+class TestGameBroadcaster:
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_block_others(self):
+        """publish() returns immediately even when one spectator is stalled"""
+        broadcaster = GameBroadcaster()
+        fast = FakeWebSocket()
+        stalled = FakeWebSocket(delay=60)
+        broadcaster.subscribe(fast)
+        broadcaster.subscribe(stalled)
+
+        for i in range(10):
+            broadcaster.publish({"event": "player_action", "data": {"i": i}})
+        await asyncio.sleep(0.05)
+
+        assert [m["data"]["i"] for m in fast.sent] == list(range(10))
+        assert stalled.sent == []
+        broadcaster.close()
+
+    @pytest.mark.asyncio
+    async def test_dead_socket_is_pruned(self):
+        """A socket that errors is removed instead of raising into the game"""
+        broadcaster = GameBroadcaster()
+        broadcaster.subscribe(FakeWebSocket(fail=True))
+        broadcaster.publish({"event": "hand_started", "data": {}})
+        await asyncio.sleep(0.01)
+
+        assert broadcaster.get_stats()["clients"] == 0
+
+    @pytest.mark.asyncio
+    async def test_overflow_coalesces_then_drops(self):
+        """A full queue is replaced by a snapshot; repeated overflows disconnect the client"""
+        broadcaster = GameBroadcaster(snapshot_fn=lambda: {"pot": 42}, max_queue=4, max_overflows=1)
+        stalled = FakeWebSocket(delay=60)
+        client = broadcaster.subscribe(stalled)
+        await asyncio.sleep(0)
+
+        for i in range(5):
+            broadcaster.publish({"event": "player_action", "data": {"i": i}})
+        queued = [m.message for m in client.queue._queue]
+        assert queued[0] == {"event": "game_state", "data": {"pot": 42}}
+        assert queued[-1]["data"] == {"i": 4}
+
+        for i in range(5):
+            broadcaster.publish({"event": "player_action", "data": {"i": i}})
+        await asyncio.sleep(0)
+        assert broadcaster.get_stats()["clients"] == 0
+        assert stalled.closed
+
+    @pytest.mark.asyncio
+    async def test_event_encoded_once_for_all_clients(self):
+        """JSON encoding cost does not grow with the number of spectators"""
+        broadcaster = GameBroadcaster()
+        sockets = [FakeWebSocket() for _ in range(50)]
+        for websocket in sockets:
+            broadcaster.subscribe(websocket)
+
+        with patch.object(broadcaster_module, "encode_json", wraps=broadcaster_module.encode_json) as encode:
+            broadcaster.publish({"event": "player_action", "data": {"player": "A", "amount": 10}})
+            await asyncio.sleep(0.01)
+
+        assert encode.call_count == 1
+        assert all(ws.sent == [{"event": "player_action", "data": {"player": "A", "amount": 10}}] for ws in sockets)
+        broadcaster.close()
+
+    @pytest.mark.asyncio
+    async def test_msgpack_clients_get_binary_frames(self):
+        """Clients that negotiated the msgpack subprotocol receive MessagePack"""
+        if broadcaster_module.msgpack is None:
+            pytest.skip("msgpack not installed")
+        broadcaster = GameBroadcaster()
+        websocket = FakeWebSocket()
+        broadcaster.subscribe(websocket, MSGPACK_SUBPROTOCOL)
+        broadcaster.publish({"event": "hand_started", "data": {"hand_number": 3}})
+        await asyncio.sleep(0.01)
+
+        assert websocket.sent == [{"event": "hand_started", "data": {"hand_number": 3}}]
+        broadcaster.close()
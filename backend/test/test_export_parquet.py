@@ -0,0 +1,99 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import LeaderboardManager
+from export_parquet import export_history
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestParquetExport(unittest.TestCase):
+    """Completed games are exported once each, in the order they finished"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        LeaderboardManager.close_connections()
+        self.leaderboard = LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+        self.out_dir = os.path.join(self.tmp.name, "export")
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def add_game(self, game_id, end_time):
+        self.leaderboard.register_game(game_id, 1000, 5, 10, 2, ["m1", "m2"], is_official=True)
+        for hand in (1, 2):
+            self.leaderboard.record_hand_result(game_id, hand, "m1", 10, True, 1000, 1010, 10)
+            self.leaderboard.record_hand_result(game_id, hand, "m2", -10, False, 1000, 990, 10)
+        self.leaderboard.complete_game(game_id, {"m1": 1020, "m2": 980})
+        with self.leaderboard._get_connection() as conn:
+            conn.execute("UPDATE games SET end_time = ? WHERE id = ?", (end_time, game_id))
+            conn.commit()
+
+    def test_batches_resume_after_games_ending_in_the_same_second(self):
+        """Following since/exclude_ids visits every completed game once"""
+        for i, end_time in enumerate(["2026-01-01 10:00:00"] * 3 + ["2026-01-02 09:00:00"]):
+            self.add_game(f"g{i}", end_time)
+        self.leaderboard.register_game("running", 1000, 5, 10, 2, ["m1"])
+
+        seen, since, exclude = [], None, []
+        while True:
+            games = self.leaderboard.get_completed_games(since, exclude, limit=2)
+            if not games:
+                break
+            at_last = [g["game_id"] for g in games if g["end_time"] == games[-1]["end_time"]]
+            exclude = (exclude if games[-1]["end_time"] == since else []) + at_last
+            since = games[-1]["end_time"]
+            seen.extend(g["game_id"] for g in games)
+        self.assertEqual(seen, ["g0", "g1", "g2", "g3"])
+
+        details = self.leaderboard.get_games_details(["g3"])
+        self.assertEqual(len(details["game_participants"]), 2)
+        self.assertEqual(len(details["hand_results"]), 4)
+
+    @unittest.skipIf(pq is None, "pyarrow not installed")
+    def test_incremental_partitioned_export(self):
+        """A second export only appends games completed since the first"""
+        self.add_game("g0", "2026-01-01 10:00:00")
+        self.add_game("g1", "2026-01-02 09:00:00")
+        self.assertEqual(export_history(self.leaderboard, self.out_dir)["hand_results"], 8)
+        self.assertTrue(os.path.isdir(os.path.join(self.out_dir, "hand_results", "date=2026-01-02")))
+
+        self.add_game("g2", "2026-01-02 11:00:00")
+        counts = export_history(self.leaderboard, self.out_dir)
+        self.assertEqual(counts, {"games": 1, "game_participants": 2, "hand_results": 4})
+        self.assertEqual(export_history(self.leaderboard, self.out_dir)["games"], 0)
+
+        games = pq.read_table(os.path.join(self.out_dir, "games"))
+        self.assertEqual(sorted(games.column("game_id").to_pylist()), ["g0", "g1", "g2"])
+        hands = pq.read_table(os.path.join(self.out_dir, "hand_results"))
+        self.assertEqual(hands.num_rows, 12)
+
+    @unittest.skipIf(pq is None, "pyarrow not installed")
+    def test_rerun_after_interrupted_export(self):
+        """Files written before the state could be saved are replaced, not duplicated"""
+        self.add_game("g0", "2026-01-01 10:00:00")
+        self.add_game("g1", "2026-01-02 09:00:00")
+        with patch("export_parquet.save_state", side_effect=OSError("interrupted")):
+            with self.assertRaises(OSError):
+                export_history(self.leaderboard, self.out_dir, batch_size=2)
+
+        # A rerun with smaller batches still leaves each game exported once
+        self.assertEqual(export_history(self.leaderboard, self.out_dir, batch_size=1)["games"], 2)
+        games = pq.read_table(os.path.join(self.out_dir, "games"))
+        self.assertEqual(sorted(games.column("game_id").to_pylist()), ["g0", "g1"])
+        hands = pq.read_table(os.path.join(self.out_dir, "hand_results"))
+        self.assertEqual(hands.num_rows, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from fake_llm import FakeModel, FakeModelError
+from llm_player import LLMPlayer
+from game import Game
+from mock_llm_server import app
+
+PROMPT = [{"role": "user", "content": "Amount to call: 10\nMinimum raise over current bet: 10"}]
+
+
+class TestFakeModels(unittest.TestCase):
+    """Fake models and the mock OpenAI-compatible server"""
+
+    def test_same_spec_is_deterministic(self):
+        """Two models with the same spec produce the same sequence"""
+        first = FakeModel("random?malformed_rate=0.3&error_rate=0.2")
+        second = FakeModel("random?malformed_rate=0.3&error_rate=0.2")
+
+        def run(model):
+            outputs = []
+            for _ in range(20):
+                try:
+                    outputs.append(model.respond(PROMPT)["choices"][0]["message"]["content"])
+                except FakeModelError:
+                    outputs.append("error")
+            return outputs
+
+        self.assertEqual(run(first), run(second))
+
+    def test_rates_and_strategies(self):
+        """Error and malformed rates apply, and strategies answer as named"""
+        with self.assertRaises(FakeModelError):
+            FakeModel("caller?error_rate=1").respond(PROMPT)
+
+        player = LLMPlayer("Bot", 1000, 0, "fake/caller", "fake")
+        malformed = FakeModel("caller?malformed_rate=1").respond(PROMPT)["choices"][0]["message"]["content"]
+        with self.assertRaises(ValueError):
+            player.parse_response(malformed)
+
+        folder = FakeModel("folder").respond(PROMPT)["choices"][0]["message"]["content"]
+        self.assertEqual(player.parse_response(folder)[0].value, "fold")
+
+        with self.assertRaises(ValueError):
+            FakeModel("bluffer")
+
+    def test_game_with_fake_players(self):
+        """A full game runs offline with fake LLM players"""
+        players = [
+            LLMPlayer("Caller", 1000, 0, "fake/caller", "fake"),
+            LLMPlayer("Raiser", 1000, 1, "fake/raiser?malformed_rate=0.2", "fake"),
+            LLMPlayer("Random", 1000, 2, "fake/random?error_rate=0.1", "fake"),
+        ]
+        game = Game(players, sb=5, bb=10, delay_between_actions=0, delay_between_stages=0, delay_after_hand=0)
+        asyncio.run(game.play_game(3))
+
+        self.assertGreaterEqual(game.hand_number, 1)
+        self.assertTrue(all(p.chips >= 0 for p in players))
+
+    def test_players_have_their_own_models(self):
+        """Players sharing a spec draw from separate random streams, so one game does not shift another"""
+        def play():
+            players = [
+                LLMPlayer("A", 1000, 0, "fake/random", "fake"),
+                LLMPlayer("B", 1000, 1, "fake/random", "fake"),
+            ]
+            self.assertIsNot(players[0].fake_model, players[1].fake_model)
+            game = Game(players, sb=5, bb=10, delay_between_actions=0, delay_between_stages=0,
+                        delay_after_hand=0, seed=3)
+            asyncio.run(game.play_game(3))
+            return [p.chips for p in players]
+
+        self.assertEqual(play(), play())
+
+    def test_mock_server_chat_completions(self):
+        """The mock server speaks the OpenAI chat completions format"""
+        client = TestClient(app)
+        response = client.post("/v1/chat/completions", json={"model": "caller", "messages": PROMPT})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('"call"', response.json()["choices"][0]["message"]["content"])
+
+        response = client.post("/v1/chat/completions", json={"model": "caller?error_rate=1", "messages": PROMPT})
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
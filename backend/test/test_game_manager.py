@@ -0,0 +1,354 @@
+import sys
+import os
+import asyncio
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import LeaderboardManager
+
+
+class TestGameEviction(unittest.TestCase):
+    """Finished games are reduced to a stored summary and freed"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        LeaderboardManager.close_connections()
+        self.leaderboard = LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def play(self, manager):
+        from web_server import GameConfig
+
+        config = GameConfig(
+            small_blind=5, big_blind=10, player_stack=1000, num_hands=2, game_speed="fast",
+            llm_players=[{"name": "A", "model": "fake/raiser"}, {"name": "B", "model": "fake/caller"}]
+        )
+        game_id = manager.create_game(config)
+        game = manager.active_games[game_id]["game"]
+        game.delay_between_actions = game.delay_between_stages = game.delay_after_hand = 0
+        return game_id
+
+    def test_finished_game_is_evicted(self):
+        """After the TTL the game's in-memory state is gone and its summary is in the DB"""
+        # Imported here so the server's module-level leaderboard shares the temporary database
+        from web_server import GameManager
+
+        manager = GameManager(completed_game_ttl=0, num_workers=0)
+        game_id = self.play(manager)
+
+        async def run():
+            await manager.start_game(game_id)
+            self.assertEqual(manager.get_memory_stats()["games_by_status"], {"completed": 1})
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+
+        self.assertNotIn(game_id, manager.active_games)
+        self.assertNotIn(game_id, manager.game_tasks)
+        self.assertNotIn(game_id, manager.player_chips_history)
+        self.assertNotIn(game_id, manager.state_streams)
+
+        summary = self.leaderboard.get_game_summary(game_id)
+        self.assertEqual(summary["status"], "completed")
+        self.assertEqual([p["name"] for p in summary["players"]], ["A", "B"])
+
+        stats = manager.get_memory_stats()
+        self.assertEqual(stats["active_games"], 0)
+        self.assertEqual(stats["evicted_games"], 1)
+
+    def test_decisions_logged_for_replay(self):
+        """With a decision log directory, every LLM decision of a game is recorded for llm_batch"""
+        from web_server import GameManager
+        from llm_batch import load_records
+
+        log_dir = os.path.join(self.tmp.name, "decisions")
+        manager = GameManager(completed_game_ttl=60, num_workers=0, decision_log_dir=log_dir)
+        game_id = self.play(manager)
+        asyncio.run(manager.start_game(game_id))
+
+        records = load_records(os.path.join(log_dir, f"{game_id}.jsonl"))
+        self.assertTrue(records)
+        self.assertEqual({record["name"] for record in records}, {"A", "B"})
+        self.assertTrue(all("game_state" in record and "action" in record for record in records))
+
+    def test_errored_game_ends_its_streams(self):
+        """A game that raises ends its SSE feed and long poll with a game_error event"""
+        import web_server
+        from unittest.mock import patch
+        from web_server import GameManager, stream_game_events, poll_game_events
+
+        manager = GameManager(completed_game_ttl=60, num_workers=0)
+        game_id = self.play(manager)
+
+        async def broken_hand():
+            raise RuntimeError("table collapsed")
+
+        manager.active_games[game_id]["game"].play_hand = broken_hand
+
+        class Request:
+            headers = {}
+
+            async def is_disconnected(self):
+                return False
+
+        async def run():
+            with self.assertRaises(RuntimeError):
+                await manager.start_game(game_id)
+            response = await stream_game_events(game_id, Request(), since=0)
+            frames = [frame async for frame in response.body_iterator]
+            poll = await poll_game_events(game_id, cursor=0, timeout=0)
+            return frames, poll
+
+        with patch.object(web_server, "game_manager", manager):
+            frames, poll = asyncio.run(asyncio.wait_for(run(), timeout=10))
+
+        self.assertIn("event: game_error", frames[-1])
+        self.assertIn("table collapsed", frames[-1])
+        self.assertIn(b'"complete":true', poll.body)
+        self.assertEqual(manager.get_game_state(game_id)["status"], "error")
+
+    def test_prompt_options_are_opt_in(self):
+        """Games use the verbose, unbudgeted prompt unless their config asks otherwise"""
+        from web_server import GameManager, GameConfig
+
+        manager = GameManager(completed_game_ttl=60, num_workers=0)
+        players = [{"name": "A", "model": "fake/raiser"}, {"name": "B", "model": "fake/caller"}]
+        default_id = manager.create_game(GameConfig(
+            small_blind=5, big_blind=10, player_stack=1000, num_hands=1, llm_players=players
+        ))
+        compact_id = manager.create_game(GameConfig(
+            small_blind=5, big_blind=10, player_stack=1000, num_hands=1, llm_players=players,
+            prompt_version="compact-v1", history_token_budget=200
+        ))
+
+        default = manager.active_games[default_id]["game"].players[0]
+        compact = manager.active_games[compact_id]["game"].players[0]
+        self.assertEqual((default.prompt_version, default.history_token_budget), ("verbose-v1", None))
+        self.assertEqual((compact.prompt_version, compact.history_token_budget), ("compact-v1", 200))
+
+    def test_state_cache_invalidation(self):
+        """The serialized state is reused until a game event or status change"""
+        from web_server import GameManager
+
+        manager = GameManager(completed_game_ttl=60, num_workers=0)
+        game_id = self.play(manager)
+        game = manager.active_games[game_id]["game"]
+
+        etag, body = manager.get_cached_state(game_id)
+        self.assertIs(manager.get_cached_state(game_id)[1], body)
+
+        game.pot = 30
+        self.assertIs(manager.get_cached_state(game_id)[1], body)
+        asyncio.run(game.callback("player_action", {"player": "A"}))
+        new_etag, new_body = manager.get_cached_state(game_id)
+        self.assertNotEqual(new_etag, etag)
+        self.assertIn(b'"pot":30', new_body)
+
+        manager.active_games[game_id]["status"] = "queued"
+        self.assertIn(b'"status":"queued"', manager.get_cached_state(game_id)[1])
+
+    def test_game_played_in_worker_process(self):
+        """A game run in the worker pool is mirrored from its events and tracked on the leaderboard"""
+        from web_server import GameManager
+        from prompts import prompt_cache_stats
+
+        prompt_cache_stats.models.clear()
+        manager = GameManager(completed_game_ttl=60, num_workers=1)
+        game_id = self.play(manager)
+        manager.active_games[game_id]["game"].spec.update(
+            delay_between_actions=0, delay_between_stages=0, delay_after_hand=0
+        )
+
+        async def run():
+            try:
+                await asyncio.wait_for(manager.start_game(game_id), timeout=60)
+                return manager.get_game_state(game_id), manager.get_memory_stats()["workers"]
+            finally:
+                manager.close()
+
+        state, workers = asyncio.run(run())
+        # Prompt cache counters recorded in the worker are relayed to this process
+        self.assertGreater(prompt_cache_stats.get_stats()["fake/raiser"]["requests"], 0)
+
+        self.assertEqual(state["status"], "completed")
+        self.assertEqual(state["hand_number"], 2)
+        self.assertEqual(workers["running_games"], 0)
+        self.assertEqual(len(manager.player_chips_history[game_id]["A"]), 3)
+        self.assertEqual(manager.state_streams[game_id].events_since(0)[-1].message["event"], "game_complete")
+
+    def test_worker_games_are_handled_independently(self):
+        """A worker game whose callback waits does not hold up the events of another"""
+        from game_worker import GameWorkerPool, RemoteGame
+
+        spec = {"players": [], "big_blind": 10}
+        release = asyncio.Event()
+        handled = []
+
+        async def slow_callback(event_type, data):
+            await release.wait()
+            handled.append(("slow", event_type))
+
+        async def fast_callback(event_type, data):
+            handled.append(("fast", event_type))
+
+        async def run():
+            pool = GameWorkerPool(0)
+            pool.messages = asyncio.Queue()
+            dispatch = asyncio.create_task(pool._dispatch())
+            tasks = []
+            for game_id, callback in (("slow", slow_callback), ("fast", fast_callback)):
+                game = RemoteGame(spec, callback)
+                game.done = asyncio.get_running_loop().create_future()
+                pool.games[game_id] = game
+                tasks.append(asyncio.create_task(pool._handle_game(game_id, game)))
+                pool.messages.put_nowait(("event", game_id, "game_complete", {}, game.snapshot))
+                pool.messages.put_nowait(("finished", game_id, None))
+
+            await asyncio.wait_for(pool.games["fast"].done, timeout=5)
+            self.assertFalse(pool.games["slow"].done.done())
+            release.set()
+            await asyncio.wait_for(pool.games["slow"].done, timeout=5)
+            for task in tasks + [dispatch]:
+                task.cancel()
+
+        asyncio.run(run())
+        self.assertEqual(handled, [("fast", "game_complete"), ("slow", "game_complete")])
+
+    def test_game_followed_from_another_node(self):
+        """A second node serves the state and event stream of a game the first node owns"""
+        from web_server import GameManager
+        from broker import GameCluster, InProcessBroker
+
+        broker = InProcessBroker()
+        owner = GameManager(completed_game_ttl=60, num_workers=0, cluster=GameCluster(broker, "node-a"))
+        other = GameManager(completed_game_ttl=60, num_workers=0, cluster=GameCluster(broker, "node-b"))
+        game_id = self.play(owner)
+
+        async def run():
+            await owner.start_cluster()
+            await other.start_cluster()
+            await owner.announce_game(game_id)
+
+            mirror = await other.get_stream(game_id)
+            self.assertEqual(mirror.state["status"], "created")
+
+            # Start the game through the node that does not own it
+            await other.cluster.send_command("node-a", {"command": "start", "game_id": game_id})
+            while not mirror.complete:
+                await mirror.wait_for(mirror.seq, timeout=5)
+
+            record = await other.cluster.get_game(game_id)
+            await owner.stop_cluster()
+            await other.stop_cluster()
+            return mirror, record
+
+        mirror, record = asyncio.run(run())
+        events = owner.state_streams[game_id].events_since(0)
+
+        self.assertEqual(record["owner"], "node-a")
+        self.assertEqual(mirror.seq, events[-1].message["seq"])
+        self.assertEqual([e.message for e in mirror.events_since(0)], [e.message for e in events])
+        self.assertNotIn(game_id, other.active_games)
+
+    def test_games_of_a_gone_owner_expire(self):
+        """The owner's heartbeat keeps its games registered; once it stops they are not found"""
+        import web_server
+        from unittest.mock import patch
+        from fastapi import HTTPException
+        from web_server import GameManager
+        from broker import GameCluster, InProcessBroker
+
+        broker = InProcessBroker()
+        owner = GameManager(completed_game_ttl=60, num_workers=0,
+                            cluster=GameCluster(broker, "node-a", owner_ttl=0.2))
+        other = GameManager(completed_game_ttl=60, num_workers=0, cluster=GameCluster(broker, "node-b"))
+        game_id = self.play(owner)
+
+        async def run():
+            await owner.start_cluster()
+            await owner.announce_game(game_id)
+            await asyncio.sleep(0.5)
+            alive = await other.cluster.get_game(game_id)
+
+            # The owner's node goes away without finishing its game
+            owner.cluster.heartbeat_task.cancel()
+            await asyncio.sleep(0.3)
+            with patch.object(web_server, "game_manager", other):
+                with self.assertRaises(HTTPException) as error:
+                    await web_server.start_game(game_id, priority=0)
+            await other.stop_cluster()
+            return alive, error.exception
+
+        alive, error = asyncio.run(run())
+
+        self.assertEqual(alive["owner"], "node-a")
+        self.assertEqual(error.status_code, 404)
+        self.assertEqual(owner.active_games[game_id]["status"], "created")
+
+    def test_finished_game_records_expire(self):
+        """A finished game's record is kept for finished_ttl, then removed from the broker"""
+        from web_server import GameManager
+        from broker import GameCluster, InProcessBroker
+
+        broker = InProcessBroker()
+        manager = GameManager(completed_game_ttl=60, num_workers=0,
+                              cluster=GameCluster(broker, "node-a", finished_ttl=0.2))
+        game_id = self.play(manager)
+
+        async def run():
+            await manager.start_cluster()
+            await manager.start_game(game_id)
+            while manager.cluster.publishers:
+                await asyncio.sleep(0.01)
+            finished = await manager.cluster.get_game(game_id)
+            await asyncio.sleep(0.3)
+            expired = await manager.cluster.get_game(game_id)
+            await manager.stop_cluster()
+            return finished, expired
+
+        finished, expired = asyncio.run(run())
+
+        self.assertEqual(finished["state"]["status"], "completed")
+        self.assertIsNone(expired)
+        self.assertNotIn(game_id, manager.cluster.games)
+
+    def test_game_completes_when_broker_fails(self):
+        """Broker errors are logged by the game's publisher and never reach the game loop"""
+        from web_server import GameManager
+        from broker import GameCluster, InProcessBroker
+
+        class FailingBroker(InProcessBroker):
+            async def publish(self, channel, message):
+                raise ConnectionError("broker unavailable")
+
+            async def set(self, key, value, ttl=None):
+                raise ConnectionError("broker unavailable")
+
+        manager = GameManager(completed_game_ttl=60, num_workers=0, cluster=GameCluster(FailingBroker(), "node-a"))
+        game_id = self.play(manager)
+
+        async def run():
+            await asyncio.wait_for(manager.start_game(game_id), timeout=30)
+            # Let the publisher drain its queue
+            while manager.cluster.publishers:
+                await asyncio.sleep(0.01)
+            stats = manager.get_memory_stats()["cluster"]
+            await manager.stop_cluster()
+            return stats
+
+        stats = asyncio.run(run())
+
+        self.assertEqual(manager.active_games[game_id]["status"], "completed")
+        self.assertEqual(manager.get_game_state(game_id)["hand_number"], 2)
+        self.assertEqual(stats["published"], 0)
+        self.assertEqual(stats["errors"] + stats["dropped"], manager.state_streams[game_id].seq + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_scheduler import GameScheduler
+from deck import Deck
+
+
+class TestGameScheduler(unittest.TestCase):
+    """Bounded, prioritized game starts"""
+
+    def test_concurrency_cap_and_priority(self):
+        """At most max_concurrent games run, and queued games start by priority then order"""
+        started = []
+        peak = [0]
+
+        async def scenario():
+            release = asyncio.Event()
+
+            async def start(game_id):
+                started.append(game_id)
+                peak[0] = max(peak[0], len(scheduler.running))
+                await release.wait()
+                if game_id == "low-2":
+                    raise RuntimeError("provider down")
+
+            scheduler = GameScheduler(start, max_concurrent=2)
+            batch_id = scheduler.create_batch(["low-1", "low-2", "low-3", "high"])
+            positions = [scheduler.enqueue(game_id) for game_id in ["low-1", "low-2", "low-3"]]
+            positions.append(scheduler.enqueue("high", priority=5))
+            await asyncio.sleep(0)
+
+            status = scheduler.get_status()
+            release.set()
+            while scheduler.running or scheduler.queued:
+                await asyncio.sleep(0.01)
+            return positions, status, scheduler.get_status(), scheduler.get_batch(batch_id)
+
+        positions, status, final, batch = asyncio.run(scenario())
+
+        self.assertEqual(positions, [0, 0, 1, 1])
+        self.assertEqual(status["running"], 2)
+        self.assertEqual(status["queued_by_priority"], {"5": 1, "0": 1})
+        self.assertEqual(started, ["low-1", "low-2", "high", "low-3"])
+        self.assertEqual(peak[0], 2)
+        self.assertEqual((final["completed"], final["failed"]), (3, 1))
+        self.assertEqual(batch["counts"], {"completed": 3, "error": 1})
+
+    def test_cancelled_game_requeued_at_the_back(self):
+        """A game cancelled and queued again starts after the games queued before it"""
+        started = []
+
+        async def scenario():
+            release = asyncio.Event()
+
+            async def start(game_id):
+                started.append(game_id)
+                await release.wait()
+
+            scheduler = GameScheduler(start, max_concurrent=1)
+            scheduler.enqueue("running")
+            scheduler.enqueue("a", priority=5)
+            scheduler.enqueue("b")
+            self.assertTrue(scheduler.cancel("a"))
+            self.assertEqual(scheduler.enqueue("a"), 2)
+            release.set()
+            while scheduler.running or scheduler.queued:
+                await asyncio.sleep(0.01)
+
+        asyncio.run(scenario())
+        self.assertEqual(started, ["running", "b", "a"])
+
+    def test_close_cancels_running_games(self):
+        """Running games are held until they finish, and close() cancels them without starting queued ones"""
+        started = []
+        cancelled = []
+
+        async def scenario():
+            async def start(game_id):
+                started.append(game_id)
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    cancelled.append(game_id)
+                    raise
+
+            scheduler = GameScheduler(start, max_concurrent=1)
+            batch_id = scheduler.create_batch(["running", "queued"])
+            scheduler.enqueue("running")
+            scheduler.enqueue("queued")
+            await asyncio.sleep(0)
+            self.assertEqual(len(scheduler.tasks), 1)
+
+            await scheduler.close()
+            await asyncio.sleep(0)
+            return scheduler, scheduler.get_batch(batch_id)
+
+        scheduler, batch = asyncio.run(scenario())
+        self.assertEqual(started, ["running"])
+        self.assertEqual(cancelled, ["running"])
+        self.assertEqual(scheduler.tasks, set())
+        self.assertEqual(batch["games"], {"running": "cancelled", "queued": "queued"})
+
+    def test_seeded_deck_is_reproducible(self):
+        """Decks with the same seed deal the same cards, hand after hand"""
+        first, second = Deck(seed=7), Deck(seed=7)
+        for _ in range(3):
+            first.shuffle()
+            second.shuffle()
+            self.assertEqual([str(c) for c in first.deal(9)], [str(c) for c in second.deal(9)])
+
+
+if __name__ == "__main__":
+    unittest.main()
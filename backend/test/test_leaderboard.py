@@ -0,0 +1,381 @@
+import sys
+import os
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import LeaderboardManager, MIGRATIONS
+
+
+class TestLeaderboardConnections(unittest.TestCase):
+    """One WAL writer connection plus pooled read-only connections"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        LeaderboardManager.close_connections()
+        self.leaderboard = LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def test_reads_do_not_wait_for_writes(self):
+        """Queries see the last commit while a write transaction is open"""
+        self.leaderboard.register_game("g1", 1000, 5, 10, 5, ["m1"])
+
+        with self.leaderboard._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            conn.execute("UPDATE games SET status = 'completed' WHERE id = 'g1'")
+
+            # The writer holds an uncommitted change; a reader sees the committed state
+            games = self.leaderboard.get_all_games(include_in_progress=True)
+            self.assertEqual([game["status"] for game in games], ["in_progress"])
+            conn.commit()
+
+        games = self.leaderboard.get_all_games(include_in_progress=True)
+        self.assertEqual([game["status"] for game in games], ["completed"])
+
+    def test_readers_are_read_only_and_pooled(self):
+        """Reader connections reject writes and are reused"""
+        with self.leaderboard._read_connection() as first:
+            with self.assertRaises(Exception):
+                first.execute("DELETE FROM games")
+        with self.leaderboard._read_connection() as second:
+            self.assertIs(first, second)
+
+    def test_busy_pool_and_exports_never_wait(self):
+        """Open exports hold their own connections, and a busy pool opens an extra reader"""
+        from leaderboard import READ_POOL_SIZE
+
+        self.leaderboard.register_game("g1", 1000, 5, 10, 5, ["m1"])
+        exports = [self.leaderboard.iter_games() for _ in range(READ_POOL_SIZE + 1)]
+        for rows in exports:
+            self.assertEqual(next(rows)["game_id"], "g1")
+        self.assertEqual(LeaderboardManager._reader_count, 0)
+
+        held = [self.leaderboard._read_connection() for _ in range(READ_POOL_SIZE)]
+        readers = [context.__enter__() for context in held]
+        with self.leaderboard._read_connection() as extra:
+            self.assertNotIn(extra, readers)
+            self.assertEqual(extra.execute("SELECT COUNT(*) FROM games").fetchone()[0], 1)
+        for context in held:
+            context.__exit__(None, None, None)
+        for rows in exports:
+            rows.close()
+        self.assertEqual(LeaderboardManager._readers.qsize(), READ_POOL_SIZE)
+
+    def test_model_ids_are_cached(self):
+        """Hand writes for known models don't look the model up, and registration is one transaction"""
+        self.leaderboard.register_game("g1", 1000, 5, 10, 5, ["m1", "m2"])
+        self.assertEqual(set(LeaderboardManager._model_ids), {"m1", "m2"})
+
+        def trace(action):
+            statements = []
+            with self.leaderboard._get_connection() as conn:
+                conn.set_trace_callback(statements.append)
+                try:
+                    action()
+                finally:
+                    conn.set_trace_callback(None)
+            return statements
+
+        statements = trace(lambda: self.leaderboard.record_hand_result("g1", 1, "m1", 10, True, 1000, 1010, 10))
+        self.assertFalse([s for s in statements if "FROM models" in s])
+
+        # A new model is inserted in the game's own transaction
+        statements = trace(lambda: self.leaderboard.register_game("g2", 1000, 5, 10, 5, ["m1", "m3"]))
+        self.assertEqual(statements.count("COMMIT"), 1)
+        self.assertEqual(self.leaderboard.register_model("m3"), LeaderboardManager._model_ids["m3"])
+
+        # A fresh manager loads the ids at startup
+        LeaderboardManager.close_connections()
+        LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+        self.assertEqual(set(LeaderboardManager._model_ids), {"m1", "m2", "m3"})
+
+
+class TestModelAggregates(unittest.TestCase):
+    """Per-model totals are maintained with every hand and can be rebuilt"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        LeaderboardManager.close_connections()
+        self.leaderboard = LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+        self.leaderboard.register_game("official", 1000, 5, 10, 5, ["m1", "m2"], is_official=True)
+        self.leaderboard.register_game("exhibition", 1000, 5, 10, 5, ["m1", "m2"])
+        for game_id in ("official", "exhibition"):
+            for hand in range(1, 4):
+                self.leaderboard.record_hand_result(game_id, hand, "m1", 20, True, 1000, 1020, 10)
+                self.leaderboard.record_hand_result(game_id, hand, "m2", -20, False, 1000, 980, 10)
+        self.leaderboard.record_hand_result("official", 4, "m2", 50, True, 940, 990, 20)
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def test_leaderboard_reads_aggregates(self):
+        """Totals match the hand history for official-only and all games"""
+        official = {row["model_name"]: row for row in self.leaderboard.get_leaderboard()}
+        self.assertEqual(official["m1"]["games_played"], 1)
+        self.assertEqual(official["m1"]["hands_played"], 3)
+        self.assertEqual(official["m2"]["hands_won"], 1)
+        self.assertEqual(official["m2"]["net_profit"], -10)
+        self.assertEqual(official["m2"]["bb_per_100"], round(-10 * 100.0 / 50 / 4, 2))
+
+        everything = {row["model_name"]: row for row in self.leaderboard.get_leaderboard(official_only=False)}
+        self.assertEqual(everything["m1"]["games_played"], 2)
+        self.assertEqual(everything["m1"]["net_profit"], 120)
+        self.assertEqual(everything["m2"]["win_rate"], round(100.0 / 7, 2))
+        self.assertEqual(self.leaderboard.check_aggregates(), [])
+
+    def test_rebuild_repairs_drift(self):
+        """check_aggregates() reports totals that drifted and rebuild_aggregates() fixes them"""
+        with self.leaderboard._get_connection() as conn:
+            conn.execute("UPDATE model_aggregates SET net_profit = 0 WHERE is_official = 1")
+            conn.commit()
+
+        mismatches = self.leaderboard.check_aggregates()
+        self.assertEqual(sorted(m["model_name"] for m in mismatches), ["m1", "m2"])
+        self.assertEqual(mismatches[0]["expected"]["net_profit"] - mismatches[0]["stored"]["net_profit"], 60)
+
+        self.leaderboard.rebuild_aggregates()
+        self.assertEqual(self.leaderboard.check_aggregates(), [])
+
+    def test_stats_for_several_models(self):
+        """One call returns overall totals, the official/exhibition split and recent games per model"""
+        self.leaderboard.complete_game("official", {"m1": 1060, "m2": 940})
+        self.leaderboard.complete_game("exhibition", {"m1": 1060, "m2": 940})
+
+        stats = self.leaderboard.get_models_stats(["m2", "m1", "unknown"])
+        self.assertEqual(list(stats), ["m2", "m1"])
+        self.assertEqual(stats["m1"]["hands_played"], 3)
+        self.assertEqual(stats["m1"]["win_rate"], 100.0)
+        self.assertEqual(stats["m2"]["status_counts"]["exhibition"],
+                         {"games_played": 1, "hands_played": 3, "net_profit": -60})
+        self.assertEqual([g["game_id"] for g in stats["m1"]["recent_games"]], ["official"])
+        self.assertEqual(stats["m1"]["recent_games"][0]["profit_loss"], 60)
+
+        everything = self.leaderboard.get_models_stats(["m1"], official_only=False)["m1"]
+        self.assertEqual(everything["games_played"], 2)
+        self.assertEqual(len(everything["recent_games"]), 2)
+        self.assertEqual(self.leaderboard.get_model_stats("m1"), stats["m1"])
+        self.assertIn("error", self.leaderboard.get_model_stats("unknown"))
+
+    def test_compare_endpoint(self):
+        """/leaderboard/compare is not shadowed by /leaderboard/{model_name}"""
+        from fastapi.testclient import TestClient
+        import web_server
+
+        client = TestClient(web_server.app)
+        response = client.get("/leaderboard/compare", params={"model_names": ["m1", "m2"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m["model_name"] for m in response.json()["comparison"]], ["m1", "m2"])
+        self.assertEqual(client.get("/leaderboard/m1").json()["hands_played"], 3)
+
+    def test_cached_leaderboard_responses(self):
+        """Leaderboard responses are reused with an ETag until the next hand is recorded"""
+        from fastapi.testclient import TestClient
+        import web_server
+
+        client = TestClient(web_server.app)
+        etag = client.get("/leaderboard").headers["etag"]
+        cached = web_server.leaderboard_cache[("leaderboard", 10, True)]
+
+        # Polling without new hands reuses the encoded response
+        self.assertEqual(client.get("/leaderboard", headers={"If-None-Match": etag}).status_code, 304)
+        self.assertIs(web_server.leaderboard_cache[("leaderboard", 10, True)], cached)
+
+        self.leaderboard.record_hand_result("official", 5, "m1", 40, True, 1060, 1100, 10)
+        second = client.get("/leaderboard", headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["etag"], etag)
+        self.assertEqual(second.json()["leaderboard"][0]["net_profit"], 100)
+
+
+class TestHistoryPagination(unittest.TestCase):
+    """Keyset pages and streamed exports of games and hand results"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        LeaderboardManager.close_connections()
+        self.leaderboard = LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+        # Games started in the same second are ordered by id
+        for i in range(5):
+            self.leaderboard.register_game(f"g{i}", 1000, 5, 10, 5, ["m1", "m2"])
+            for hand in range(1, 4):
+                self.leaderboard.record_hand_result(f"g{i}", hand, "m1", 10, True, 1000, 1010, 10)
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def test_keyset_pages(self):
+        """Following next_cursor visits every row exactly once"""
+        game_ids, cursor = [], None
+        while True:
+            games, cursor = self.leaderboard.get_games_page(limit=2, include_in_progress=True, after=cursor)
+            game_ids.extend(game["game_id"] for game in games)
+            if cursor is None:
+                break
+        self.assertEqual(game_ids, ["g4", "g3", "g2", "g1", "g0"])
+        self.assertEqual(games[0]["models"], ["m1", "m2"])
+
+        hands, cursor = self.leaderboard.get_hand_results_page(limit=2, game_id="g2")
+        more, last = self.leaderboard.get_hand_results_page(limit=2, game_id="g2", after=cursor)
+        self.assertEqual([(h["game_id"], h["hand_number"]) for h in hands + more],
+                         [("g2", 1), ("g2", 2), ("g2", 3)])
+        self.assertIsNone(last)
+
+        with self.assertRaises(ValueError):
+            self.leaderboard.get_hand_results_page(after="not-a-cursor")
+
+    def test_streamed_export(self):
+        """The export endpoint streams every row as NDJSON or CSV"""
+        from fastapi.testclient import TestClient
+        import web_server
+
+        client = TestClient(web_server.app)
+        response = client.get("/admin/export/hands", params={"model_name": "m1"})
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(rows), 15)
+        self.assertEqual([row["id"] for row in rows], sorted(row["id"] for row in rows))
+
+        response = client.get("/admin/export/games", params={"format": "csv"})
+        games = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual([game["game_id"] for game in games], ["g4", "g3", "g2", "g1", "g0"])
+        self.assertEqual(games[0]["models"], "m1;m2")
+
+        self.assertEqual(client.get("/admin/export/games", params={"format": "xml"}).status_code, 400)
+        self.assertEqual(client.get("/admin/hands", params={"cursor": "bad"}).status_code, 400)
+
+
+class TestArchival(unittest.TestCase):
+    """Old games move to archive databases without changing the leaderboard"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        LeaderboardManager.close_connections()
+        self.leaderboard = LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+        games = [("jan", "2026-01-15 10:00:00", True), ("feb", "2026-02-15 10:00:00", False),
+                 ("mar", "2026-03-15 10:00:00", True)]
+        for game_id, end_time, official in games:
+            self.leaderboard.register_game(game_id, 1000, 5, 10, 2, ["m1", "m2"], is_official=official)
+            for hand in (1, 2):
+                self.leaderboard.record_hand_result(game_id, hand, "m1", 15, True, 1000, 1015, 10)
+                self.leaderboard.record_hand_result(game_id, hand, "m2", -15, False, 1000, 985, 10)
+            self.leaderboard.complete_game(game_id, {"m1": 1030, "m2": 970})
+            with self.leaderboard._get_connection() as conn:
+                conn.execute("UPDATE games SET end_time = ? WHERE id = ?", (end_time, game_id))
+                conn.commit()
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def count_hands(self):
+        with self.leaderboard._read_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM hand_results").fetchone()[0]
+
+    def test_archive_keeps_totals(self):
+        """Archived hands leave the database but still count, and can be read back"""
+        before = self.leaderboard.get_leaderboard(official_only=False)
+        moved = self.leaderboard.archive_games(before="2026-03-01")
+
+        self.assertEqual(sorted(os.path.basename(path) for path in moved),
+                         ["leaderboard-2026-01.db", "leaderboard-2026-02.db"])
+        self.assertEqual(self.count_hands(), 4)
+        self.assertEqual(self.leaderboard.get_leaderboard(official_only=False), before)
+        self.assertEqual(self.leaderboard.check_aggregates(), [])
+        self.leaderboard.rebuild_aggregates()
+        self.assertEqual(self.leaderboard.get_leaderboard(official_only=False), before)
+
+        # Each archive is a complete leaderboard database of its period
+        archive = sqlite3.connect(os.path.join(self.tmp.name, "archive", "leaderboard-2026-01.db"))
+        self.assertEqual(archive.execute("SELECT hands_played FROM model_aggregates").fetchall(), [(2,), (2,)])
+        archive.close()
+
+        hands, _ = self.leaderboard.get_hand_results_page(limit=100, include_archives=True)
+        self.assertEqual(len(hands), 12)
+        games, _ = self.leaderboard.get_games_page(include_archives=True)
+        self.assertEqual(sorted(game["game_id"] for game in games), ["feb", "jan", "mar"])
+
+    def test_reads_include_every_archive(self):
+        """Archives beyond one connection's attach limit are read in groups and merged in order"""
+        from unittest.mock import patch
+
+        self.leaderboard.archive_games(before="2026-03-01")
+        expected_games = [game["game_id"] for game in self.leaderboard.iter_games()]
+        with patch("leaderboard.MAX_ATTACHED_ARCHIVES", 1):
+            games, cursor = self.leaderboard.get_games_page(limit=2, include_archives=True)
+            more, _ = self.leaderboard.get_games_page(limit=2, after=cursor, include_archives=True)
+            streamed = [game["game_id"] for game in self.leaderboard.iter_games(include_archives=True)]
+
+            hands, cursor = [], None
+            while True:
+                page, cursor = self.leaderboard.get_hand_results_page(limit=5, after=cursor, include_archives=True)
+                hands.extend(hand["id"] for hand in page)
+                if cursor is None:
+                    break
+            exported = [hand["id"] for hand in self.leaderboard.iter_hand_results(include_archives=True)]
+
+        self.assertEqual(expected_games, ["mar"])
+        self.assertEqual([game["game_id"] for game in games + more], streamed)
+        self.assertEqual(sorted(streamed), ["feb", "jan", "mar"])
+        self.assertEqual(hands, sorted(hands))
+        self.assertEqual(len(hands), 12)
+        self.assertEqual(exported, hands)
+
+    def test_archive_exhibition_games(self):
+        """Exhibition games can be archived regardless of age, and repeating a run moves nothing"""
+        moved = self.leaderboard.archive_games(exhibition_only=True, period="year")
+        self.assertEqual(list(moved.values()), [1])
+        self.assertEqual(self.leaderboard.archive_games(exhibition_only=True), {})
+        self.assertEqual([game["game_id"] for game in self.leaderboard.get_all_games()], ["mar", "jan"])
+
+        with self.assertRaises(ValueError):
+            self.leaderboard.archive_games()
+
+
+class TestLeaderboardMigrations(unittest.TestCase):
+    """Existing databases are upgraded to the latest schema in place"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        LeaderboardManager.close_connections()
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def test_unversioned_database_is_upgraded(self):
+        """A database created before migrations keeps its rows and gains the indexes"""
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE models (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL, description TEXT)")
+        conn.execute("INSERT INTO models (name) VALUES ('m1')")
+        conn.commit()
+        conn.close()
+
+        leaderboard = LeaderboardManager(self.path)
+        with leaderboard._read_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(MIGRATIONS))
+            self.assertEqual(conn.execute("SELECT name FROM models").fetchall(), [("m1",)])
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT SUM(profit_loss) FROM hand_results WHERE model_id = 1"
+            ).fetchall()
+        self.assertIn("COVERING INDEX idx_hand_results_model_game", " ".join(row[-1] for row in plan))
+
+        # Reopening an up-to-date database applies nothing
+        LeaderboardManager.close_connections()
+        with LeaderboardManager(self.path)._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(MIGRATIONS))
+
+
+if __name__ == "__main__":
+    unittest.main()
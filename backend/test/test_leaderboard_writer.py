@@ -0,0 +1,97 @@
+import sys
+import os
+import asyncio
+import tempfile
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import LeaderboardManager
+from leaderboard_writer import LeaderboardWriter
+
+
+class TestLeaderboardWriter(unittest.TestCase):
+    """Leaderboard records are committed in batches from a background thread"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        LeaderboardManager.close_connections()
+        self.leaderboard = LeaderboardManager(os.path.join(self.tmp.name, "test.db"))
+        self.leaderboard.register_game("g1", 1000, 5, 10, 5, ["m1", "m2"])
+
+    def tearDown(self):
+        LeaderboardManager.close_connections()
+        self.tmp.cleanup()
+
+    def count(self, table):
+        with self.leaderboard._get_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_records_are_batched(self):
+        """Queued records are written in full batches and flush() commits the rest"""
+        writer = LeaderboardWriter(self.leaderboard, max_batch=10, flush_interval=5)
+        for hand in range(1, 26):
+            writer.record_hand_result("g1", hand, "m1", 10, True, 1000, 1010, 10)
+
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(self.count("hand_results"), 25)
+        stats = writer.get_stats()
+        self.assertEqual(stats["records"], 25)
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(stats["errors"], 0)
+        writer.close()
+
+    def test_complete_game_commits_queued_records(self):
+        """complete_game() is applied after the records queued before it"""
+        writer = LeaderboardWriter(self.leaderboard, max_batch=100, flush_interval=5)
+
+        async def run():
+            writer.record_hand_result("g1", 1, "m1", 50, True, 1000, 1050, 10)
+            writer.record_hand_result("g1", 1, "m2", -50, False, 1000, 950, 10)
+            return await writer.wait(writer.complete_game("g1", {"m1": 1050, "m2": 950}), timeout=5)
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertEqual(self.count("hand_results"), 2)
+        with self.leaderboard._get_connection() as conn:
+            status = conn.execute("SELECT status FROM games WHERE id = 'g1'").fetchone()[0]
+        self.assertEqual(status, "completed")
+
+        # Records queued before close() are committed on shutdown
+        writer.record_hand_result("g1", 2, "m1", 10, True, 1050, 1060, 10)
+        writer.close()
+        self.assertEqual(self.count("hand_results"), 3)
+
+    def test_bad_record_only_loses_itself(self):
+        """A failing batch is retried record by record; the game's status reports the loss"""
+        insert = self.leaderboard._insert_hand_result
+
+        def failing_insert(cursor, game_id, hand_number, *args):
+            if hand_number == 5:
+                raise ValueError("bad record")
+            insert(cursor, game_id, hand_number, *args)
+
+        self.leaderboard._insert_hand_result = failing_insert
+        writer = LeaderboardWriter(self.leaderboard, max_batch=100, flush_interval=5)
+        for hand in range(1, 11):
+            writer.record_hand_result("g1", hand, "m1", 10, True, 1000, 1010, 10)
+        done = writer.complete_game("g1", {"m1": 1100, "m2": 900})
+
+        self.assertTrue(done.wait(5))
+        self.assertFalse(done.ok)
+        with self.leaderboard._get_connection() as conn:
+            hands = [row[0] for row in conn.execute("SELECT hand_number FROM hand_results ORDER BY hand_number")]
+            status = conn.execute("SELECT status FROM games WHERE id = 'g1'").fetchone()[0]
+        self.assertEqual(hands, [1, 2, 3, 4, 6, 7, 8, 9, 10])
+        self.assertEqual(status, "completed")
+        self.assertEqual(writer.get_stats()["dropped"], 1)
+
+        # Later writes are unaffected and report success
+        writer.record_hand_result("g1", 11, "m1", 10, True, 1000, 1010, 10)
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(self.count("hand_results"), 10)
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import sys
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_batch import (BatchCollector, LocalBatchBackend, ProviderBatchBackend, run_batch, replay_decisions,
+                       load_records, player_from_decision_point, split_provider)
+from llm_player import LLMPlayer
+from deck import Card
+
+
+def fake_completion(model, messages, **kwargs):
+    """Call when there is a bet to face, otherwise raise"""
+    content = messages[-1]["content"]
+    if "Amount to call: 0" in content:
+        return {"choices": [{"message": {"content": '{"action": "raise", "raise_amount": 20}'}}]}
+    return {"choices": [{"message": {"content": '{"action": "call", "raise_amount": null}'}}]}
+
+
+class TestBatchPipeline(unittest.TestCase):
+    """Batch collection, local submission and replay"""
+
+    def setUp(self):
+        self.game_state = {
+            'actions_so_far': ['current round: pre-flop', 'Player1 calls 10'],
+            'community_cards': '',
+            'pot': 25,
+            'min_raise': 10
+        }
+
+    def record_decisions(self, path):
+        player = LLMPlayer("Bot", 1000, 0, "gpt-4o", "fake-key", decision_log=path)
+        player.hand = [Card("hearts", "A"), Card("spades", "10")]
+        with patch('llm_player.completion', side_effect=fake_completion):
+            asyncio.run(player.choose_action(10, self.game_state))
+            asyncio.run(player.choose_action(0, self.game_state))
+
+    def test_decision_point_round_trip(self):
+        """A recorded decision rebuilds the same prompt"""
+        player = LLMPlayer("Bot", 1000, 0, "gpt-4o", "fake-key")
+        player.hand = [Card("hearts", "A"), Card("spades", "10")]
+        player.current_bet = 5
+
+        record = json.loads(json.dumps(player.to_decision_point(10, self.game_state)))
+        rebuilt = player_from_decision_point(record)
+
+        self.assertEqual(rebuilt.generate_messages(10, self.game_state), player.generate_messages(10, self.game_state))
+
+    def test_failed_log_write_keeps_decision(self):
+        """A decision log that cannot be written is reported without another LLM call"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "missing", "decisions.jsonl")
+            player = LLMPlayer("Bot", 1000, 0, "gpt-4o", "fake-key", decision_log=path)
+            player.hand = [Card("hearts", "A"), Card("spades", "10")]
+            with patch('llm_player.completion', side_effect=fake_completion) as completion:
+                action, _ = asyncio.run(player.choose_action(10, self.game_state))
+
+        self.assertEqual(action.value, "call")
+        self.assertEqual(completion.call_count, 1)
+
+    def test_replay_through_local_backend(self):
+        """Stored decisions are batched, polled and parsed back into actions"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "decisions.jsonl")
+            self.record_decisions(path)
+            records = load_records(path)
+
+        collector = BatchCollector()
+        for record in records:
+            collector.add_decision(record["custom_id"], record)
+
+        backend = LocalBatchBackend(completion_fn=fake_completion)
+        results = run_batch(collector.requests, backend, poll_interval=0)
+        replayed = replay_decisions(records, results)
+
+        self.assertEqual([r["action"] for r in replayed], ["call", "raise"])
+        self.assertEqual([r["recorded_action"] for r in replayed], ["call", "raise"])
+        self.assertEqual(replayed[1]["raise_amount"], 20)
+
+    def test_failed_requests_are_reported(self):
+        """A request that errors shows up as a replay error instead of aborting the batch"""
+        def broken_completion(model, messages, **kwargs):
+            raise RuntimeError("provider unavailable")
+
+        collector = BatchCollector()
+        collector.add_prompt("p1", "gpt-4o", "What do you do?")
+        results = run_batch(collector.requests, LocalBatchBackend(completion_fn=broken_completion), poll_interval=0)
+        replayed = replay_decisions([{"custom_id": "p1"}], results)
+
+        self.assertIsNone(replayed[0]["action"])
+        self.assertIsNotNone(replayed[0]["error"])
+
+    def test_models_resolve_to_their_batch_provider(self):
+        """Bare model names map to providers as the server maps them; unsupported ones are rejected"""
+        self.assertEqual(split_provider("claude-3-5-sonnet-20241022"), ("anthropic", "claude-3-5-sonnet-20241022"))
+        self.assertEqual(split_provider("gpt-4o"), ("openai", "gpt-4o"))
+        self.assertEqual(split_provider("gemini-2.0-flash"), ("gemini", "gemini-2.0-flash"))
+        self.assertEqual(split_provider("deepseek/deepseek-chat"), ("deepseek", "deepseek-chat"))
+
+        collector = BatchCollector()
+        collector.add_prompt("p1", "claude-3-5-sonnet-20241022", "What do you do?")
+        with patch("litellm.create_file") as create_file:
+            with self.assertRaisesRegex(ValueError, "anthropic"):
+                ProviderBatchBackend(api_key="key").submit(collector.requests)
+        create_file.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import os
+import asyncio
 from player import Player
 from llm_player import LLMPlayer
 from game import Game
@@ -9,23 +10,29 @@ load_dotenv()
 def test_llm_players():
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY not found! Please check your .env file.")
+    if OPENAI_API_KEY:
+        model_name = "gpt-4o"
+        game_kwargs = {}
+    else:
+        # No key available: play against deterministic offline fake models
+        print("OPENAI_API_KEY not found, using fake models.")
+        model_name, OPENAI_API_KEY = "fake/random", "fake"
+        game_kwargs = {"delay_between_actions": 0, "delay_between_stages": 0, "delay_after_hand": 0}
     
     players = [
-        LLMPlayer("GPT-4-Bob", 1000, 0, "gpt-4o", OPENAI_API_KEY),
-        LLMPlayer("GPT-4-Ann", 1000, 1, "gpt-4o", OPENAI_API_KEY),
-        LLMPlayer("GPT-4-Joe", 1000, 2, "gpt-4o", OPENAI_API_KEY)
+        LLMPlayer("GPT-4-Bob", 1000, 0, model_name, OPENAI_API_KEY),
+        LLMPlayer("GPT-4-Ann", 1000, 1, model_name, OPENAI_API_KEY),
+        LLMPlayer("GPT-4-Joe", 1000, 2, model_name, OPENAI_API_KEY)
     ]
 
-    game = Game(players, sb=5, bb=10)
+    game = Game(players, sb=5, bb=10, **game_kwargs)
 
     print("\n=== Starting Poker Game with LLM Players ===\n")
 
     num_hands = 2  # number of hands to play for testing purposes
     for i in range(num_hands):
         print(f"\n\n================== HAND {i+1} ==================\n")
-        game.play_hand()
+        asyncio.run(game.play_hand())
 
     print("\n=== Final Chip Counts ===")
     for player in players:
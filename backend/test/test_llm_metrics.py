@@ -0,0 +1,121 @@
+import sys
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_metrics import LLMMetrics, Histogram, classify_failure
+from llm_player import LLMPlayer
+from leaderboard import LeaderboardManager
+from deck import Card
+
+
+class TestLLMMetrics(unittest.TestCase):
+    """Per-call LLM instrumentation"""
+
+    def setUp(self):
+        self.game_state = {
+            'actions_so_far': ['current round: pre-flop', 'Player1 calls 10'],
+            'community_cards': '',
+            'pot': 25,
+            'min_raise': 10
+        }
+
+    def run_decision(self, responses):
+        calls = []
+        player = LLMPlayer("Bot", 1000, 0, "gpt-4o", "fake-key")
+        player.hand = [Card("hearts", "A"), Card("spades", "K")]
+        player.on_call_metrics = calls.append
+        with patch('llm_player.completion', side_effect=responses):
+            asyncio.run(player.choose_action(10, self.game_state))
+        return calls[0]
+
+    def test_retries_and_failure_reasons(self):
+        """Each attempt, parse failure and token count is captured"""
+        usage = {"prompt_tokens": 120, "completion_tokens": 10}
+        call = self.run_decision([
+            {"choices": [{"message": {"content": "Let me think..."}}], "usage": usage},
+            RuntimeError("rate limited"),
+            {"choices": [{"message": {"content": '{"action": "call", "raise_amount": null}'}}], "usage": usage},
+        ])
+
+        self.assertEqual(call["attempts"], 3)
+        self.assertEqual(call["retries"], 2)
+        self.assertEqual(call["provider_errors"], 1)
+        self.assertEqual(call["parse_failures"], ["no_json"])
+        self.assertEqual(call["input_tokens"], 240)
+        self.assertFalse(call["defaulted_to_fold"])
+        self.assertGreaterEqual(call["wall_time"], call["provider_time"])
+
+    def test_failing_hook_does_not_retry(self):
+        """An error in the metrics hook is logged, not treated as a parse failure"""
+        player = LLMPlayer("Bot", 1000, 0, "gpt-4o", "fake-key")
+        player.hand = [Card("hearts", "A"), Card("spades", "K")]
+        calls = []
+
+        def failing_hook(call):
+            calls.append(call)
+            raise OSError("disk full")
+
+        player.on_call_metrics = failing_hook
+        response = {"choices": [{"message": {"content": '{"action": "call", "raise_amount": null}'}}]}
+        with patch('llm_player.completion', side_effect=[response]) as completion:
+            action, _ = asyncio.run(player.choose_action(10, self.game_state))
+
+        self.assertEqual(action.value, "call")
+        self.assertEqual(completion.call_count, 1)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0]["attempts"], 1)
+
+    def test_aggregation(self):
+        """Calls are aggregated per model into histograms and totals"""
+        metrics = LLMMetrics()
+        base = {"model_name": "gpt-4o", "player_name": "Bot", "provider_time": 0.3, "attempts": 1,
+                "retries": 0, "input_tokens": 100, "output_tokens": 10, "cached_tokens": 0,
+                "cost": 0.001, "provider_errors": 0, "parse_failures": [], "defaulted_to_fold": False}
+        metrics.record(dict(base, wall_time=0.4))
+        metrics.record(dict(base, wall_time=3.0, attempts=2, retries=1, parse_failures=["invalid_json"], cost=None))
+
+        stats = metrics.get_stats()["gpt-4o"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(stats["parse_failures"], {"invalid_json": 1})
+        self.assertEqual(stats["unpriced_calls"], 1)
+        self.assertEqual(stats["wall_time"]["buckets"]["le_0.5"], 1)
+        self.assertEqual(stats["wall_time"]["buckets"]["le_5.0"], 1)
+
+        histogram = Histogram()
+        for value in [0.05] * 9 + [20.0]:
+            histogram.observe(value)
+        self.assertEqual(histogram.percentile(50), 0.1)
+        self.assertEqual(histogram.percentile(95), 30.0)
+        self.assertEqual(classify_failure(ValueError("LLM response validation error: Expecting value")), "invalid_json")
+
+    def test_persisted_next_to_hand_results(self):
+        """Recorded calls roll up into per-game cost totals"""
+        with tempfile.TemporaryDirectory() as tmp:
+            LeaderboardManager.close_connections()
+            try:
+                manager = LeaderboardManager(os.path.join(tmp, "test.db"))
+                manager.register_game("g1", 1000, 5, 10, 5, ["gpt-4o"])
+                call = self.run_decision([
+                    {"choices": [{"message": {"content": '{"action": "fold", "raise_amount": null}'}}],
+                     "usage": {"prompt_tokens": 100, "completion_tokens": 8}},
+                ])
+                manager.record_llm_call("g1", 1, call)
+                manager.record_llm_call("g1", 2, call)
+
+                costs = manager.get_game_llm_costs("g1")
+                self.assertEqual(costs[0]["model_name"], "gpt-4o")
+                self.assertEqual(costs[0]["calls"], 2)
+                self.assertEqual(costs[0]["input_tokens"], 200)
+            finally:
+                LeaderboardManager.close_connections()
+
+
+if __name__ == "__main__":
+    unittest.main()
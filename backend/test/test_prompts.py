@@ -0,0 +1,148 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import patch
+
+from prompts import (estimate_tokens, fit_history, get_template, build_messages,
+                     cached_prompt_tokens, PromptCacheStats, PROMPT_TEMPLATES, MIN_CACHEABLE_PREFIX_TOKENS)
+from llm_player import LLMPlayer
+from deck import Card
+
+class TestPromptTemplates(unittest.TestCase):
+    """Unit tests for prompt templates and history budgeting"""
+
+    def setUp(self):
+        self.game_state = {
+            'actions_so_far': ['current round: pre-flop', 'Player1 calls 10'],
+            'community_cards': '',
+            'pot': 25,
+            'min_raise': 10
+        }
+
+    def test_history_within_budget_is_unchanged(self):
+        """Short histories are passed through untouched"""
+        actions = ['current round: pre-flop', 'Player1 calls 10']
+        self.assertEqual(fit_history(actions, 200), actions)
+
+    def test_history_over_budget_is_summarized(self):
+        """Older lines are replaced by a summary and the newest are kept"""
+        actions = (['current round: pre-flop'] + [f"Player{i} calls 10" for i in range(50)]
+                   + ['current round: flop', 'Player0 checks'])
+        fitted = fit_history(actions, 40)
+
+        self.assertTrue(fitted[0].startswith("["))
+        self.assertIn("calls", fitted[0])
+        self.assertEqual(fitted[-3:], ["Player49 calls 10", "current round: flop", "Player0 checks"])
+        self.assertLessEqual(sum(estimate_tokens(line) for line in fitted), 40)
+
+    def test_current_round_is_never_dropped(self):
+        """Lines of the current betting round are kept even when they alone exceed the budget"""
+        current = ['current round: turn'] + [f"Player{i} raises to {i * 20}" for i in range(30)]
+        actions = ['current round: pre-flop', 'Player0 calls 10', 'Player1 checks'] + current
+        fitted = fit_history(actions, 20)
+
+        self.assertEqual(fitted, ["[3 earlier entries omitted: 1 calls, 1 checks]"] + current)
+
+    def test_default_prompt_is_unbudgeted_verbose(self):
+        """Players use the verbose prompt with the full history unless a game opts in"""
+        actions = ['current round: pre-flop'] + [f"Player{i} calls 10" for i in range(200)]
+        player = LLMPlayer("Bot", 1000, 0, "fake-model", "fake-key")
+        player.hand = [Card("hearts", "A"), Card("spades", "K")]
+        prompt = player.generate_prompt(20, dict(self.game_state, actions_so_far=actions))
+
+        self.assertEqual(player.prompt_version, "verbose-v1")
+        self.assertIn("Player0 calls 10", prompt)
+        self.assertNotIn("earlier entries omitted", prompt)
+
+    def test_compact_prompt_is_shorter(self):
+        """The compact template carries the same state in fewer tokens"""
+        verbose = LLMPlayer("Bot", 1000, 0, "fake-model", "fake-key", prompt_version="verbose-v1")
+        compact = LLMPlayer("Bot", 1000, 0, "fake-model", "fake-key", prompt_version="compact-v1")
+        for player in (verbose, compact):
+            player.hand = [Card("hearts", "A"), Card("spades", "K")]
+
+        verbose_prompt = verbose.generate_prompt(20, self.game_state)
+        compact_prompt = compact.generate_prompt(20, self.game_state)
+
+        for prompt in (verbose_prompt, compact_prompt):
+            self.assertIn("Your Hole Cards: AhKs", prompt)
+            self.assertIn("Amount to call: 20", prompt)
+            self.assertIn("Player1 calls 10", prompt)
+        self.assertLess(estimate_tokens(compact_prompt), estimate_tokens(verbose_prompt) // 2)
+
+    def test_unknown_version_rejected(self):
+        """Unknown template versions fail fast"""
+        with self.assertRaises(ValueError):
+            get_template("does-not-exist")
+        with self.assertRaises(ValueError):
+            LLMPlayer("Bot", 1000, 0, "fake-model", "fake-key", prompt_version="does-not-exist")
+
+    def test_instructions_do_not_depend_on_state(self):
+        """The static prefix is identical across decisions"""
+        player = LLMPlayer("Bot", 1000, 0, "gpt-4o", "fake-key")
+        player.hand = [Card("hearts", "A"), Card("spades", "K")]
+        first = player.generate_messages(20, self.game_state)
+        second = player.generate_messages(40, dict(self.game_state, pot=90, min_raise=40))
+
+        self.assertEqual(first[0], second[0])
+        self.assertEqual(first[0]["role"], "system")
+        self.assertIn("Amount to call: 40", second[1]["content"])
+
+    def test_cache_markers_only_for_explicit_providers(self):
+        """Anthropic models get cache_control on a cacheable prefix, others a plain system message"""
+        rules = "rule " * MIN_CACHEABLE_PREFIX_TOKENS
+        claude = build_messages("claude-3-5-sonnet", rules, "state")
+        self.assertEqual(claude[0]["content"][0]["cache_control"], {"type": "ephemeral"})
+
+        gpt = build_messages("gpt-4o", rules, "state")
+        self.assertEqual(gpt[0], {"role": "system", "content": rules})
+
+    def test_short_prefixes_are_not_marked(self):
+        """Prefixes below the providers' minimum would never hit, so they get no marker"""
+        for template in PROMPT_TEMPLATES.values():
+            messages = build_messages("claude-3-5-sonnet", template.instructions, "state")
+            self.assertEqual(messages[0], {"role": "system", "content": template.instructions})
+
+        gemma = build_messages("gemini/gemma-3-4b-it", "rules", "state")
+        self.assertEqual(len(gemma), 1)
+        self.assertTrue(gemma[0]["content"].startswith("rules"))
+
+    def test_cache_stats_per_model(self):
+        """Cached tokens are read from the different provider usage formats"""
+        stats = PromptCacheStats()
+        stats.record("gpt-4o", {"prompt_tokens": 1200, "prompt_tokens_details": {"cached_tokens": 1024}})
+        stats.record("gpt-4o", {"prompt_tokens": 1200, "prompt_tokens_details": {"cached_tokens": 0}})
+        stats.record("deepseek/deepseek-chat", {"prompt_tokens": 500, "prompt_cache_hit_tokens": 384})
+
+        results = stats.get_stats()
+        self.assertEqual(results["gpt-4o"]["cache_hits"], 1)
+        self.assertEqual(results["gpt-4o"]["hit_rate"], 50.0)
+        self.assertEqual(results["deepseek/deepseek-chat"]["cached_tokens"], 384)
+        self.assertEqual(cached_prompt_tokens({"cache_read_input_tokens": 7}), 7)
+
+    def test_cache_hits_recorded_from_decisions(self):
+        """A decision whose usage reports cached tokens counts as a cache hit"""
+        player = LLMPlayer("Bot", 1000, 0, "claude-3-5-sonnet", "fake-key")
+        player.hand = [Card("hearts", "A"), Card("spades", "K")]
+        usage = {"prompt_tokens": 1500, "completion_tokens": 10, "cache_read_input_tokens": 1100}
+        response = {"choices": [{"message": {"content": '{"action": "call", "raise_amount": null}'}}], "usage": usage}
+        stats = PromptCacheStats()
+
+        with patch("llm_player.prompt_cache_stats", stats), patch("llm_player.completion", return_value=response):
+            asyncio.run(player.choose_action(10, self.game_state))
+            asyncio.run(player.choose_action(10, self.game_state))
+
+        results = stats.get_stats()["claude-3-5-sonnet"]
+        self.assertEqual(results["requests"], 2)
+        self.assertEqual(results["cache_hits"], 2)
+        self.assertEqual(results["cached_tokens"], 2200)
+        self.assertEqual(results["cached_token_rate"], round(2200 * 100.0 / 3000, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
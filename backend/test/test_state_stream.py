@@ -0,0 +1,131 @@
+import sys
+import os
+import copy
+import asyncio
+import unittest
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_stream import EventRing, GameStateStream, diff_states
+
+
+def apply_delta(state, message):
+    """Client-side application of a delta to a keyframe state"""
+    state = copy.deepcopy(state)
+    state.update(message.get("changes", {}))
+    for player in state["players"]:
+        player.update(message.get("players", {}).get(player["name"], {}))
+    return state
+
+
+class TestStateStream(unittest.TestCase):
+    """Keyframes, deltas and resume for the versioned game state stream"""
+
+    def setUp(self):
+        self.state = {
+            "game_id": "g1",
+            "status": "running",
+            "hand_number": 1,
+            "pot": 0,
+            "community_cards": "",
+            "players": [
+                {"name": "A", "chips": 1000, "status": "active"},
+                {"name": "B", "chips": 1000, "status": "active"},
+            ],
+        }
+        self.stream = GameStateStream(lambda: copy.deepcopy(self.state), keyframe_interval=3, history_size=4)
+
+    def test_delta_only_carries_changes(self):
+        """Unchanged fields and full player lists are left out of deltas"""
+        self.state["pot"] = 10
+        self.state["players"][0]["chips"] = 990
+        event, deltas = self.stream.update("player_action", {"player": "A", "players": self.state["players"]})
+        delta = deltas[0].message
+
+        self.assertEqual(delta["seq"], 1)
+        self.assertEqual(delta["changes"], {"pot": 10})
+        self.assertEqual(delta["players"], {"A": {"chips": 990}})
+        self.assertNotIn("players", delta["data"])
+        self.assertEqual(diff_states(self.state, self.state), {})
+
+    def test_keyframe_plus_deltas_rebuilds_state(self):
+        """Applying deltas to a keyframe reproduces the live state, with periodic keyframes"""
+        client_state = self.stream.keyframe()["state"]
+        messages = []
+        for i in range(3):
+            self.state["pot"] += 10
+            self.state["players"][1]["chips"] -= 10
+            messages.extend(m.message for m in self.stream.update("player_action", {})[1])
+
+        for message in messages:
+            if message["type"] == "delta":
+                client_state = apply_delta(client_state, message)
+
+        self.assertEqual(client_state, self.state)
+        self.assertEqual(messages[-1], {"type": "keyframe", "seq": 3, "state": self.state})
+
+    def test_resume_from_sequence(self):
+        """since() returns missed deltas, or None once they have left the history"""
+        for i in range(5):
+            self.state["hand_number"] += 1
+            self.stream.update("hand_started", {})
+
+        self.assertEqual([m.message["seq"] for m in self.stream.since(3)], [4, 5])
+        self.assertEqual([m.message["seq"] for m in self.stream.events_since(2)], [3, 4, 5])
+        self.assertEqual(self.stream.since(5), [])
+        self.assertIsNone(self.stream.since(0))
+        self.assertIsNone(self.stream.since(99))
+
+    def test_event_buffer_and_wait(self):
+        """Full events are buffered by seq and waiters wake on the next event"""
+        async def scenario():
+            waiter = asyncio.create_task(self.stream.wait_for(0, timeout=5))
+            await asyncio.sleep(0)
+            self.stream.update("hand_started", {"hand_number": 1})
+            woke = await waiter
+            timed_out = await self.stream.wait_for(1, timeout=0.01)
+            return woke, timed_out
+
+        woke, timed_out = asyncio.run(scenario())
+        self.assertTrue(woke)
+        self.assertFalse(timed_out)
+        self.assertEqual([m.message for m in self.stream.events_since(0)],
+                         [{"event": "hand_started", "data": {"hand_number": 1}, "seq": 1}])
+
+        self.stream.update("game_complete", {})
+        self.assertTrue(self.stream.complete)
+        self.assertFalse(asyncio.run(self.stream.wait_for(2, timeout=5)))
+
+
+class TestEventRing(unittest.TestCase):
+    """Fixed-size, seq-addressed event buffer"""
+
+    def test_overwrites_oldest(self):
+        """Only the newest capacity messages stay addressable"""
+        ring = EventRing(3)
+        for seq in range(1, 6):
+            ring.append(seq, seq * 10)
+
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.slots, [30, 40, 50])
+        self.assertIsNone(ring.get(2))
+        self.assertEqual(ring.get(4), 40)
+        self.assertEqual(ring.since(2), [30, 40, 50])
+        self.assertIsNone(ring.since(1))
+        self.assertEqual(ring.since(5), [])
+
+    def test_gap_and_start_seq(self):
+        """A ring started mid-stream, or with a gap, only replays from where it has every message"""
+        ring = EventRing(10, start_seq=40)
+        self.assertIsNone(ring.since(0))
+        self.assertEqual(ring.since(40), [])
+
+        ring.append(41, "a")
+        ring.append(45, "b")
+        self.assertIsNone(ring.since(41))
+        self.assertEqual(ring.since(44), ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
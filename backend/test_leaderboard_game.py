@@ -23,10 +23,17 @@ async def run_test_game():
     small_blind = 5
     big_blind = 10
     
-    # Initialize players
+    # Initialize players, falling back to offline fake models without an API key
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        models = ["gpt-4", "gpt-3.5-turbo"]
+    else:
+        print("OPENAI_API_KEY not found, using fake models.")
+        models, api_key = ["fake/raiser", "fake/caller"], "fake"
+
     players = [
-        LLMPlayer("GPT-4-Player", starting_chips, 0, "gpt-4", os.getenv("OPENAI_API_KEY")),
-        LLMPlayer("GPT-3.5-Player", starting_chips, 1, "gpt-3.5-turbo", os.getenv("OPENAI_API_KEY"))
+        LLMPlayer("GPT-4-Player", starting_chips, 0, models[0], api_key),
+        LLMPlayer("GPT-3.5-Player", starting_chips, 1, models[1], api_key)
     ]
     
     # Initialize leaderboard manager
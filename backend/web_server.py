@@ -1,22 +1,48 @@
 import os
+import time
+import hashlib
 import asyncio
 import uuid
-from typing import Dict, List, Any, Optional, ClassVar
+import csv
+import io
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, ClassVar, Tuple
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Body, Query
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Body, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 
-from game import Game, GameEvent
+from game import GameEvent
 from player import Player
-from llm_player import LLMPlayer
-from deck import format_cards
 from leaderboard import LeaderboardManager
+from leaderboard_writer import LeaderboardWriter
+from broadcaster import GameBroadcaster, choose_subprotocol, encode_json, EVENTS_CHANNEL, DELTA_CHANNEL
+from fake_llm import create_fake_model, is_fake_model, is_mock_model, MOCK_MODEL_PREFIX
+from llm_metrics import llm_metrics
+from prompts import DEFAULT_PROMPT_VERSION, prompt_cache_stats
+from state_stream import GameStateStream, FINAL_EVENTS
+from game_worker import GameWorkerPool, RemoteGame, build_game, game_snapshot
+from broker import GameCluster, Subscription, create_broker
+from providers import provider_api_key, resolve_provider
+from game_scheduler import GameScheduler
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="PokerMind API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await game_manager.start_cluster()
+    yield
+    # Stop the running games, then the game worker processes and cluster subscriptions, if any
+    await game_manager.scheduler.close()
+    game_manager.close()
+    await game_manager.stop_cluster()
+    # Commit any leaderboard records still queued
+    leaderboard_writer.close()
+
+app = FastAPI(title="PokerMind API", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend to connect
 app.add_middleware(
@@ -29,10 +55,38 @@ app.add_middleware(
 
 # Store active games
 games = {}
-connected_clients = {}
+# Per-game spectator fan-out, keyed by game_id
+broadcasters: Dict[str, GameBroadcaster] = {}
 
 # Initialize leaderboard manager
 leaderboard_manager = LeaderboardManager()
+# Hand results and LLM calls are committed in batches off the event loop
+leaderboard_writer = LeaderboardWriter(leaderboard_manager)
+
+# Seconds between SSE keepalive comments while a game is quiet
+SSE_KEEPALIVE = 15.0
+
+# Seconds a finished game stays in memory before it is reduced to a stored summary
+COMPLETED_GAME_TTL = float(os.getenv("COMPLETED_GAME_TTL", "300"))
+
+# Number of worker processes to play games in; 0 plays them on the API's own event loop
+GAME_WORKERS = int(os.getenv("GAME_WORKERS", "0"))
+
+# Games allowed to play at once; further starts wait in the scheduler's queue
+MAX_CONCURRENT_GAMES = int(os.getenv("MAX_CONCURRENT_GAMES", "16"))
+
+# Leaderboard responses are reused until the next leaderboard write, or for at most this many
+# seconds (writes made by other processes sharing the database don't bump this process's version)
+LEADERBOARD_CACHE_TTL = float(os.getenv("LEADERBOARD_CACHE_TTL", "30"))
+LEADERBOARD_CACHE_SIZE = 256
+
+# Directory to append each game's LLM decision points to, as <game_id>.jsonl, for offline
+# replay with llm_batch.py; unset records none
+DECISION_LOG_DIR = os.getenv("DECISION_LOG_DIR")
+
+# Broker shared by the API nodes of a cluster: unset (single node), "memory", or a redis:// URL
+BROKER_URL = os.getenv("BROKER_URL")
+NODE_ID = os.getenv("NODE_ID")
 
 class GameConfig(BaseModel):
     small_blind: int = Field(..., gt=0, description="Small blind amount")
@@ -42,6 +96,10 @@ class GameConfig(BaseModel):
     llm_players: List[Dict[str, str]] = Field(..., description="List of LLM players to add to the game")
     game_speed: str = Field(default="medium", description="Game speed: fast, medium, slow")
     is_official: bool = Field(default=False, description="Whether this game's results should count towards the official leaderboard")
+    prompt_version: str = Field(default=DEFAULT_PROMPT_VERSION, description="Prompt template version used by the LLM players")
+    history_token_budget: Optional[int] = Field(default=None, gt=0, description="Token budget for earlier betting rounds of the hand history; unlimited if unset")
+    record_llm_metrics: bool = Field(default=False, description="Whether to persist per-call LLM latency, token and cost metrics")
+    seed: Optional[int] = Field(default=None, description="Deck shuffle seed, for reproducible games")
     
     # Game speed presets (in seconds) - using ClassVar to indicate this is not a field
     speed_presets: ClassVar[Dict[str, Dict[str, float]]] = {
@@ -50,69 +108,102 @@ class GameConfig(BaseModel):
         "slow": {"action": 3.0, "stage": 5.0, "hand": 7.0}
     }
 
+class GameMatrix(BaseModel):
+    lineups: List[List[str]] = Field(..., description="Model names seated at each game")
+    seeds: List[int] = Field(..., description="Deck seeds; every lineup plays one game per seed")
+    settings: Dict[str, Any] = Field(..., description="The other GameConfig fields, shared by every game")
+
+class BatchGameRequest(BaseModel):
+    games: List[GameConfig] = Field(default_factory=list, description="Games to create")
+    matrix: Optional[GameMatrix] = Field(default=None, description="Lineups x seeds to expand into more games")
+    priority: int = Field(default=0, description="Queue priority of the batch; higher starts first")
+    start: bool = Field(default=True, description="Whether to queue the games for starting right away")
+    
+    def expand(self) -> List[GameConfig]:
+        """Every game of the batch, with the matrix expanded into one config per lineup and seed"""
+        configs = list(self.games)
+        if self.matrix is not None:
+            for lineup in self.matrix.lineups:
+                players = [
+                    {"name": model if lineup.count(model) == 1 else f"{model} #{i + 1}", "model": model}
+                    for i, model in enumerate(lineup)
+                ]
+                for seed in self.matrix.seeds:
+                    configs.append(GameConfig(**{**self.matrix.settings, "llm_players": players, "seed": seed}))
+        return configs
+
 class GameManager:
-    def __init__(self):
+    def __init__(self, completed_game_ttl: float = COMPLETED_GAME_TTL, num_workers: int = GAME_WORKERS,
+                 cluster: Optional[GameCluster] = None, max_concurrent_games: int = MAX_CONCURRENT_GAMES,
+                 decision_log_dir: Optional[str] = DECISION_LOG_DIR):
         self.active_games = {}
         self.game_tasks = {}
         self.player_chips_history = {}  # Track chips for each player after each hand
+        self.state_streams: Dict[str, GameStateStream] = {}  # Seq-numbered delta stream per game
+        self.completed_game_ttl = completed_game_ttl
+        self.evicted_games = 0
+        self.worker_pool = GameWorkerPool(num_workers) if num_workers > 0 else None
+        self.cluster = cluster
+        self.mirrors: Dict[str, Subscription] = {}  # Games owned by other nodes that this node follows
+        self.scheduler = GameScheduler(self.start_game, max_concurrent_games)
+        self.state_cache: Dict[str, Dict[str, Any]] = {}  # Serialized get_game_state per game, see get_cached_state
+        self.decision_log_dir = decision_log_dir
+        if decision_log_dir:
+            os.makedirs(decision_log_dir, exist_ok=True)
+    
+    def resolve_model(self, model_name: str):
+        """Provider model name, API key and API base for a configured model; ValueError if unusable"""
+        api_base = None
+        
+        # Offline fake models, answered in-process
+        if is_fake_model(model_name):
+            create_fake_model(model_name)  # Validate the spec before the game starts
+            api_key = "fake"
+        # Fake models served by the local OpenAI-compatible mock server
+        elif is_mock_model(model_name):
+            api_key = "mock"
+            api_base = os.getenv("MOCK_LLM_API_BASE", "http://127.0.0.1:8001/v1")
+            model_name = "openai/" + model_name[len(MOCK_MODEL_PREFIX):]
+        # Provider models (unknown names default to OpenAI)
+        else:
+            model_name = resolve_provider(model_name)[1]
+            api_key = provider_api_key(model_name)
+            
+        if not api_key:
+            raise ValueError(f"No API key found for model {model_name}")
+        
+        return model_name, api_key, api_base
     
     def create_game(self, config: GameConfig) -> str:
         """Create a new game with the provided configuration"""
         game_id = str(uuid.uuid4())
         
-        # Create players list with LLM players
-        players = []
+        # Create player specs (LLMPlayer arguments) so the game can also be built in a worker process
+        decision_log = os.path.join(self.decision_log_dir, f"{game_id}.jsonl") if self.decision_log_dir else None
+        player_specs = []
         model_names = []
         for i, llm_config in enumerate(config.llm_players):
-            # Determine the correct API key based on model
-            model_name = llm_config["model"]
-            api_key = None
+            model_name, api_key, api_base = self.resolve_model(llm_config["model"])
             
-            # Anthropic models
-            if model_name.startswith("claude"):
-                api_key = os.getenv("ANTHROPIC_API_KEY")
-            # OpenAI models
-            elif model_name.startswith("gpt"):
-                api_key = os.getenv("OPENAI_API_KEY")
-            # Gemini models
-            elif model_name == "gemini-2.0-flash":
-                api_key = os.getenv("GEMINI_API_KEY")
-                model_name = "gemini/gemini-2.0-flash"
-            # Gemma models
-            elif model_name == "gemma-3-4b-it":
-                api_key = os.getenv("GEMINI_API_KEY")
-                model_name = "gemini/gemma-3-4b-it"
-            # O1 models
-            elif model_name == "o1-mini":
-                api_key = os.getenv("OPENAI_API_KEY")
-            # DeepSeek models
-            elif model_name == "deepseek-chat":
-                api_key = os.getenv("DEEPSEEK_API_KEY")
-                model_name = "deepseek/deepseek-chat"
-            elif model_name == "deepseek-reasoner":
-                api_key = os.getenv("DEEPSEEK_API_KEY")
-                model_name = "deepseek/deepseek-reasoner"
-            # Add other providers as needed
-            else:
-                # Default to OpenAI for unknown models
-                api_key = os.getenv("OPENAI_API_KEY")
-                
-            if not api_key:
-                raise ValueError(f"No API key found for model {model_name}")
-                
-            player = LLMPlayer(
-                name=llm_config["name"],
-                chips=config.player_stack,
-                position=i,
-                model_name=model_name,
-                api_key=api_key
-            )
-            players.append(player)
+            player_specs.append({
+                "name": llm_config["name"],
+                "chips": config.player_stack,
+                "position": i,
+                "model_name": model_name,
+                "api_key": api_key,
+                "api_base": api_base,
+                "prompt_version": config.prompt_version,
+                "history_token_budget": config.history_token_budget,
+                "decision_log": decision_log
+            })
             model_names.append(llm_config["model"])
         
+        # Model of each player, as recorded with its hand results
+        player_models = {spec["name"]: spec["model_name"] for spec in player_specs}
+        
         # Initialize chips history
         self.player_chips_history[game_id] = {
-            player.name: [config.player_stack] for player in players
+            spec["name"]: [config.player_stack] for spec in player_specs
         }
         
         # Register game in leaderboard
@@ -129,14 +220,15 @@ class GameManager:
         # Create the game instance with extended callback for leaderboard tracking
         async def game_callback(event_type: str, data: Dict[str, Any]):
             """Callback function to broadcast game events and track leaderboard data"""
-            # Broadcast to clients
-            if game_id in connected_clients:
-                event_data = {
-                    "event": event_type,
-                    "data": data
-                }
-                for client in connected_clients[game_id]:
-                    await client.send_json(event_data)
+            # Buffer the event even with no subscribers so clients can join or resume later
+            state_stream = self.state_streams[game_id]
+            event, deltas = state_stream.update(event_type, data)
+            self.state_cache.pop(game_id, None)
+            self.broadcast(game_id, event, deltas)
+            
+            # Relay to the other nodes of the cluster; queued, so the game never waits on the broker
+            if self.cluster is not None:
+                self.cluster.publish_event(game_id, event.message, state_stream.state)
             
             # Track game data for leaderboard
             game = self.active_games[game_id]["game"]
@@ -144,6 +236,7 @@ class GameManager:
             # Track hand completions for leaderboard
             if event_type == GameEvent.HAND_COMPLETE.value:
                 hand_number = game.hand_number
+                players = self.game_snapshot(game)["players"]
                 
                 # Get winners from the hand result
                 winners = data.get("winners", [])
@@ -151,25 +244,25 @@ class GameManager:
                 is_split_pot = data.get("is_split_pot", False)
                 
                 # Process each player's results
-                for player in game.players:
+                for player in players:
                     # Store current chips in history
-                    self.player_chips_history[game_id][player.name].append(player.chips)
+                    self.player_chips_history[game_id][player["name"]].append(player["chips"])
                     
                     # Calculate profit/loss from this hand
-                    if len(self.player_chips_history[game_id][player.name]) >= 2:
-                        prev_chips = self.player_chips_history[game_id][player.name][-2]
-                        current_chips = player.chips
+                    if len(self.player_chips_history[game_id][player["name"]]) >= 2:
+                        prev_chips = self.player_chips_history[game_id][player["name"]][-2]
+                        current_chips = player["chips"]
                         profit_loss = current_chips - prev_chips
                         
                         # Check if player won this hand (including split pot)
-                        won_hand = player.name in winner_names
+                        won_hand = player["name"] in winner_names
                         
                         # Only record for LLM players
-                        if isinstance(player, LLMPlayer):
-                            leaderboard_manager.record_hand_result(
+                        if player["name"] in player_models:
+                            leaderboard_writer.record_hand_result(
                                 game_id=game_id,
                                 hand_number=hand_number,
-                                model_name=player.model_name,
+                                model_name=player_models[player["name"]],
                                 profit_loss=profit_loss,
                                 won_hand=won_hand,
                                 starting_chips=prev_chips,
@@ -180,11 +273,13 @@ class GameManager:
             # When game is complete, update final stats
             elif event_type == GameEvent.GAME_COMPLETE.value:
                 final_chips = {}
-                for player in game.players:
-                    if isinstance(player, LLMPlayer):
-                        final_chips[player.model_name] = player.chips
+                for player in self.game_snapshot(game)["players"]:
+                    if player["name"] in player_models:
+                        final_chips[player_models[player["name"]]] = player["chips"]
                 
-                leaderboard_manager.complete_game(game_id, final_chips)
+                # Everything recorded for this game is committed before it is reported as finished
+                if not await leaderboard_writer.wait(leaderboard_writer.complete_game(game_id, final_chips)):
+                    print(f"Leaderboard records for game {game_id} were not all committed")
         
         # Get game speed parameters
         speed = config.game_speed.lower()
@@ -193,25 +288,63 @@ class GameManager:
         
         speed_params = config.speed_presets[speed]
         
-        game = Game(
-            players=players,
-            sb=config.small_blind,
-            bb=config.big_blind,
-            callback=game_callback,
-            delay_between_actions=speed_params["action"],
-            delay_between_stages=speed_params["stage"],
-            delay_after_hand=speed_params["hand"]
-        )
+        game_spec = {
+            "players": player_specs,
+            "small_blind": config.small_blind,
+            "big_blind": config.big_blind,
+            "num_hands": config.num_hands,
+            "delay_between_actions": speed_params["action"],
+            "delay_between_stages": speed_params["stage"],
+            "delay_after_hand": speed_params["hand"],
+            "seed": config.seed
+        }
+        
+        # Persist per-call LLM metrics next to the hand results if requested
+        def record_call(hand_number: int, call: Dict[str, Any]):
+            if config.record_llm_metrics:
+                leaderboard_writer.record_llm_call(game_id, hand_number, call)
+        
+        if self.worker_pool is not None:
+            # Played in a worker process; calls measured there are folded into this process's stats
+            def relay_call(hand_number: int, call: Dict[str, Any]):
+                llm_metrics.record(call)
+                record_call(hand_number, call)
+            
+            game = RemoteGame(game_spec, game_callback, on_llm_call=relay_call)
+        else:
+            game = build_game(game_spec, game_callback)
+            for player in game.players:
+                player.on_call_metrics = lambda call: record_call(game.hand_number, call)
         
         # Store game and configuration
         self.active_games[game_id] = {
             "game": game,
             "config": config,
-            "status": "created"
+            "status": "created",
+            "player_models": player_models
         }
+        self.state_streams[game_id] = GameStateStream(lambda: self.get_game_state(game_id))
         
         return game_id
     
+    def schedule_game(self, game_id: str, priority: int = 0) -> int:
+        """Queue a created game for starting; returns its queue position (0 if it started right away)"""
+        if game_id not in self.active_games:
+            raise ValueError(f"Game {game_id} not found")
+        game_info = self.active_games[game_id]
+        if game_info["status"] != "created":
+            raise ValueError(f"Game {game_id} has already been started")
+        
+        game_info["status"] = "queued"
+        return self.scheduler.enqueue(game_id, priority)
+    
+    def unschedule_game(self, game_id: str) -> bool:
+        """Take a game that has not started yet out of the queue"""
+        if not self.scheduler.cancel(game_id):
+            return False
+        self.active_games[game_id]["status"] = "created"
+        return True
+    
     async def start_game(self, game_id: str):
         """Start a game that has been created"""
         if game_id not in self.active_games:
@@ -224,8 +357,11 @@ class GameManager:
         # Update game status
         game_info["status"] = "running"
         
-        # Start the game in a separate task
-        task = asyncio.create_task(game.play_game(config.num_hands))
+        # Start the game in a separate task (or in a worker process)
+        if isinstance(game, RemoteGame):
+            task = asyncio.create_task(self.worker_pool.run_game(game_id, game))
+        else:
+            task = asyncio.create_task(game.play_game(config.num_hands))
         self.game_tasks[game_id] = task
         
         # Wait for game to complete
@@ -236,6 +372,193 @@ class GameManager:
             game_info["status"] = "error"
             game_info["error"] = str(e)
             raise e
+        finally:
+            game_info["finished_at"] = time.time()
+            state_stream = self.state_streams[game_id]
+            if not state_stream.complete:
+                # A game that failed never sent game_complete; end its streams, long polls and mirrors
+                event, deltas = state_stream.update(
+                    GameEvent.GAME_ERROR.value, {"error": game_info.get("error", "Game stopped")}
+                )
+                self.state_cache.pop(game_id, None)
+                self.broadcast(game_id, event, deltas)
+                if self.cluster is not None:
+                    self.cluster.publish_event(game_id, event.message, state_stream.state)
+            if self.cluster is not None:
+                self.cluster.finish_game(game_id, self.state_streams[game_id].seq, self.get_game_state(game_id))
+            # Keep the finished game around for late spectators, then free it
+            asyncio.get_running_loop().call_later(self.completed_game_ttl, self.evict_game, game_id)
+    
+    def broadcast(self, game_id: str, event, deltas):
+        """Queue an event for the game's spectators without waiting on any socket"""
+        broadcaster = broadcasters.get(game_id)
+        if broadcaster is not None:
+            broadcaster.publish(event)
+            for message in deltas:
+                broadcaster.publish(message, channel=DELTA_CHANNEL)
+    
+    async def start_cluster(self):
+        """Listen for commands from the other nodes of the cluster"""
+        if self.cluster is not None:
+            await self.cluster.start(self.handle_command)
+    
+    async def stop_cluster(self):
+        if self.cluster is None:
+            return
+        for game_id in list(self.mirrors):
+            await self.unfollow_game(game_id)
+        await self.cluster.close()
+    
+    async def handle_command(self, command: Dict[str, Any]):
+        """Run a command another node forwarded to this game's owner"""
+        game_id = command.get("game_id")
+        if command.get("command") == "start" and game_id in self.active_games:
+            if self.active_games[game_id]["status"] == "created":
+                self.schedule_game(game_id, command.get("priority", 0))
+    
+    async def announce_game(self, game_id: str):
+        """Publish this node's ownership and the latest state of a game to the cluster"""
+        if self.cluster is not None:
+            await self.cluster.register_game(game_id, self.state_streams[game_id].seq, self.get_game_state(game_id))
+    
+    async def get_stream(self, game_id: str) -> Optional[GameStateStream]:
+        """The game's event stream, following it through the cluster if another node owns it"""
+        state_stream = self.state_streams.get(game_id)
+        if state_stream is not None or self.cluster is None:
+            return state_stream
+        return await self.follow_game(game_id)
+    
+    async def follow_game(self, game_id: str) -> Optional[GameStateStream]:
+        """Mirror the event stream of a game owned by another node"""
+        mirror = {}
+        
+        async def on_event(payload: Dict[str, Any]):
+            state_stream = self.state_streams.get(game_id)
+            message = payload["message"]
+            if state_stream is None or message["seq"] <= state_stream.seq:
+                return
+            mirror["state"] = payload["state"]
+            event, deltas = state_stream.update(message["event"], message["data"], seq=message["seq"])
+            self.broadcast(game_id, event, deltas)
+            if message["event"] in FINAL_EVENTS:
+                self.schedule_unfollow(game_id)
+        
+        # Subscribe before reading the stored state so no later event is missed;
+        # the owner stores each event's state before publishing it
+        subscription = await self.cluster.follow(game_id, on_event)
+        record = await self.cluster.get_game(game_id)
+        if game_id in self.state_streams or record is None or record["owner"] == self.cluster.node_id:
+            await subscription.close()
+            return self.state_streams.get(game_id)
+        
+        mirror["state"] = record["state"]
+        state_stream = GameStateStream(lambda: mirror["state"], start_seq=record["seq"])
+        self.state_streams[game_id] = state_stream
+        self.mirrors[game_id] = subscription
+        if record["state"]["status"] in ("completed", "error"):
+            self.schedule_unfollow(game_id)
+        return state_stream
+    
+    def schedule_unfollow(self, game_id: str):
+        loop = asyncio.get_running_loop()
+        loop.call_later(self.completed_game_ttl, lambda: asyncio.ensure_future(self.unfollow_game(game_id)))
+    
+    async def unfollow_game(self, game_id: str):
+        """Stop mirroring a game owned by another node"""
+        subscription = self.mirrors.pop(game_id, None)
+        if subscription is None:
+            return
+        await subscription.close()
+        self.state_streams.pop(game_id, None)
+        broadcaster = broadcasters.pop(game_id, None)
+        if broadcaster is not None:
+            broadcaster.close(close_sockets=True)
+    
+    def current_state(self, game_id: str) -> Dict[str, Any]:
+        """Live state of a local game, or the latest relayed state of a mirrored one"""
+        if game_id in self.active_games:
+            return self.get_game_state(game_id)
+        return self.state_streams[game_id].state
+    
+    def summarize_game(self, game_id: str) -> Dict[str, Any]:
+        """Compact record of a finished game, kept after its in-memory state is freed"""
+        game_info = self.active_games[game_id]
+        game = game_info["game"]
+        config = game_info["config"]
+        
+        summary = {
+            "game_id": game_id,
+            "status": game_info["status"],
+            "hand_number": game.hand_number,
+            "num_hands": config.num_hands,
+            "small_blind": config.small_blind,
+            "big_blind": config.big_blind,
+            "is_official": config.is_official,
+            "finished_at": game_info.get("finished_at"),
+            "players": [
+                {
+                    "name": player["name"],
+                    "model": game_info["player_models"].get(player["name"]),
+                    "chips": player["chips"]
+                }
+                for player in self.game_snapshot(game)["players"]
+            ],
+            "evicted": True
+        }
+        if "error" in game_info:
+            summary["error"] = game_info["error"]
+        return summary
+    
+    def evict_game(self, game_id: str):
+        """Persist a finished game's summary and drop every in-memory structure for it"""
+        if game_id not in self.active_games:
+            return
+        
+        try:
+            leaderboard_manager.save_game_summary(game_id, self.summarize_game(game_id))
+        except Exception as e:
+            # Keep the game in memory rather than lose it; try again after another TTL
+            print(f"Could not persist summary for game {game_id}: {e}")
+            asyncio.get_running_loop().call_later(self.completed_game_ttl, self.evict_game, game_id)
+            return
+        
+        self.active_games.pop(game_id, None)
+        self.game_tasks.pop(game_id, None)
+        self.player_chips_history.pop(game_id, None)
+        self.state_streams.pop(game_id, None)
+        self.state_cache.pop(game_id, None)
+        broadcaster = broadcasters.pop(game_id, None)
+        if broadcaster is not None:
+            broadcaster.close(close_sockets=True)
+        self.evicted_games += 1
+    
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Counts of the live per-game objects held by the server"""
+        statuses: Dict[str, int] = {}
+        for game_info in self.active_games.values():
+            statuses[game_info["status"]] = statuses.get(game_info["status"], 0) + 1
+        
+        return {
+            "active_games": len(self.active_games),
+            "games_by_status": statuses,
+            "game_tasks": len(self.game_tasks),
+            "player_chips_history": len(self.player_chips_history),
+            "chips_history_entries": sum(
+                len(history) for chips in self.player_chips_history.values() for history in chips.values()
+            ),
+            "state_streams": len(self.state_streams),
+            "buffered_events": sum(
+                len(stream.events) + len(stream.deltas) for stream in self.state_streams.values()
+            ),
+            "broadcasters": len(broadcasters),
+            "spectators": sum(len(b.clients) for b in broadcasters.values()),
+            "evicted_games": self.evicted_games,
+            "mirrored_games": len(self.mirrors),
+            "node_id": self.cluster.node_id if self.cluster is not None else None,
+            "cluster": self.cluster.get_stats() if self.cluster is not None else None,
+            "workers": self.worker_pool.get_stats() if self.worker_pool is not None else None,
+            "completed_game_ttl": self.completed_game_ttl
+        }
     
     def get_game_state(self, game_id: str) -> Dict[str, Any]:
         """Get the current state of a game"""
@@ -248,26 +571,45 @@ class GameManager:
         return {
             "game_id": game_id,
             "status": game_info["status"],
-            "current_stage": game.current_stage.value if hasattr(game, "current_stage") else None,
-            "hand_number": game.hand_number,
-            "pot": game.pot,
-            "community_cards": format_cards(game.community_cards) if game.community_cards else "",
-            "players": [
-                {
-                    "name": player.name,
-                    "chips": player.chips,
-                    "status": player.status.value,
-                    "position": player.position,
-                    "is_dealer": player.is_dealer,
-                    "is_sb": player.is_sb,
-                    "is_bb": player.is_bb
-                }
-                for player in game.players
-            ]
+            **self.game_snapshot(game)
         }
+    
+    def get_cached_state(self, game_id: str) -> Tuple[str, bytes]:
+        """
+        ETag and JSON body of get_game_state, rebuilt only after a game event
+        or a status change so frequent polling reuses the same bytes
+        """
+        if game_id not in self.active_games:
+            raise ValueError(f"Game {game_id} not found")
+        
+        status = self.active_games[game_id]["status"]
+        cached = self.state_cache.get(game_id)
+        if cached is None or cached["status"] != status:
+            body = encode_json(self.get_game_state(game_id)).encode("utf-8")
+            cached = {
+                "status": status,
+                "body": body,
+                "etag": '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+            }
+            self.state_cache[game_id] = cached
+        return cached["etag"], cached["body"]
+    
+    def game_snapshot(self, game) -> Dict[str, Any]:
+        """Public state of a local game, or the mirrored state of one played in a worker"""
+        if isinstance(game, RemoteGame):
+            return game.snapshot
+        return game_snapshot(game)
+    
+    def close(self):
+        """Stop the game worker processes, if any"""
+        if self.worker_pool is not None:
+            self.worker_pool.close()
 
-# Create game manager
-game_manager = GameManager()
+# Create game manager, clustered with other API nodes when a broker is configured
+broker = create_broker(BROKER_URL)
+game_manager = GameManager(
+    cluster=GameCluster(broker, NODE_ID, finished_ttl=COMPLETED_GAME_TTL) if broker is not None else None
+)
 
 @app.post("/games")
 async def create_game(config: GameConfig):
@@ -282,6 +624,7 @@ async def create_game(config: GameConfig):
 
     try:
         game_id = game_manager.create_game(config)
+        await game_manager.announce_game(game_id)
         return {
             "game_id": game_id, 
             "message": "Game created successfully",
@@ -308,6 +651,7 @@ async def create_official_game(config: GameConfig):
     
     try:
         game_id = game_manager.create_game(config)
+        await game_manager.announce_game(game_id)
         return {
             "game_id": game_id, 
             "message": "Official game created successfully",
@@ -316,99 +660,336 @@ async def create_official_game(config: GameConfig):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/games/batch")
+async def create_game_batch(request: BatchGameRequest):
+    """
+    Create many games at once, from explicit configs and/or a lineups x seeds matrix
+    
+    Every model is checked before any game is created. Unless start is false, the games are
+    queued for the scheduler, which runs at most MAX_CONCURRENT_GAMES at a time.
+    """
+    try:
+        configs = request.expand()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid matrix settings: {e}")
+    if not configs:
+        raise HTTPException(status_code=400, detail="The batch contains no games")
+    
+    for i, config in enumerate(configs):
+        if config.is_official and config.num_hands < 100:
+            raise HTTPException(status_code=400, detail=f"Game {i}: official games must have at least 100 hands")
+        for llm_config in config.llm_players:
+            try:
+                game_manager.resolve_model(llm_config["model"])
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Game {i}: {e}")
+    
+    try:
+        game_ids = []
+        for config in configs:
+            game_id = game_manager.create_game(config)
+            await game_manager.announce_game(game_id)
+            game_ids.append(game_id)
+        
+        batch_id = game_manager.scheduler.create_batch(game_ids)
+        if request.start:
+            for game_id in game_ids:
+                game_manager.schedule_game(game_id, request.priority)
+        
+        return {
+            "batch_id": batch_id,
+            "game_ids": game_ids,
+            "queued": request.start,
+            "queue": game_manager.scheduler.get_status()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/games/queue")
+async def get_game_queue():
+    """Get the scheduler's concurrency cap, running games and queued games by priority"""
+    return game_manager.scheduler.get_status()
+
+@app.delete("/games/queue/{game_id}")
+async def cancel_queued_game(game_id: str):
+    """Take a game that has not started yet out of the queue"""
+    if not game_manager.unschedule_game(game_id):
+        raise HTTPException(status_code=404, detail=f"Game {game_id} is not queued")
+    return {"message": f"Game {game_id} removed from the queue"}
+
+@app.get("/games/batches/{batch_id}")
+async def get_game_batch(batch_id: str):
+    """Get the progress of a batch of games"""
+    batch = game_manager.scheduler.get_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return batch
+
 @app.post("/games/{game_id}/start")
-async def start_game(game_id: str):
-    """Start a created game"""
+async def start_game(
+    game_id: str,
+    priority: int = Query(0, description="Queue priority; higher starts first when the server is at capacity")
+):
+    """Start a created game, or queue it if MAX_CONCURRENT_GAMES games are already running"""
     try:
-        # Start the game asynchronously (don't wait for it to complete)
-        asyncio.create_task(game_manager.start_game(game_id))
-        return {"message": f"Game {game_id} started"}
+        # Games owned by another node of the cluster are started there; the owner's record
+        # expires when its node stops, so a gone owner's games are not found
+        if game_id not in game_manager.active_games and game_manager.cluster is not None:
+            record = await game_manager.cluster.get_game(game_id)
+            if record is not None:
+                if record["state"]["status"] != "created":
+                    raise HTTPException(status_code=409, detail=f"Game {game_id} has already been started")
+                await game_manager.cluster.send_command(
+                    record["owner"], {"command": "start", "game_id": game_id, "priority": priority}
+                )
+                return {"message": f"Game {game_id} started", "node_id": record["owner"]}
+        if game_id not in game_manager.active_games:
+            raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
+        
+        position = game_manager.schedule_game(game_id, priority)
+        if position:
+            return {"message": f"Game {game_id} queued", "queue_position": position}
+        return {"message": f"Game {game_id} started", "queue_position": 0}
+    except HTTPException:
+        raise
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the current ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
 @app.get("/games/{game_id}")
-async def get_game(game_id: str):
-    """Get the current state of a game"""
+async def get_game(game_id: str, request: Request):
+    """Get the current state of a game (supports If-None-Match for cheap polling)"""
     try:
-        game_state = game_manager.get_game_state(game_id)
-        return game_state
+        etag, body = game_manager.get_cached_state(game_id)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        # Games owned by another node of the cluster
+        if game_manager.cluster is not None:
+            record = await game_manager.cluster.get_game(game_id)
+            if record is not None:
+                return record["state"]
+        
+        # Finished games are evicted from memory after a while; serve their stored summary
+        summary = leaderboard_manager.get_game_summary(game_id)
+        if summary is None:
+            raise HTTPException(status_code=404, detail=str(e))
+        return summary
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.websocket("/ws/games/{game_id}")
-async def websocket_endpoint(websocket: WebSocket, game_id: str):
-    """WebSocket endpoint for real-time game updates"""
-    await websocket.accept()
+async def websocket_endpoint(
+    websocket: WebSocket,
+    game_id: str,
+    stream: str = Query(EVENTS_CHANNEL, description="'events' for full game events, 'delta' for the delta stream"),
+    since: Optional[int] = Query(None, description="Replay buffered messages after this sequence number")
+):
+    """
+    WebSocket endpoint for real-time game updates (JSON, or MessagePack via the 'msgpack' subprotocol)
+    
+    The default stream sends every game event with its full payload. With ?stream=delta the client
+    gets a keyframe followed by compact deltas. Messages carry a sequence number; connecting with
+    ?since=<seq> replays the buffered messages after it instead of starting from a snapshot.
+    """
+    subprotocol = choose_subprotocol(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    channel = DELTA_CHANNEL if stream == DELTA_CHANNEL else EVENTS_CHANNEL
+    
+    state_stream = await game_manager.get_stream(game_id)
+    if state_stream is None:
+        await websocket.send_json({
+            "event": "error",
+            "data": {"message": f"Game {game_id} not found"}
+        })
+        await websocket.close()
+        return
     
-    # Register client
-    if game_id not in connected_clients:
-        connected_clients[game_id] = []
-    connected_clients[game_id].append(websocket)
+    # Register client with the game's broadcaster
+    if game_id not in broadcasters:
+        broadcasters[game_id] = GameBroadcaster(
+            snapshot_fn=lambda: game_manager.current_state(game_id),
+            keyframe_fn=lambda: game_manager.state_streams[game_id].keyframe()
+        )
+    broadcaster = broadcasters[game_id]
+    client = broadcaster.subscribe(websocket, subprotocol, channel)
     
     try:
-        # Send current game state immediately after connection
-        try:
-            game_state = game_manager.get_game_state(game_id)
-            await websocket.send_json({
+        # Queue the initial state first so it arrives before any later event
+        backlog = None
+        if since is not None:
+            backlog = state_stream.since(since) if channel == DELTA_CHANNEL else state_stream.events_since(since)
+        
+        if backlog is not None and len(backlog) < broadcaster.max_queue:
+            for message in backlog:
+                broadcaster.send(client, message)
+        # Too far behind (or a fresh subscriber): a snapshot is cheaper than the backlog
+        elif channel == DELTA_CHANNEL:
+            broadcaster.send(client, state_stream.keyframe())
+        else:
+            broadcaster.send(client, {
                 "event": "game_state", 
-                "data": game_state
-            })
-        except ValueError:
-            await websocket.send_json({
-                "event": "error",
-                "data": {"message": f"Game {game_id} not found"}
+                "data": game_manager.current_state(game_id)
             })
         
-        # Keep connection open to receive updates
+        # Updates are pushed by the writer task; just wait for the client to disconnect
         while True:
-            # Just wait for client message or disconnection
-            data = await websocket.receive_text()
-            # Echo back any messages (not really needed for this application)
-            await websocket.send_json({"event": "echo", "data": data})
+            await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
         # Remove client on disconnect
-        if game_id in connected_clients and websocket in connected_clients[game_id]:
-            connected_clients[game_id].remove(websocket)
+        broadcaster.unsubscribe(websocket)
+
+def format_sse(seq: int, event: str, data: str) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n"
+
+@app.get("/games/{game_id}/stream")
+async def stream_game_events(
+    game_id: str,
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Resume after this sequence number (or send Last-Event-ID)")
+):
+    """
+    Server-Sent Events feed of a game's events
+    
+    Each event's id is its sequence number. New subscribers, and reconnects whose position has
+    already left the buffer, get a game_state snapshot first.
+    """
+    state_stream = await game_manager.get_stream(game_id)
+    if state_stream is None:
+        raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
+    
+    last_event_id = request.headers.get("last-event-id", "")
+    if since is None and last_event_id.isdigit():
+        since = int(last_event_id)
+    
+    async def event_source():
+        cursor = since
+        while True:
+            events = state_stream.events_since(cursor) if cursor is not None else None
+            if events is None:
+                cursor = state_stream.seq
+                snapshot = {"event": "game_state", "data": state_stream.state, "seq": cursor}
+                yield format_sse(cursor, "game_state", encode_json(snapshot))
+                events = []
+            for event in events:
+                cursor = event.message["seq"]
+                yield format_sse(cursor, event.message["event"], event.text)
+            
+            if state_stream.complete and cursor >= state_stream.seq:
+                return
+            if await request.is_disconnected():
+                return
+            if not await state_stream.wait_for(cursor, SSE_KEEPALIVE):
+                yield ": keepalive\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/games/{game_id}/events")
+async def poll_game_events(
+    game_id: str,
+    cursor: int = Query(0, ge=0, description="Sequence number of the last event already seen"),
+    timeout: float = Query(25.0, ge=0, le=60, description="Seconds to wait for a new event")
+):
+    """
+    Long-poll a game's events after a cursor
+    
+    Returns as soon as there are new events, or empty after the timeout. If the cursor is
+    older than the event buffer, reset is true and game_state carries a snapshot to resync from.
+    """
+    state_stream = await game_manager.get_stream(game_id)
+    if state_stream is None:
+        raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
+    
+    await state_stream.wait_for(cursor, timeout)
+    events = state_stream.events_since(cursor)
+    body = {"game_id": game_id, "reset": events is None}
+    if events is None:
+        events = []
+        body["cursor"] = state_stream.seq
+        body["game_state"] = state_stream.state
+    else:
+        body["cursor"] = events[-1].message["seq"] if events else cursor
+    body["complete"] = state_stream.complete and body["cursor"] >= state_stream.seq
+    
+    # Splice in the already-encoded event frames instead of encoding them again
+    content = encode_json(body)[:-1] + ',"events":[' + ",".join(event.text for event in events) + "]}"
+    
+    # Once a game is over the answer for a cursor never changes
+    cache_control = "public, max-age=3600" if state_stream.complete else "no-cache"
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"Cache-Control": cache_control}
+    )
+
+# Encoded leaderboard responses keyed by endpoint and query parameters, least recently used first
+leaderboard_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+def cached_leaderboard_response(request: Request, key: tuple, build) -> Response:
+    """
+    JSON response for a leaderboard query, rebuilt only after a leaderboard
+    write (or the TTL), with an ETag so unchanged results cost a 304
+    """
+    version = leaderboard_manager.write_version
+    cached = leaderboard_cache.get(key)
+    if (cached is None or cached["version"] != version
+            or time.monotonic() - cached["built_at"] > LEADERBOARD_CACHE_TTL):
+        body = encode_json(build()).encode("utf-8")
+        cached = {
+            "version": version,
+            "built_at": time.monotonic(),
+            "body": body,
+            "etag": '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        }
+        leaderboard_cache[key] = cached
+        while len(leaderboard_cache) > LEADERBOARD_CACHE_SIZE:
+            leaderboard_cache.popitem(last=False)
+    leaderboard_cache.move_to_end(key)
+    
+    headers = {"ETag": cached["etag"], "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached["body"], media_type="application/json", headers=headers)
 
 # Leaderboard API endpoints
 @app.get("/leaderboard")
 async def get_leaderboard(
+    request: Request,
     limit: int = Query(10, ge=1, le=100, description="Number of entries to return"),
     official_only: bool = Query(True, description="Whether to only include official games")
 ):
-    """Get the current leaderboard rankings"""
-    try:
-        leaderboard = leaderboard_manager.get_leaderboard(limit=limit, official_only=official_only)
+    """Get the current leaderboard rankings (supports If-None-Match for cheap polling)"""
+    def build():
         return {
-            "leaderboard": leaderboard,
+            "leaderboard": leaderboard_manager.get_leaderboard(limit=limit, official_only=official_only),
             "is_official": official_only
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/leaderboard/{model_name}")
-async def get_model_stats(
-    model_name: str,
-    official_only: bool = Query(True, description="Whether to only include official games")
-):
-    """Get detailed statistics for a specific model"""
+    
     try:
-        stats = leaderboard_manager.get_model_stats(model_name, official_only=official_only)
-        if "error" in stats:
-            raise HTTPException(status_code=404, detail=stats["error"])
-        stats["is_official"] = official_only
-        return stats
-    except HTTPException:
-        raise
+        return cached_leaderboard_response(request, ("leaderboard", limit, official_only), build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Declared before /leaderboard/{model_name}, which would otherwise match "compare"
 @app.get("/leaderboard/compare")
 async def compare_models(
+    request: Request,
     model_names: List[str] = Query(None, description="List of model names to compare"),
     official_only: bool = Query(True, description="Whether to only include official games")
 ):
@@ -416,12 +997,8 @@ async def compare_models(
     if not model_names or len(model_names) < 2:
         raise HTTPException(status_code=400, detail="At least two model names must be provided")
     
-    try:
-        results = []
-        for model_name in model_names:
-            stats = leaderboard_manager.get_model_stats(model_name, official_only=official_only)
-            if "error" not in stats:
-                results.append(stats)
+    def build():
+        results = list(leaderboard_manager.get_models_stats(model_names, official_only=official_only).values())
         
         if not results:
             raise HTTPException(status_code=404, detail="No valid models found for comparison")
@@ -430,6 +1007,30 @@ async def compare_models(
             "comparison": results,
             "is_official": official_only
         }
+    
+    try:
+        return cached_leaderboard_response(request, ("compare", tuple(model_names), official_only), build)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/leaderboard/{model_name}")
+async def get_model_stats(
+    model_name: str,
+    request: Request,
+    official_only: bool = Query(True, description="Whether to only include official games")
+):
+    """Get detailed statistics for a specific model"""
+    def build():
+        stats = leaderboard_manager.get_model_stats(model_name, official_only=official_only)
+        if "error" in stats:
+            raise HTTPException(status_code=404, detail=stats["error"])
+        stats["is_official"] = official_only
+        return stats
+    
+    try:
+        return cached_leaderboard_response(request, ("model", model_name, official_only), build)
     except HTTPException:
         raise
     except Exception as e:
@@ -437,19 +1038,137 @@ async def compare_models(
 
 @app.get("/admin/games")
 async def get_all_games(
+    request: Request,
     limit: int = Query(50, ge=1, le=200, description="Number of games to return"),
-    include_in_progress: bool = Query(False, description="Whether to include in-progress games")
+    include_in_progress: bool = Query(False, description="Whether to include in-progress games"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_archives: bool = Query(False, description="Whether to include games moved to archive databases")
 ):
-    """Get a list of all games (admin endpoint)"""
-    try:
-        games = leaderboard_manager.get_all_games(
+    """Get a page of games, newest first (admin endpoint)"""
+    def build():
+        games, next_cursor = leaderboard_manager.get_games_page(
             limit=limit, 
-            include_in_progress=include_in_progress
+            include_in_progress=include_in_progress,
+            after=cursor,
+            include_archives=include_archives
+        )
+        return {"games": games, "next_cursor": next_cursor}
+    
+    try:
+        return cached_leaderboard_response(
+            request, ("games", limit, include_in_progress, cursor, include_archives), build
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/hands")
+async def get_hand_results(
+    limit: int = Query(100, ge=1, le=1000, description="Number of hand results to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    game_id: Optional[str] = Query(None, description="Only return hands of this game"),
+    model_name: Optional[str] = Query(None, description="Only return hands of this model"),
+    include_archives: bool = Query(False, description="Whether to include hands moved to archive databases")
+):
+    """Get a page of recorded hand results, oldest first (admin endpoint)"""
+    try:
+        hands, next_cursor = leaderboard_manager.get_hand_results_page(
+            limit=limit, after=cursor, game_id=game_id, model_name=model_name,
+            include_archives=include_archives
+        )
+        return {"hands": hands, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Bytes of encoded rows collected before a chunk of an export is sent
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def export_chunks(rows, export_format: str):
+    """Encode rows as NDJSON or CSV, yielding them in chunks as they are read"""
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if export_format == "csv":
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow({k: ";".join(v) if isinstance(v, list) else v for k, v in row.items()})
+        else:
+            buffer.write(encode_json(row))
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@app.get("/admin/export/{dataset}")
+async def export_history(
+    dataset: str,
+    export_format: str = Query("ndjson", alias="format", description="'ndjson' or 'csv'"),
+    game_id: Optional[str] = Query(None, description="hands: only export hands of this game"),
+    model_name: Optional[str] = Query(None, description="hands: only export hands of this model"),
+    include_in_progress: bool = Query(True, description="games: whether to include in-progress games"),
+    include_archives: bool = Query(False, description="Whether to include rows moved to archive databases")
+):
+    """
+    Stream the full history of 'games' or 'hands' as NDJSON or CSV (admin endpoint)
+    
+    Rows are read from a database cursor and sent as they are encoded, so
+    exports of any size use constant memory.
+    """
+    if export_format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    if dataset == "games":
+        rows = leaderboard_manager.iter_games(include_in_progress=include_in_progress, include_archives=include_archives)
+    elif dataset == "hands":
+        rows = leaderboard_manager.iter_hand_results(
+            game_id=game_id, model_name=model_name, include_archives=include_archives
         )
-        return {"games": games}
+    else:
+        raise HTTPException(status_code=404, detail="dataset must be 'games' or 'hands'")
+    
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_chunks(rows, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{export_format}"'}
+    )
+
+@app.get("/admin/games/{game_id}/llm-costs")
+async def get_game_llm_costs(game_id: str):
+    """Get per-model LLM latency, token and cost totals for a game (requires record_llm_metrics)"""
+    try:
+        return {"game_id": game_id, "models": leaderboard_manager.get_game_llm_costs(game_id)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/stats/llm")
+async def get_llm_stats(
+    model_name: Optional[str] = Query(None, description="Only return stats for this model")
+):
+    """Get per-model LLM call latency histograms, token counts, retries and estimated cost"""
+    return {"models": llm_metrics.get_stats(model_name)}
+
+@app.get("/stats/memory")
+async def get_memory_stats():
+    """Get counts of live games, streams, buffered events and spectators held in memory"""
+    return game_manager.get_memory_stats()
+
+@app.get("/stats/leaderboard-writer")
+async def get_leaderboard_writer_stats():
+    """Get the leaderboard writer's queue depth and batch sizes"""
+    return leaderboard_writer.get_stats()
+
+@app.get("/stats/prompt-cache")
+async def get_prompt_cache_stats():
+    """Get per-model provider prompt cache hit rates"""
+    return {"models": prompt_cache_stats.get_stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file